@@ -1,23 +1,196 @@
-from langchain_ollama import OllamaLLM
-from tool_executor import execute_tool
+from tool_executor import (
+    execute_tool, aexecute_tool, execute_plan, aexecute_plan, plan_waves, MAX_PLAN_STEPS
+)
+import asyncio
 import json
 import re
+import time
+
+from intent_classifier import CLASSIFIER_AVAILABLE, classify_intent, embed_question
+from answer_templates import render_tool_answer, requested_transaction_count
+from answer_cache import answer_cache
+from tool_cache import tool_cache
+from data_access import get_account_data_version
+from insights_store import build_insight_prompt, insights_store, personalize_report
+from conversation_memory import conversation_memory
+from llm_gateway import gateway, PRIORITY_CLASSIFY, PRIORITY_ANSWER, PRIORITY_INSIGHTS
 
 # Import RAG service
 try:
-    from rag_service import get_combined_context, get_insights_from_other_customers
+    from rag_service import (
+        get_combined_context, get_insights_from_other_customers,
+        aget_combined_context, aget_insights_from_other_customers
+    )
     RAG_AVAILABLE = True
 except ImportError:
     RAG_AVAILABLE = False
     print("⚠️ RAG service not available")
 
-llm = OllamaLLM(
-    model="gemma3:4b",
-    base_url="http://localhost:11434"
-)
-
 MAX_ITERATIONS = 3
 
+# Transaction slice the agent fetches when the question doesn't say how many
+AGENT_TRANSACTION_LIMIT = 20
+AGENT_MAX_TRANSACTIONS = 100
+AGENT_TRANSACTION_FIELDS = "date,description,type,netAmount,balance After"
+
+# Running totals across all requests, exposed through /metrics in main.py
+AGENT_METRICS = {
+    "requests": 0,
+    "llm_calls": 0,
+    "router_hits": 0,
+    "router_fallbacks": 0,
+    "classifier_hits": 0,
+    "template_answers": 0,
+    "planned_requests": 0,
+    "plan_saved_ms_total": 0.0,
+    "streamed_requests": 0,
+    "ttft_ms_total": 0.0,
+}
+
+
+# ─────────────────────────────────────────────
+# UTILITY: Counted LLM call + JSON parsing
+# ─────────────────────────────────────────────
+def call_llm(prompt: str, stats: dict = None, priority: int = PRIORITY_ANSWER) -> str:
+    """Invoke the LLM through the shared gateway and count the round-trip against this request"""
+    if stats is not None:
+        stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    AGENT_METRICS["llm_calls"] += 1
+    return gateway.invoke(prompt, priority, user=(stats or {}).get("user"))
+
+
+def parse_json_response(response: str):
+    """Strip markdown fences from an LLM reply and parse it as JSON"""
+    response = response.strip()
+    if response.startswith("```json"):
+        response = response.split("```json")[1].split("```")[0].strip()
+    elif response.startswith("```"):
+        response = response.split("```")[1].split("```")[0].strip()
+    return json.loads(response)
+
+
+def stream_llm(prompt: str, stats: dict = None, priority: int = PRIORITY_ANSWER):
+    """Stream the LLM reply chunk by chunk, counted as one round-trip"""
+    if stats is not None:
+        stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    AGENT_METRICS["llm_calls"] += 1
+    yield from gateway.stream(prompt, priority, user=(stats or {}).get("user"))
+
+
+# ─────────────────────────────────────────────
+# PIPELINE DRIVER
+# ─────────────────────────────────────────────
+# The agent steps below are generators. Instead of calling the LLM, tools or
+# RAG directly they yield an "effect" tuple and receive its result back:
+#   ("llm", prompt)                        -> reply text (short guard/router/decision calls,
+#                                             so they get PRIORITY_CLASSIFY in the gateway)
+#   ("tool", tool_name, tool_args)         -> tool result (errors are thrown back in)
+#   ("plan", steps)                        -> execute_plan() report (independent tools run concurrently)
+#   ("rag", user_question, account_id)     -> get_combined_context() dict
+#   ("insight_data", account_id, categories) -> get_insights_from_other_customers() text per category
+#   ("embed", text)                        -> sentence embedding of the text
+#   ("data_version", account_id)           -> get_account_data_version() fingerprint
+#   ("memory", session_id)                 -> conversation_memory.context() (summary + recent turns)
+#   ("event", stage, data)                 -> progress event, forwarded to streaming clients
+# A driver performs the effects, so the same steps serve run_agent (blocking),
+# stream_agent (Server-Sent Events) and their async twins arun_agent /
+# astream_agent (non-blocking LLM, tool and retrieval calls).
+def _perform(effect, stats: dict):
+    kind = effect[0]
+    if kind == "llm":
+        return call_llm(effect[1], stats, PRIORITY_CLASSIFY)
+    if kind == "tool":
+        return execute_tool(effect[1], effect[2])
+    if kind == "plan":
+        return execute_plan(effect[1])
+    if kind == "rag":
+        return get_combined_context(
+            user_question=effect[1],
+            user_account_id=effect[2],
+            include_insights=False
+        )
+    if kind == "insight_data":
+        return [get_insights_from_other_customers(effect[1], category) for category in effect[2]]
+    if kind == "embed":
+        return embed_question(effect[1])
+    if kind == "data_version":
+        return get_account_data_version(effect[1])
+    if kind == "memory":
+        return conversation_memory.context(effect[1])
+    raise ValueError(f"Unknown pipeline effect: {kind}")
+
+
+def _drive(steps, stats: dict):
+    """Perform every effect of `steps`, yield its events and return its result"""
+    value, error = None, None
+    while True:
+        try:
+            effect = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+        value, error = None, None
+        if effect[0] == "event":
+            yield effect
+            continue
+
+        try:
+            value = _perform(effect, stats)
+        except Exception as e:
+            error = e
+
+
+def _run_steps(steps, stats: dict = None):
+    """Drive `steps` to completion, ignoring progress events"""
+    driver = _drive(steps, stats if stats is not None else {})
+    while True:
+        try:
+            next(driver)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _cache_answer(result: dict, user_question: str, user_account_id: int):
+    """Store a finished answer in the semantic answer cache (if it qualifies)"""
+    cache_key = result.pop("cache_key", None)
+    if cache_key is None or result.get("type") != "answer" or not result.get("response"):
+        return
+    try:
+        cacheable = {k: v for k, v in result.items() if k not in ("llm_calls", "ttft_ms", "cached")}
+        answer_cache.store(user_account_id, user_question, cache_key["vector"], cache_key["data_version"], cacheable)
+    except Exception as e:
+        print(f"⚠️ Answer cache store failed: {e}")
+
+
+def _remember(result: dict, session_id: str, user_question: str, user_account_id: int):
+    """Record the question and answer in the session's conversation memory"""
+    response = result.get("response")
+    if not session_id or not isinstance(response, str) or not response:
+        return
+    masked_account = "*" * (len(str(user_account_id)) - 4) + str(user_account_id)[-4:]
+    try:
+        conversation_memory.remember_turn(session_id, user_question, response.replace(str(user_account_id), masked_account))
+    except Exception as e:
+        print(f"⚠️ Conversation memory update failed: {e}")
+
+
+def _complete(result: dict, stats: dict) -> dict:
+    """Run the deferred final generation (if any) of a pipeline result"""
+    final_prompt = result.pop("final_prompt", None)
+    error_response = result.pop("error_response", None)
+    final_priority = result.pop("final_priority", PRIORITY_ANSWER)
+    if final_prompt is None:
+        return result
+
+    try:
+        result["response"] = call_llm(final_prompt, stats, final_priority)
+    except Exception as e:
+        if error_response is None:
+            raise
+        print(f"❌ Final generation failed: {e}")
+        result["response"] = error_response
+    return result
+
 
 # ─────────────────────────────────────────────
 # UTILITY: Mask account numbers in any data
@@ -40,7 +213,11 @@ def mask_account_in_data(data, account_id):
 # ─────────────────────────────────────────────
 # GUARD 1: Banking topic filter
 # ─────────────────────────────────────────────
-def is_banking_related(question: str):
+def is_banking_related(question: str, stats: dict = None):
+    return _run_steps(_banking_check_steps(question), stats)
+
+
+def _banking_check_steps(question: str):
     check_prompt = f"""
 You are a banking assistant filter. Determine if this question is related to banking services.
 
@@ -62,14 +239,10 @@ Respond in JSON format:
   "reason": "brief explanation"
 }}
 """
-    response = llm.invoke(check_prompt).strip()
-    if response.startswith("```json"):
-        response = response.split("```json")[1].split("```")[0].strip()
-    elif response.startswith("```"):
-        response = response.split("```")[1].split("```")[0].strip()
+    response = yield ("llm", check_prompt)
 
     try:
-        result = json.loads(response)
+        result = parse_json_response(response)
         return result.get("is_banking", False), result.get("reason", "")
     except:
         banking_keywords = [
@@ -81,6 +254,166 @@ Respond in JSON format:
         return is_banking, "Keyword-based detection"
 
 
+# ─────────────────────────────────────────────
+# ROUTER: Fused guard + intent + first tool plan
+# ─────────────────────────────────────────────
+ROUTER_TOOLS = [
+    "get_account_balance",
+    "get_transaction_history",
+    "get_periodic_statements",
+    "get_adhoc_statements",
+    "get_spending_breakdown",
+    "get_monthly_totals",
+    "get_fee_summary",
+    "get_balance_stats",
+]
+
+ROUTER_INTENTS = ["balance", "transactions", "statements", "documents", "general", "other"]
+
+
+def route_question(question: str, stats: dict = None, memory_context: str = ""):
+    return _run_steps(_route_steps(question, memory_context), stats)
+
+
+def _route_steps(question: str, memory_context: str = ""):
+    """
+    Single LLM call that replaces the banking guard and the first decision step.
+
+    The prompt only contains the question (no user details) so identical
+    questions from different users produce identical prompts. Follow-ups
+    in a session also get the compacted conversation memory.
+
+    Returns:
+        dict with is_banking, reason, intent, action, tool_name, tool_args,
+        response - or None if the reply could not be parsed (callers then
+        fall back to is_banking_related + the decision loop)
+    """
+    router_prompt = f"""
+You are the request router for a FirstNet Investor banking assistant.
+
+Question: "{question}"
+{f"{chr(10)}Earlier in this conversation (use it to resolve follow-ups like 'and last month?'):{chr(10)}{memory_context}{chr(10)}" if memory_context else ""}
+In ONE step decide:
+1. Is the question related to banking services?
+   Banking-related: account balances, transactions, bank statements, deposits,
+   withdrawals, account information, investments, banking services.
+   NOT banking-related: general knowledge, current events, politics,
+   entertainment, personal advice (non-financial), non-banking tech support.
+2. The user's intent: one of {", ".join(ROUTER_INTENTS)}
+3. The action to take. If tools are needed, plan EVERY tool call required to
+   answer up front. Calls that don't need each other's results have an empty
+   depends_on and run in parallel. An arg may use "$<id>.<field>" to take a
+   field from an earlier call's result.
+
+Available tools: {", ".join(ROUTER_TOOLS)}
+Tool args (optional):
+- get_periodic_statements: periodStartDate, periodEndDate (YYYY-MM-DD)
+- get_transaction_history: startDate, endDate (YYYY-MM-DD), transactionType
+  (deposit, withdrawal, purchase, fee, interest, refund), productCode, status,
+  limit (how many recent transactions the question needs)
+- get_spending_breakdown: groupBy (type, productCode, investmentOption),
+  startDate, endDate, transactionType, productCode
+- get_monthly_totals: startDate, endDate, transactionType, productCode
+- get_fee_summary: startDate, endDate
+- get_balance_stats: startDate, endDate
+Questions about totals, spending, monthly flows, fees or balance highs/lows
+use the analytics tools (computed server-side) instead of listing transactions.
+
+Respond ONLY in JSON format:
+{{
+  "is_banking": true/false,
+  "reason": "brief explanation",
+  "intent": "one of the intents above",
+  "action": "tool" or "answer" or "clarify",
+  "tool_name": "first tool if action is tool, else null",
+  "tool_args": {{}},
+  "plan": [
+    {{"id": "t1", "tool": "tool name", "args": {{}}, "depends_on": []}}
+  ],
+  "response": "your answer if action is answer or clarify, else null"
+}}
+
+NOTE: Do NOT include account_id in tool_args or plan args - it will be injected automatically.
+"""
+    try:
+        route = parse_json_response((yield ("llm", router_prompt)))
+    except Exception as e:
+        print(f"⚠️ Router failed, falling back to guard + decision loop: {e}")
+        AGENT_METRICS["router_fallbacks"] += 1
+        return None
+
+    if not isinstance(route, dict) or not isinstance(route.get("is_banking"), bool):
+        print(f"⚠️ Router returned an unusable plan, falling back: {route}")
+        AGENT_METRICS["router_fallbacks"] += 1
+        return None
+
+    if not isinstance(route.get("tool_args"), dict):
+        route["tool_args"] = {}
+
+    route["plan"] = _parse_plan(route) if route.get("action") == "tool" else None
+    if route["plan"]:
+        route["tool_name"] = route["plan"][0]["tool"]
+
+    # A tool plan naming an unknown tool is only trusted for the guard verdict
+    if route.get("action") == "tool" and route.get("tool_name") not in ROUTER_TOOLS:
+        route["action"] = None
+
+    AGENT_METRICS["router_hits"] += 1
+    return route
+
+
+def _parse_plan(route: dict):
+    """
+    Validate the router's tool plan. A route with only tool_name becomes a
+    one-step plan.
+
+    Returns:
+        list of {"id", "tool", "args", "depends_on"} steps, or None when the
+        plan is unusable (the agent then falls back to the decision loop)
+    """
+    raw_plan = route.get("plan")
+    if not isinstance(raw_plan, list) or not raw_plan:
+        if route.get("tool_name") in ROUTER_TOOLS:
+            return [{"id": "t1", "tool": route["tool_name"], "args": dict(route["tool_args"]), "depends_on": []}]
+        return None
+
+    steps = []
+    for i, raw_step in enumerate(raw_plan[:MAX_PLAN_STEPS], 1):
+        if not isinstance(raw_step, dict) or raw_step.get("tool") not in ROUTER_TOOLS:
+            print(f"⚠️ Ignoring tool plan with an invalid step: {raw_step}")
+            return None
+        depends_on = raw_step.get("depends_on") or []
+        steps.append({
+            "id": str(raw_step.get("id") or f"t{i}"),
+            "tool": raw_step["tool"],
+            "args": dict(raw_step.get("args") or {}) if isinstance(raw_step.get("args"), dict) else {},
+            "depends_on": [str(dep) for dep in depends_on] if isinstance(depends_on, list) else [],
+        })
+
+    try:
+        plan_waves(steps)
+    except ValueError as e:
+        print(f"⚠️ Ignoring tool plan: {e}")
+        return None
+    return steps
+
+
+def _scope_tool_args(tool_name: str, tool_args: dict, user_question: str, user_account_id: int) -> dict:
+    """Force the user's own account and fetch only the transactions the question needs"""
+    args = {**tool_args, "account_id": user_account_id}  # Always force user's own account
+
+    if tool_name == "get_transaction_history":
+        has_range = bool(args.get("startDate") or args.get("endDate"))
+        default_limit = AGENT_MAX_TRANSACTIONS if has_range else AGENT_TRANSACTION_LIMIT
+        try:
+            limit = int(args.get("limit") or requested_transaction_count(user_question, default_limit))
+        except (TypeError, ValueError):
+            limit = default_limit
+        args["limit"] = max(1, min(limit, AGENT_MAX_TRANSACTIONS))
+        args.setdefault("fields", AGENT_TRANSACTION_FIELDS)
+    return args
+
+
 # ─────────────────────────────────────────────
 # GUARD 2: Account access check
 # ─────────────────────────────────────────────
@@ -109,81 +442,200 @@ def check_account_access(user_question: str, user_account_id: int, masked_accoun
 # ─────────────────────────────────────────────
 # INSIGHTS: Generate market comparison
 # ─────────────────────────────────────────────
-def get_market_insights(user_account_id: int, user_question: str = "") -> str:
-    if not RAG_AVAILABLE:
-        return "Insights are currently unavailable. Please try again later."
+INSIGHTS_ERROR_RESPONSE = "I encountered an error while fetching market insights. Please try again."
 
-    try:
-        # Fetch all three categories for richer data
-        investment_data = get_insights_from_other_customers(user_account_id, "investment")
-        spending_data   = get_insights_from_other_customers(user_account_id, "spending")
-        savings_data    = get_insights_from_other_customers(user_account_id, "savings")
 
-        combined_data = f"""
-INVESTMENT PATTERNS FROM OTHER CUSTOMERS:
-{investment_data if investment_data else "No investment data available."}
+def get_market_insights(user_account_id: int, user_question: str = "", stats: dict = None) -> str:
+    stats = stats if stats is not None else {}
+    result = _complete(_run_steps(_market_insights_steps(user_account_id), stats), stats)
+    return result["response"]
 
-SPENDING PATTERNS FROM OTHER CUSTOMERS:
-{spending_data if spending_data else "No spending data available."}
 
-SAVINGS PATTERNS FROM OTHER CUSTOMERS:
-{savings_data if savings_data else "No savings data available."}
-"""
+def _market_insights_steps(user_account_id: int, username: str = None, use_stored: bool = True):
+    """
+    Serves the precomputed cohort report from insights_store when one is
+    fresh enough; otherwise falls back to live retrieval + generation.
+
+    Returns:
+        dict with either a ready "response" or a deferred "final_prompt"
+        (plus "final_priority" for the gateway and "error_response" to use
+        if that generation fails)
+    """
+    if use_stored:
+        report = insights_store.get()
+        if report is not None:
+            print(f"⚡ Serving precomputed insights report")
+            yield ("event", "insights", {"status": "precomputed"})
+            return {"response": personalize_report(report["report"], user_account_id, username)}
 
-        insight_prompt = f"""
-You are a financial advisor for FirstNet Investor.
+    if not RAG_AVAILABLE:
+        return {"response": "Insights are currently unavailable. Please try again later."}
 
-Analyze the anonymized transaction and statement data from other customers below and provide
-clear, structured, and actionable insights to help this customer improve their profit
-and investment decisions.
+    try:
+        # Fetch all three categories for richer data
+        yield ("event", "insights", {"status": "retrieving"})
+        investment_data, spending_data, savings_data = yield (
+            "insight_data", user_account_id, ("investment", "spending", "savings")
+        )
 
-Customer Data from Other Accounts (Anonymized):
-{combined_data}
+        insight_prompt = build_insight_prompt(investment_data, spending_data, savings_data)
 
-Generate a detailed response covering EXACTLY these 5 sections:
+        print(f"✅ Market insights prompt prepared")
+        return {
+            "final_prompt": insight_prompt,
+            "final_priority": PRIORITY_INSIGHTS,
+            "error_response": INSIGHTS_ERROR_RESPONSE
+        }
 
-1. 📈 TOP INVESTED PRODUCTS
-   - List the top 3-5 products/categories most customers are investing in
-   - Include approximate percentage of customers investing in each
+    except Exception as e:
+        print(f"❌ Error generating insights: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"response": INSIGHTS_ERROR_RESPONSE}
 
-2. 💹 MARKET TRENDS
-   - What financial trends are observed across customers
-   - Which sectors/products are growing in popularity
 
-3. 🏆 BEST PERFORMING CATEGORIES
-   - Which investment categories are yielding the best returns
-   - Include any specific products with notable performance
+# ─────────────────────────────────────────────
+# DECISION: One step of the agentic loop
+# ─────────────────────────────────────────────
+def _decision_steps(context: str, iteration: int):
+    """
+    Ask the LLM for the next action.
+
+    Returns:
+        (decision, None) on success, or (None, result) when the reply could
+        not be parsed and the agent should return `result` directly
+    """
+    decision_prompt = f"""
+{context}
 
-4. 💡 PERSONALIZED RECOMMENDATIONS
-   - Specific steps this customer can take to improve profit
-   - Suggest 2-3 actionable investment moves based on what others are doing
+Based on the conversation so far, decide what to do next.
 
-5. ⚠️ RISK CONSIDERATIONS
-   - Any risks or market volatility to be aware of
-   - Diversification suggestions
+Available tools: {", ".join(ROUTER_TOOLS)}
 
-IMPORTANT RULES:
-- DO NOT reveal any specific account numbers or personal details
-- Base insights ONLY on the data provided above
-- Be specific with product names, percentages, and figures where available
-- Keep the tone professional and encouraging
+Think step by step:
+- Have I gathered all the information needed?
+- Do I need to call any more tools?
+- Can I provide a complete answer now?
+
+Respond ONLY in JSON format:
+{{
+  "reasoning": "explain your thinking",
+  "action": "tool" or "answer" or "clarify",
+  "tool_name": "tool name if action is tool, else null",
+  "tool_args": {{}},
+  "response": "your answer if action is answer or clarify, else null"
+}}
+
+NOTE: Do NOT include account_id in tool_args - it will be injected automatically.
 """
 
-        response = llm.invoke(insight_prompt)
-        print(f"✅ Market insights generated successfully")
-        return response
+    print(f"🤔 Agent thinking...")
+    decision_response = yield ("llm", decision_prompt)
+    print(f"💭 Decision: {decision_response[:200]}...")
 
-    except Exception as e:
-        print(f"❌ Error generating insights: {e}")
-        import traceback
-        traceback.print_exc()
-        return "I encountered an error while fetching market insights. Please try again."
+    # Parse JSON decision
+    try:
+        decision = parse_json_response(decision_response)
+        print(f"📋 Action: {decision.get('action')}")
+        print(f"🧠 Reasoning: {decision.get('reasoning', '')[:100]}")
+        return decision, None
+
+    except json.JSONDecodeError as e:
+        print(f"❌ Failed to parse decision: {e}")
+        if iteration >= 2:
+            return None, {
+                "type": "partial_answer",
+                "response": "I'm having trouble processing this request. Please try rephrasing your question.",
+                "iterations": iteration,
+                "ask_insights": False
+            }
+        return None, {
+            "type": "answer",
+            "response": decision_response.strip(),
+            "iterations": iteration,
+            "ask_insights": False
+        }
 
 
 # ─────────────────────────────────────────────
 # MAIN AGENT
 # ─────────────────────────────────────────────
-def run_agent(user_question: str, user_account_id: int, username: str, max_iterations: int = MAX_ITERATIONS):
+def run_agent(user_question: str, user_account_id: int, username: str, max_iterations: int = MAX_ITERATIONS,
+              session_id: str = None):
+    stats = {"llm_calls": 0, "user": username}
+    AGENT_METRICS["requests"] += 1
+
+    result = _run_steps(_agent_steps(user_question, user_account_id, username, max_iterations, session_id), stats)
+    result = _complete(result, stats)
+    _cache_answer(result, user_question, user_account_id)
+    _remember(result, session_id, user_question, user_account_id)
+
+    result["llm_calls"] = stats["llm_calls"]
+    print(f"📞 LLM round-trips for this request: {stats['llm_calls']}")
+    return result
+
+
+def stream_agent(user_question: str, user_account_id: int, username: str, max_iterations: int = MAX_ITERATIONS,
+                 session_id: str = None):
+    """
+    Streaming variant of run_agent.
+
+    Yields dicts:
+        {"event": "stage", "stage": ..., ...}  progress (guard, tool, rag, insights, generating)
+        {"event": "token", "text": ...}        answer text as it is generated
+        {"event": "result", "result": {...}}   final run_agent-style result (always last)
+    """
+    stats = {"llm_calls": 0, "user": username}
+    AGENT_METRICS["requests"] += 1
+    started = time.perf_counter()
+
+    driver = _drive(_agent_steps(user_question, user_account_id, username, max_iterations, session_id), stats)
+    while True:
+        try:
+            _, stage, data = next(driver)
+        except StopIteration as stop:
+            result = stop.value
+            break
+        yield {"event": "stage", "stage": stage, **data}
+
+    final_prompt = result.pop("final_prompt", None)
+    error_response = result.pop("error_response", None)
+    final_priority = result.pop("final_priority", PRIORITY_ANSWER)
+    ttft_ms = None
+
+    if final_prompt is None:
+        # Shortcuts, clarifications and refusals are already complete
+        ttft_ms = (time.perf_counter() - started) * 1000
+        yield {"event": "token", "text": result.get("response") or ""}
+    else:
+        chunks = []
+        try:
+            for chunk in stream_llm(final_prompt, stats, final_priority):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                chunks.append(chunk)
+                yield {"event": "token", "text": chunk}
+        except Exception as e:
+            if error_response is None or chunks:
+                raise
+            print(f"❌ Final generation failed: {e}")
+            ttft_ms = (time.perf_counter() - started) * 1000
+            chunks = [error_response]
+            yield {"event": "token", "text": error_response}
+        result["response"] = "".join(chunks)
+
+    _cache_answer(result, user_question, user_account_id)
+    _remember(result, session_id, user_question, user_account_id)
+    result["llm_calls"] = stats["llm_calls"]
+    result["ttft_ms"] = round(ttft_ms, 1) if ttft_ms is not None else None
+    AGENT_METRICS["streamed_requests"] += 1
+    AGENT_METRICS["ttft_ms_total"] += ttft_ms or 0.0
+    print(f"📞 LLM round-trips for this request: {stats['llm_calls']} | ⏱️ TTFT: {result['ttft_ms']} ms")
+    yield {"event": "result", "result": result}
+
+
+def _agent_steps(user_question: str, user_account_id: int, username: str, max_iterations: int,
+                 session_id: str = None):
     masked_account = "*" * (len(str(user_account_id)) - 4) + str(user_account_id)[-4:]
 
     # ── STEP 1: Handle "Yes" to insights immediately ──────────────────────────
@@ -194,15 +646,16 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
     ]
     if user_question.strip().lower() in yes_responses:
         print(f"💡 User confirmed insights - generating market comparison...")
-        insights = get_market_insights(user_account_id, user_question)
+        insights = yield from _market_insights_steps(user_account_id, username)
         return {
             "type": "answer",
-            "response": insights,
+            "response": None,
             "iterations": 1,
             "tools_used": [],
             "has_documents": False,
             "insights_included": True,
-            "ask_insights": False
+            "ask_insights": False,
+            **insights
         }
 
     # ── STEP 2: Handle "No" to insights immediately ───────────────────────────
@@ -218,10 +671,72 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
             "ask_insights": False
         }
 
-    # ── STEP 3: Banking topic filter ─────────────────────────────────────────
-    print(f"🔍 Checking if question is banking-related...")
-    is_banking, reason = is_banking_related(user_question)
+    # Summary + recent turns of this session, never the full history
+    memory_context = ""
+    if session_id:
+        try:
+            memory_context = yield ("memory", session_id)
+        except Exception as e:
+            print(f"⚠️ Conversation memory lookup failed: {e}")
+
+    # ── STEP 3: Semantic answer cache (shared across sessions) ──────────────
+    question_vector, cache_key = None, None
+    if CLASSIFIER_AVAILABLE:
+        try:
+            question_vector = yield ("embed", user_question)
+        except Exception as e:
+            print(f"⚠️ Question embedding failed: {e}")
+
+    # Only look up questions that pass the account access check, so a similar
+    # question naming another account can never be served a cached answer.
+    # Follow-ups ("and the month before?") depend on the earlier turns, which
+    # the cache key does not cover: with conversation memory, neither look up
+    # nor store.
+    if question_vector is not None and not memory_context \
+            and check_account_access(user_question, user_account_id, masked_account)[0]:
+        try:
+            data_version = yield ("data_version", user_account_id)
+            cached = answer_cache.lookup(user_account_id, user_question, question_vector, data_version)
+            cache_key = {"vector": question_vector, "data_version": data_version}
+        except Exception as e:
+            print(f"⚠️ Answer cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            print(f"⚡ Answer cache hit")
+            yield ("event", "cache", {"hit": True})
+            return {**cached, "cached": True}
+
+    result = yield from _question_steps(user_question, user_account_id, username, max_iterations, question_vector,
+                                        memory_context)
+    if cache_key is not None and result.get("type") == "answer":
+        result["cache_key"] = cache_key
+    return result
+
+
+def _question_steps(user_question: str, user_account_id: int, username: str, max_iterations: int, question_vector,
+                    memory_context: str = ""):
+    masked_account = "*" * (len(str(user_account_id)) - 4) + str(user_account_id)[-4:]
+
+    # ── STEP 4: Banking topic filter (local classifier, fused router, guard) ─
+    route = None
+    if question_vector is not None:
+        try:
+            route = classify_intent(question_vector)
+        except Exception as e:
+            print(f"⚠️ Local intent classifier failed: {e}")
+    if route is not None:
+        AGENT_METRICS["classifier_hits"] += 1
+    else:
+        print(f"🔍 Routing question...")
+        route = yield from _route_steps(user_question, memory_context)
+
+    if route is not None:
+        is_banking, reason = route["is_banking"], route.get("reason", "")
+        print(f"🧭 Route: intent={route.get('intent')} action={route.get('action')} tool={route.get('tool_name')}")
+    else:
+        is_banking, reason = yield from _banking_check_steps(user_question)
     print(f"Banking check: {is_banking} - {reason}")
+    yield ("event", "guard", {"passed": bool(is_banking)})
 
     if not is_banking:
         return {
@@ -230,7 +745,7 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
             "iterations": 0
         }
 
-    # ── STEP 4: Account access check ─────────────────────────────────────────
+    # ── STEP 5: Account access check ─────────────────────────────────────────
     is_valid, error_msg = check_account_access(user_question, user_account_id, masked_account)
     if not is_valid:
         return {
@@ -239,12 +754,16 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
             "iterations": 0
         }
 
-    # ── STEP 5: Statement / document request shortcut ─────────────────────────
+    # ── STEP 6: Statement / document request shortcut ─────────────────────────
     statement_keywords = [
         'statement', 'document', 'download', 'pdf',
         'annual statement', 'monthly statement', 'periodic statement'
     ]
-    if any(kw in user_question.lower() for kw in statement_keywords):
+    asks_for_documents = route is not None and route.get("intent") == "documents"
+    # A router tool plan (e.g. "compare my balance with last quarter's
+    # statements") wins over the keyword match
+    planned = route is not None and bool(route.get("plan"))
+    if asks_for_documents or (not planned and any(kw in user_question.lower() for kw in statement_keywords)):
         print(f"📄 Detected statement/document request - providing direct answer")
         return {
             "type": "answer",
@@ -256,8 +775,9 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
             "ask_insights": False
         }
 
-    # ── STEP 6: Agentic loop ─────────────────────────────────────────────────
+    # ── STEP 7: Agentic loop ─────────────────────────────────────────────────
     conversation_history = [{"role": "user", "content": user_question}]
+    masked_results = {}  # tool_name -> masked result, for template answers
     iteration = 0
 
     print(f"\n{'='*60}")
@@ -265,12 +785,20 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
     print(f"Question: {user_question}")
     print(f"{'='*60}\n")
 
+    # The router's up-front tool plan replaces the tool-by-tool iterations
+    plan_summary = None
+    if route is not None and route.get("source") != "classifier" and route.get("plan"):
+        plan_summary = yield from _plan_steps(route["plan"], user_question, user_account_id, conversation_history, masked_results)
+    plan_fields = {"plan": plan_summary} if plan_summary else {}
+
     while iteration < max_iterations:
         iteration += 1
         print(f"\n--- Iteration {iteration} ---")
 
         # Build context for LLM (masked account only)
         context = f"[User: {username}, AccountID: {masked_account}]\n"
+        if memory_context:
+            context += f"Earlier conversation:\n{memory_context}\n\n"
         context += f"Original Question: {user_question}\n\n"
 
         if len(conversation_history) > 1:
@@ -279,75 +807,44 @@ def run_agent(user_question: str, user_account_id: int, username: str, max_itera
                 preview = str(msg['content'])[:100].replace(str(user_account_id), masked_account)
                 context += f"{i}. {msg['role']}: {preview}...\n"
 
-        decision_prompt = f"""
-{context}
-
-Based on the conversation so far, decide what to do next.
-
-Available tools: get_account_balance, get_transaction_history, get_periodic_statements, get_adhoc_statements
-
-Think step by step:
-- Have I gathered all the information needed?
-- Do I need to call any more tools?
-- Can I provide a complete answer now?
-
-Respond ONLY in JSON format:
-{{
-  "reasoning": "explain your thinking",
-  "action": "tool" or "answer" or "clarify",
-  "tool_name": "tool name if action is tool, else null",
-  "tool_args": {{}},
-  "response": "your answer if action is answer or clarify, else null"
-}}
-
-NOTE: Do NOT include account_id in tool_args - it will be injected automatically.
-"""
-
-        print(f"🤔 Agent thinking...")
-        decision_response = llm.invoke(decision_prompt)
-        print(f"💭 Decision: {decision_response[:200]}...")
-
-        # Parse JSON decision
-        try:
-            decision_response = decision_response.strip()
-            if decision_response.startswith("```json"):
-                decision_response = decision_response.split("```json")[1].split("```")[0].strip()
-            elif decision_response.startswith("```"):
-                decision_response = decision_response.split("```")[1].split("```")[0].strip()
-
-            decision = json.loads(decision_response)
-            print(f"📋 Action: {decision.get('action')}")
-            print(f"🧠 Reasoning: {decision.get('reasoning', '')[:100]}")
-
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse decision: {e}")
-            if iteration >= 2:
-                return {
-                    "type": "partial_answer",
-                    "response": "I'm having trouble processing this request. Please try rephrasing your question.",
-                    "iterations": iteration,
-                    "ask_insights": False
-                }
-            return {
-                "type": "answer",
-                "response": decision_response,
-                "iterations": iteration,
-                "ask_insights": False
+        if iteration == 1 and plan_summary is not None:
+            # All planned tools have run - one synthesis call answers
+            decision = {"reasoning": "Tool plan executed", "action": "answer"}
+            print(f"📋 Action (after tool plan): answer")
+        # The router already decided the first step - reuse its plan
+        elif iteration == 1 and route is not None and route.get("action") in ("tool", "answer", "clarify"):
+            decision = {
+                "reasoning": route.get("reason", ""),
+                "action": route["action"],
+                "tool_name": route.get("tool_name"),
+                "tool_args": dict(route.get("tool_args") or {}),
+                "response": route.get("response"),
             }
+            print(f"📋 Action (from router): {decision['action']}")
+        elif (route is not None and route.get("source") == "classifier"
+              and conversation_history[-1].get("role") == "tool"):
+            # A confident single-tool intent is answered straight from its tool result
+            decision = {"reasoning": "Single-tool intent", "action": "answer"}
+            print(f"📋 Action (single-tool intent): answer")
+        else:
+            decision, early_result = yield from _decision_steps(context, iteration)
+            if early_result is not None:
+                return early_result
 
         action = decision.get("action", "answer")
 
         # ── Tool call ────────────────────────────────────────────────────────
         if action == "tool":
             tool_name = decision.get("tool_name")
-            tool_args = decision.get("tool_args", {})
-            tool_args["account_id"] = user_account_id  # Always force user's own account
+            tool_args = _scope_tool_args(tool_name, decision.get("tool_args") or {}, user_question, user_account_id)
 
             print(f"🔧 Calling tool: {tool_name} with args: {tool_args}")
             try:
-                tool_result = execute_tool(tool_name, tool_args)
+                tool_result = yield ("tool", tool_name, tool_args)
                 print(f"✅ Tool result: {str(tool_result)[:100]}...")
-                masked_result = mask_account_in_data(tool_result, user_account_id)
+                yield ("event", "tool", {"tool": tool_name, "status": "ok"})
+                masked_result = tool_cache.masked(tool_result, user_account_id, mask_account_in_data)
+                masked_results[tool_name] = masked_result
                 conversation_history.append({
                     "role": "tool",
                     "tool": tool_name,
@@ -355,6 +852,7 @@ NOTE: Do NOT include account_id in tool_args - it will be injected automatically
                 })
             except Exception as e:
                 print(f"❌ Tool failed: {e}")
+                yield ("event", "tool", {"tool": tool_name, "status": "error"})
                 conversation_history.append({
                     "role": "error",
                     "content": f"Tool {tool_name} failed: {str(e)}"
@@ -368,17 +866,35 @@ NOTE: Do NOT include account_id in tool_args - it will be injected automatically
                 'download', 'statement', 'document', 'pdf', 'file'
             ])
 
+            # Simple single-tool facts are rendered straight from the tool result
+            tool_messages = [m for m in conversation_history if m.get("role") == "tool"]
+            failed = any(m.get("role") == "error" for m in conversation_history)
+            if len(tool_messages) == 1 and not failed:
+                tool_name = tool_messages[0]["tool"]
+                rendered = render_tool_answer(tool_name, masked_results.get(tool_name), user_question, masked_account)
+                if rendered:
+                    print(f"🧾 Answer rendered from {tool_name} template (no LLM)")
+                    AGENT_METRICS["template_answers"] += 1
+                    return {
+                        "type": "answer",
+                        "response": rendered,
+                        "iterations": iteration,
+                        "tools_used": tool_messages,
+                        "has_documents": asking_for_documents,
+                        "insights_included": False,
+                        "ask_insights": True,
+                        "rendered": True,
+                        **plan_fields
+                    }
+
             # Get RAG explanation context
             rag_explanation = ""
             if RAG_AVAILABLE:
                 try:
-                    ctx = get_combined_context(
-                        user_question=user_question,
-                        user_account_id=user_account_id,
-                        include_insights=False
-                    )
+                    ctx = yield ("rag", user_question, user_account_id)
                     rag_explanation = ctx.get("explanation", "")
                     print(f"📚 RAG context retrieved")
+                    yield ("event", "rag", {"retrieved": bool(rag_explanation)})
                 except Exception as e:
                     print(f"⚠️ RAG retrieval failed: {e}")
 
@@ -388,6 +904,7 @@ You are a banking assistant for FirstNet Investor. Answer the user's question.
 PRIORITY: Use tool results as your ONLY source of facts.
 Reference material below is for explanation only - never use it as data.
 
+{f"Earlier conversation (context only):{chr(10)}{memory_context}{chr(10)}" if memory_context else ""}
 User Question: {user_question}
 
 Tool Results (AUTHORITATIVE DATA):
@@ -404,20 +921,21 @@ INSTRUCTIONS:
 
 Answer:
 """
-            final_answer = llm.invoke(final_prompt)
-
             # Ask about insights if a tool was used
             tool_names = [m.get("tool") for m in conversation_history if m.get("role") == "tool"]
             should_ask_insights = len(tool_names) > 0
 
+            yield ("event", "generating", {})
             return {
                 "type": "answer",
-                "response": final_answer,
+                "response": None,
+                "final_prompt": final_prompt,
                 "iterations": iteration,
                 "tools_used": [m for m in conversation_history if m.get("role") == "tool"],
                 "has_documents": asking_for_documents,
                 "insights_included": False,
-                "ask_insights": should_ask_insights
+                "ask_insights": should_ask_insights,
+                **plan_fields
             }
 
         # ── Clarification ────────────────────────────────────────────────────
@@ -454,38 +972,237 @@ Full history:
 
 Provide the best answer possible. If incomplete, say so and suggest the user rephrase.
 """
-    try:
-        final_answer = llm.invoke(fallback_prompt)
-    except Exception as e:
-        print(f"❌ Fallback error: {e}")
-        final_answer = "I hit a processing limit. Please try rephrasing your question or ask something more specific."
-
+    yield ("event", "generating", {})
     return {
         "type": "partial_answer",
-        "response": final_answer,
+        "response": None,
+        "final_prompt": fallback_prompt,
+        "error_response": "I hit a processing limit. Please try rephrasing your question or ask something more specific.",
         "iterations": iteration,
         "note": "Maximum iterations reached. This may be a partial answer.",
         "ask_insights": False
     }
 
 
+def _plan_steps(plan: list, user_question: str, user_account_id: int, conversation_history: list, masked_results: dict):
+    """
+    Run the router's tool plan in one ("plan") effect and record every tool
+    result in the conversation history, like the loop's tool calls.
+
+    Returns:
+        plan summary (steps, per-tool ms, wall/serial/saved ms), or None if
+        the plan could not run (the decision loop then takes over)
+    """
+    steps = [{**step, "args": _scope_tool_args(step["tool"], step["args"], user_question, user_account_id)} for step in plan]
+    print(f"🗺️ Tool plan: {[(s['id'], s['tool'], s['depends_on']) for s in steps]}")
+    yield ("event", "plan", {"steps": [{"id": s["id"], "tool": s["tool"], "depends_on": s["depends_on"]} for s in steps]})
+
+    try:
+        report = yield ("plan", steps)
+    except Exception as e:
+        print(f"❌ Tool plan failed: {e}")
+        return None
+
+    for step in report["steps"]:
+        tool_name = step["tool"]
+        if step["status"] == "ok":
+            masked_result = tool_cache.masked(report["results"][step["id"]], user_account_id, mask_account_in_data)
+            masked_results[tool_name] = masked_result
+            conversation_history.append({
+                "role": "tool",
+                "tool": tool_name,
+                "content": json.dumps(masked_result, indent=2)
+            })
+        else:
+            conversation_history.append({
+                "role": "error",
+                "content": f"Tool {tool_name} failed: {step.get('error')}"
+            })
+        yield ("event", "tool", {"tool": tool_name, "status": step["status"], "ms": step["ms"]})
+
+    summary = {key: value for key, value in report.items() if key != "results"}
+    AGENT_METRICS["planned_requests"] += 1
+    AGENT_METRICS["plan_saved_ms_total"] += summary["saved_ms"]
+    print(f"⏱️ Plan: {len(steps)} tools in {summary['waves']} wave(s), {summary['wall_ms']} ms "
+          f"(serial {summary['serial_ms']} ms, saved {summary['saved_ms']} ms)")
+    return summary
+
+
 # ─────────────────────────────────────────────
-# ENTRY POINT
+# ASYNC DRIVER
 # ─────────────────────────────────────────────
-def run_simple_agent(user_question: str, user_account_id: int, username: str):
-    analysis_prompt = f"""
-Analyze this banking question: "{user_question}"
+async def acall_llm(prompt: str, stats: dict = None, priority: int = PRIORITY_ANSWER) -> str:
+    """Async version of call_llm"""
+    if stats is not None:
+        stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    AGENT_METRICS["llm_calls"] += 1
+    return await gateway.ainvoke(prompt, priority, user=(stats or {}).get("user"))
+
+
+async def astream_llm(prompt: str, stats: dict = None, priority: int = PRIORITY_ANSWER):
+    """Async version of stream_llm"""
+    if stats is not None:
+        stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    AGENT_METRICS["llm_calls"] += 1
+    async for chunk in gateway.astream(prompt, priority, user=(stats or {}).get("user")):
+        yield chunk
+
+
+async def _aperform(effect, stats: dict):
+    kind = effect[0]
+    if kind == "llm":
+        return await acall_llm(effect[1], stats, PRIORITY_CLASSIFY)
+    if kind == "tool":
+        return await aexecute_tool(effect[1], effect[2])
+    if kind == "plan":
+        return await aexecute_plan(effect[1])
+    if kind == "rag":
+        return await aget_combined_context(
+            user_question=effect[1],
+            user_account_id=effect[2],
+            include_insights=False
+        )
+    if kind == "insight_data":
+        return list(await asyncio.gather(
+            *(aget_insights_from_other_customers(effect[1], category) for category in effect[2])
+        ))
+    if kind == "embed":
+        # CPU-bound model call - keep it off the event loop
+        return await asyncio.to_thread(embed_question, effect[1])
+    if kind == "data_version":
+        return await asyncio.to_thread(get_account_data_version, effect[1])
+    if kind == "memory":
+        return await asyncio.to_thread(conversation_memory.context, effect[1])
+    raise ValueError(f"Unknown pipeline effect: {kind}")
+
+
+async def _adrive(steps, stats: dict):
+    """
+    Async twin of _drive. Async generators cannot return a value, so the
+    pipeline result is yielded last as ("result", result).
+    """
+    value, error = None, None
+    while True:
+        try:
+            effect = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            yield ("result", stop.value)
+            return
 
-Does this require multiple pieces of information or calculations?
+        value, error = None, None
+        if effect[0] == "event":
+            yield effect
+            continue
 
-Respond in JSON:
-{{
-  "is_complex": true/false,
-  "steps": ["step 1", "step 2"],
-  "tools_needed": ["tool1", "tool2"]
-}}
-"""
-    analysis = llm.invoke(analysis_prompt)
-    print(f"📊 Question Analysis: {analysis}")
+        try:
+            value = await _aperform(effect, stats)
+        except Exception as e:
+            error = e
+
+
+async def _arun_steps(steps, stats: dict = None):
+    """Drive `steps` to completion asynchronously, ignoring progress events"""
+    async for item in _adrive(steps, stats if stats is not None else {}):
+        if item[0] == "result":
+            return item[1]
 
-    return run_agent(user_question, user_account_id, username)
\ No newline at end of file
+
+async def _acomplete(result: dict, stats: dict) -> dict:
+    """Async version of _complete"""
+    final_prompt = result.pop("final_prompt", None)
+    error_response = result.pop("error_response", None)
+    final_priority = result.pop("final_priority", PRIORITY_ANSWER)
+    if final_prompt is None:
+        return result
+
+    try:
+        result["response"] = await acall_llm(final_prompt, stats, final_priority)
+    except Exception as e:
+        if error_response is None:
+            raise
+        print(f"❌ Final generation failed: {e}")
+        result["response"] = error_response
+    return result
+
+
+async def aget_market_insights(user_account_id: int, user_question: str = "", stats: dict = None) -> str:
+    """Async version of get_market_insights"""
+    stats = stats if stats is not None else {}
+    result = await _acomplete(await _arun_steps(_market_insights_steps(user_account_id), stats), stats)
+    return result["response"]
+
+
+async def arun_agent(user_question: str, user_account_id: int, username: str, max_iterations: int = MAX_ITERATIONS,
+                     session_id: str = None):
+    """Async version of run_agent: LLM, tool and retrieval calls never block the event loop"""
+    stats = {"llm_calls": 0, "user": username}
+    AGENT_METRICS["requests"] += 1
+
+    result = await _arun_steps(_agent_steps(user_question, user_account_id, username, max_iterations, session_id), stats)
+    result = await _acomplete(result, stats)
+    _cache_answer(result, user_question, user_account_id)
+    await asyncio.to_thread(_remember, result, session_id, user_question, user_account_id)
+
+    result["llm_calls"] = stats["llm_calls"]
+    print(f"📞 LLM round-trips for this request: {stats['llm_calls']}")
+    return result
+
+
+async def astream_agent(user_question: str, user_account_id: int, username: str, max_iterations: int = MAX_ITERATIONS,
+                        session_id: str = None):
+    """Async version of stream_agent (same events)"""
+    stats = {"llm_calls": 0, "user": username}
+    AGENT_METRICS["requests"] += 1
+    started = time.perf_counter()
+
+    result = {}
+    async for item in _adrive(_agent_steps(user_question, user_account_id, username, max_iterations, session_id), stats):
+        if item[0] == "result":
+            result = item[1]
+        else:
+            _, stage, data = item
+            yield {"event": "stage", "stage": stage, **data}
+
+    final_prompt = result.pop("final_prompt", None)
+    error_response = result.pop("error_response", None)
+    final_priority = result.pop("final_priority", PRIORITY_ANSWER)
+    ttft_ms = None
+
+    if final_prompt is None:
+        # Shortcuts, clarifications and refusals are already complete
+        ttft_ms = (time.perf_counter() - started) * 1000
+        yield {"event": "token", "text": result.get("response") or ""}
+    else:
+        chunks = []
+        try:
+            async for chunk in astream_llm(final_prompt, stats, final_priority):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                chunks.append(chunk)
+                yield {"event": "token", "text": chunk}
+        except Exception as e:
+            if error_response is None or chunks:
+                raise
+            print(f"❌ Final generation failed: {e}")
+            ttft_ms = (time.perf_counter() - started) * 1000
+            chunks = [error_response]
+            yield {"event": "token", "text": error_response}
+        result["response"] = "".join(chunks)
+
+    _cache_answer(result, user_question, user_account_id)
+    await asyncio.to_thread(_remember, result, session_id, user_question, user_account_id)
+    result["llm_calls"] = stats["llm_calls"]
+    result["ttft_ms"] = round(ttft_ms, 1) if ttft_ms is not None else None
+    AGENT_METRICS["streamed_requests"] += 1
+    AGENT_METRICS["ttft_ms_total"] += ttft_ms or 0.0
+    print(f"📞 LLM round-trips for this request: {stats['llm_calls']} | ⏱️ TTFT: {result['ttft_ms']} ms")
+    yield {"event": "result", "result": result}
+
+
+# ─────────────────────────────────────────────
+# ENTRY POINT
+# ─────────────────────────────────────────────
+def run_simple_agent(user_question: str, user_account_id: int, username: str):
+    # The old standalone "analysis" call was never used by the agent; the
+    # router inside run_agent now does guard, intent and first step in one call
+    return run_agent(user_question, user_account_id, username)
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = 0.93
+# ANSWER_CACHE_MAX_ENTRIES=0 turns the cache off (benchmarks)
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 2000))
+MAX_BYTES = 32 * 1024 * 1024
+TTL_SECONDS = 30 * 60
+
+
+def _numbers(text: str) -> tuple:
+    # "last 3 transactions" and "last 5 transactions" embed almost identically,
+    # so any numbers in the question must match exactly for a hit
+    return tuple(re.findall(r"\d+", text))
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache shared across sessions, keyed on (account, question embedding).
+
+    A lookup hits when a stored question for the same account is at least
+    `threshold` cosine-similar, has the same numbers in it, and was answered
+    against the same account data version. Entries are evicted LRU-first when
+    the entry count or memory cap is exceeded, and expire after `ttl_seconds`.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_entries: int = MAX_ENTRIES,
+                 max_bytes: int = MAX_BYTES, ttl_seconds: float = TTL_SECONDS):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # entry_id -> entry, oldest first
+        self._by_account = {}          # account_id -> set of entry_ids
+        self._next_id = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def lookup(self, account_id: int, question: str, vector, data_version: str):
+        query = _unit(vector)
+        numbers = _numbers(question)
+        now = time.monotonic()
+
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_account.get(account_id, ())):
+                entry = self._entries[entry_id]
+                if now - entry["created"] > self.ttl_seconds:
+                    self._remove(entry_id)
+                    self.metrics["expired"] += 1
+                    continue
+                if entry["data_version"] != data_version:
+                    self._remove(entry_id)
+                    self.metrics["invalidations"] += 1
+                    continue
+                if entry["numbers"] != numbers:
+                    continue
+                score = float(entry["vector"] @ query)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.metrics["misses"] += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.metrics["hits"] += 1
+            return json.loads(self._entries[best_id]["result"])
+
+    def store(self, account_id: int, question: str, vector, data_version: str, result: dict):
+        vector = _unit(vector)
+        payload = json.dumps(result)
+        size = vector.nbytes + len(payload) + len(question)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "account_id": account_id,
+                "vector": vector,
+                "numbers": _numbers(question),
+                "data_version": data_version,
+                "result": payload,
+                "created": time.monotonic(),
+                "size": size,
+            }
+            self._by_account.setdefault(account_id, set()).add(entry_id)
+            self._bytes += size
+            self.metrics["stores"] += 1
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.metrics["evictions"] += 1
+
+    def invalidate_account(self, account_id: int):
+        with self._lock:
+            for entry_id in list(self._by_account.get(account_id, ())):
+                self._remove(entry_id)
+                self.metrics["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._bytes -= entry["size"]
+        ids = self._by_account.get(entry["account_id"])
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_account[entry["account_id"]]
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,121 @@
+import re
+
+# Questions with any of these words need the LLM to reason over the data,
+# so they never get a template answer
+REASONING_KEYWORDS = [
+    'why', 'how much did', 'how many', 'versus', 'vs', 'average', 'total',
+    'sum', 'trend', 'explain', 'should', 'recommend', 'spend', 'spent',
+    'increase', 'decrease', 'difference', 'change', 'highest', 'lowest',
+    'largest', 'biggest', 'smallest', 'predict', 'forecast', 'if'
+]
+REASONING_PREFIXES = ('compar', 'analy')
+
+DEFAULT_TRANSACTION_COUNT = 5
+MAX_TRANSACTION_COUNT = 50
+
+
+def needs_reasoning(question: str) -> bool:
+    words = re.findall(r"[a-z']+", question.lower())
+    text = " ".join(words)
+    if any(word.startswith(REASONING_PREFIXES) for word in words):
+        return True
+    return any(
+        (keyword in text) if " " in keyword else (keyword in words)
+        for keyword in REASONING_KEYWORDS
+    )
+
+
+def format_currency(amount, currency: str = None) -> str:
+    """Format an amount like $1,234.56 (with the currency code when known)"""
+    if amount is None:
+        return "not available"
+    sign = "-" if amount < 0 else ""
+    formatted = f"{sign}${abs(amount):,.2f}"
+    return f"{formatted} {currency}" if currency else formatted
+
+
+def requested_transaction_count(question: str, default: int = DEFAULT_TRANSACTION_COUNT) -> int:
+    """Number of transactions asked for ("last 3 transactions"), else `default`"""
+    match = re.search(r'(?:last|latest|recent|past|top|first)\s+(\d{1,3})\b', question.lower())
+    if not match:
+        match = re.search(r'\b(\d{1,3})\s+(?:most\s+)?(?:recent\s+|latest\s+|last\s+)?transactions?\b', question.lower())
+    if not match:
+        return default
+    return max(1, min(int(match.group(1)), MAX_TRANSACTION_COUNT))
+
+
+def render_balance(data: dict, question: str, masked_account: str):
+    if "balanceAmount" not in data:
+        return None
+    answer = (
+        f"Your current balance for account {data.get('accountId', masked_account)} is "
+        f"{format_currency(data['balanceAmount'], data.get('currency'))}"
+    )
+    if data.get("asOfDate"):
+        answer += f" as of {data['asOfDate']}"
+    return answer + "."
+
+
+def render_transactions(data: dict, question: str, masked_account: str):
+    transactions = data.get("transactions")
+    if transactions is None:
+        return None
+    if not transactions:
+        return f"There are no transactions on account {masked_account}."
+
+    count = requested_transaction_count(question)
+    latest = transactions[:count]
+    lines = [
+        f"Here {'is your latest transaction' if len(latest) == 1 else f'are your latest {len(latest)} transactions'} "
+        f"for account {data.get('accountId', masked_account)}:"
+    ]
+    for tx in latest:
+        date = str(tx.get("date", ""))[:10]
+        line = f"• {date} | {tx.get('description') or tx.get('type', '')} | {format_currency(tx.get('netAmount'))}"
+        balance_after = tx.get("balance After", tx.get("balance after"))
+        if balance_after is not None:
+            line += f" | balance after {format_currency(balance_after)}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def render_periodic_statements(data: dict, question: str, masked_account: str):
+    statements = data.get("periodicStatements")
+    if statements is None:
+        return None
+    if not statements:
+        return f"There are no periodic statements for account {masked_account} in that period."
+
+    lines = [f"Periodic statements for account {data.get('accountId', masked_account)}:"]
+    for st in statements:
+        lines.append(
+            f"• {st.get('periodStartDate')} to {st.get('periodEndDate')} | "
+            f"opening {format_currency(st.get('OpeningBalance'))} | "
+            f"closing {format_currency(st.get('ClosingBalance'))}"
+        )
+    return "\n".join(lines)
+
+
+TEMPLATES = {
+    "get_account_balance": render_balance,
+    "get_transaction_history": render_transactions,
+    "get_periodic_statements": render_periodic_statements,
+}
+
+
+def render_tool_answer(tool_name: str, masked_result, question: str, masked_account: str):
+    """
+    Render the answer for a simple, single-tool question straight from the
+    (already masked) tool result.
+
+    Returns:
+        answer text, or None when the question needs the LLM
+    """
+    template = TEMPLATES.get(tool_name)
+    if template is None or not isinstance(masked_result, dict) or needs_reasoning(question):
+        return None
+    try:
+        return template(masked_result, question, masked_account)
+    except (TypeError, ValueError) as e:
+        print(f"⚠️ Template for {tool_name} failed, using LLM: {e}")
+        return None
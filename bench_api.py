@@ -0,0 +1,205 @@
+"""
+Scale benchmark for the banking API: every /api/accounts/* endpoint, /login
+and find_statement_files, against a (large) generated database.
+
+Starts main.app (uvicorn) in this process on --db (set before main is
+imported, so the app and its migrations use it; the checked-in sample
+database is copied to a temp folder first), picks random accounts and
+fires requests at a target concurrency. The report (JSON with --json) has
+p50/p95/p99 latency, throughput, errors and response size per endpoint,
+plus the table sizes it ran against.
+
+Run from the project folder:
+    python generate_data.py --accounts 100000 --transactions 50000000 --docs-dir bench_docs --docs-accounts 100000
+    python bench_api.py --db AIGurukul_scale.db --docs-dir bench_docs --requests 500 --concurrency 16 --json api_report.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+from bench_chat import scratch_db, start_api
+
+# (name, path template) - {account} is replaced per request
+ENDPOINTS = [
+    ("balance", "/api/accounts/{account}/balance"),
+    ("transactions_all", "/api/accounts/{account}/transactions"),
+    ("transactions_page", "/api/accounts/{account}/transactions?limit=20"),
+    ("transactions_range", "/api/accounts/{account}/transactions?startDate=2025-11-01&endDate=2025-11-30"),
+    ("transactions_filtered", "/api/accounts/{account}/transactions?transactionType=purchase,fee&limit=50"),
+    ("statements_current", "/api/accounts/{account}/statements/current"),
+    ("statements_adhoc", "/api/accounts/{account}/statements/adhoc"),
+    ("analytics_breakdown", "/api/accounts/{account}/analytics/breakdown"),
+    ("analytics_monthly", "/api/accounts/{account}/analytics/monthly"),
+    ("analytics_fees", "/api/accounts/{account}/analytics/fees"),
+    ("analytics_balance", "/api/accounts/{account}/analytics/balance"),
+]
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def summarize(latencies_ms: list, errors: int, elapsed: float, sizes: list) -> dict:
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        "throughput_rps": round(len(latencies_ms) / elapsed, 1) if elapsed else 0.0,
+        "avg_response_kb": round(sum(sizes) / len(sizes) / 1024, 2) if sizes else 0.0,
+    }
+
+
+async def run_endpoint(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    latencies_ms, sizes, errors = [], [], 0
+    jobs = asyncio.Queue()
+    for i in range(total):
+        jobs.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while not jobs.empty():
+            i = jobs.get_nowait()
+            started = time.perf_counter()
+            try:
+                r = await make_request(client, i)
+                errors += r.status_code != 200
+                sizes.append(len(r.content))
+            except httpx.HTTPError:
+                errors += 1
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies_ms, errors, time.perf_counter() - started, sizes)
+
+
+async def run_http(base_url: str, users: list, total: int, concurrency: int) -> dict:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        async def login(client, i):
+            user = users[i % len(users)]
+            return await client.post("/login", json={"username": user["username"], "password": user["password"]})
+
+        results["login"] = await run_endpoint(client, login, total, concurrency)
+
+        for name, template in ENDPOINTS:
+            async def get(client, i, template=template):
+                return await client.get(template.format(account=users[i % len(users)]["accountId"]))
+
+            await get(client, 0)  # warm up
+            results[name] = await run_endpoint(client, get, total, concurrency)
+    return results
+
+
+def run_find_statement_files(find_statement_files, users: list, total: int, concurrency: int) -> dict:
+    """Called in-process: it is a helper of /chat and /documents, not a route of its own"""
+    def one(i):
+        started = time.perf_counter()
+        files = find_statement_files(users[i % len(users)]["accountId"], "all")
+        return (time.perf_counter() - started) * 1000, len(files)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    report = summarize([ms for ms, _ in outcomes], 0, elapsed, [])
+    report["avg_files_found"] = round(sum(n for _, n in outcomes) / len(outcomes), 1) if outcomes else 0.0
+    return report
+
+
+def dataset_stats(db: str, docs_dir: str) -> dict:
+    conn = sqlite3.connect(db)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                             "AND name NOT LIKE 'sqlite_%'")]
+    rows = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    conn.close()
+    return {
+        "db": db,
+        "size_mb": round(os.path.getsize(db) / 1e6, 1),
+        "rows": rows,
+        "docs_dir": docs_dir,
+        "doc_files": len(os.listdir(docs_dir)) if os.path.isdir(docs_dir) else 0,
+    }
+
+
+def print_report(report: dict):
+    data = report["dataset"]
+    print(f"\n{data['db']} ({data['size_mb']} MB): " + ", ".join(f"{t} {n:,}" for t, n in data["rows"].items()))
+    print(f"{data['doc_files']:,} files in {data['docs_dir']}; "
+          f"{report['requests']} requests per endpoint at concurrency {report['concurrency']}")
+    print(f"{'endpoint':<24}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'errors':>8}{'avg KB':>9}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<24}{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms{r['p99_ms']:>8.2f}ms"
+              f"{r['throughput_rps']:>10}{r['errors']:>8}{r['avg_response_kb']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the banking API against a large database")
+    parser.add_argument("--db", default=os.getenv("AIGURUKUL_DB", "AIGurukul.db"))
+    parser.add_argument("--docs-dir", default=os.getenv("ACCOUNT_DOCS_DIR", "Account_docs"))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sample-accounts", type=int, default=500, help="Random accounts to spread requests over")
+    parser.add_argument("--api-port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    # Must be set before main (and data_access) are imported
+    db_path = scratch_db(args.db)
+    os.environ["AIGURUKUL_DB"] = db_path
+    os.environ["ACCOUNT_DOCS_DIR"] = args.docs_dir
+    os.environ["BANKING_API_URL"] = f"http://127.0.0.1:{args.api_port}"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server, app_module = start_api(args.api_port)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    # Random sample without ORDER BY RANDOM() over the whole table
+    max_rowid = conn.execute("SELECT MAX(rowid) FROM UserDetails").fetchone()[0] or 0
+    rowids = random.Random(args.seed).sample(range(1, max_rowid + 1), min(args.sample_accounts, max_rowid))
+    users = [dict(row) for row in conn.execute(
+        f"SELECT username, password, accountId FROM UserDetails WHERE rowid IN ({', '.join('?' * len(rowids))})",
+        rowids)]
+    conn.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        endpoints = asyncio.run(run_http(f"http://127.0.0.1:{args.api_port}", users, args.requests,
+                                         args.concurrency))
+    endpoints["find_statement_files"] = run_find_statement_files(
+        app_module.find_statement_files, users, args.requests, args.concurrency
+    )
+    server.should_exit = True
+
+    report = {
+        "dataset": dataset_stats(args.db, args.docs_dir),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "sampled_accounts": len(users),
+        "endpoints": endpoints,
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Sync vs async account routes under many concurrent lightweight calls.
+
+"sync" is a baseline app whose routes are plain `def` functions calling the
+blocking data-access queries (what main.py had: each request holds one of
+Starlette's threadpool slots, 40 by default). "async" is main.app, whose
+routes await the same queries on the bounded DB executor. Each is served by
+its own uvicorn process (one worker) and gets the same request mix at
+each concurrency level.
+
+Run from the project folder:
+    python bench_async_api.py
+    python bench_async_api.py --concurrency 100 500 2000 --requests 4000 --db AIGurukul_scale.db --json async_report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from bench_chat import scratch_db
+from db_pool import DB_WORKERS
+
+# (method, path template) - {account}, {username}, {password} filled per request
+REQUEST_MIX = [
+    ("GET", "/api/accounts/{account}/balance"),
+    ("GET", "/api/accounts/{account}/transactions?limit=20"),
+    ("GET", "/api/accounts/{account}/statements/current"),
+    ("POST", "/login"),
+]
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def build_sync_app():
+    """The blocking baseline: same queries, `def` routes on Starlette's threadpool"""
+    from typing import Optional
+
+    from fastapi import FastAPI, HTTPException
+    from pydantic import BaseModel
+
+    import data_access
+    from main import get_user_from_db
+
+    app = FastAPI()
+
+    class LoginRequest(BaseModel):
+        username: str
+        password: str
+
+    @app.post("/login")
+    def login(req: LoginRequest):
+        user = get_user_from_db(req.username, req.password)
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        return {"status": "success", "accountId": user["accountId"]}
+
+    @app.get("/api/accounts/{account}/balance")
+    def balance(account: int):
+        try:
+            return data_access.get_account_balance(account)
+        except data_access.AccountNotFound:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+    @app.get("/api/accounts/{account}/transactions")
+    def transactions(account: int, limit: Optional[int] = None):
+        return data_access.get_transaction_history(account, limit=limit)
+
+    @app.get("/api/accounts/{account}/statements/current")
+    def statements(account: int):
+        return data_access.get_periodic_statements(account)
+
+    return app
+
+
+def serve(app_path: str, port: int, factory: bool = False) -> subprocess.Popen:
+    """Run uvicorn in its own process so the load generator doesn't share its GIL"""
+    command = [sys.executable, "-m", "uvicorn", app_path, "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning", "--backlog", "4096"]
+    if factory:
+        command.append("--factory")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{app_path} did not start on port {port}")
+
+
+async def run_load(base_url: str, users: list, concurrency: int, total: int) -> dict:
+    latencies_ms, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        counter = iter(range(total))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                user = users[i % len(users)]
+                method, template = REQUEST_MIX[i % len(REQUEST_MIX)]
+                started = time.perf_counter()
+                try:
+                    if method == "POST":
+                        r = await client.post(template, json={"username": user["username"],
+                                                              "password": user["password"]})
+                    else:
+                        r = await client.get(template.format(account=user["accountId"]))
+                    errors += r.status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async account routes")
+    parser.add_argument("--db", default=os.getenv("AIGURUKUL_DB", "AIGurukul.db"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per concurrency level")
+    parser.add_argument("--sync-port", type=int, default=8768)
+    parser.add_argument("--async-port", type=int, default=8769)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    # Inherited by the server processes
+    db_path = scratch_db(args.db)
+    os.environ["AIGURUKUL_DB"] = db_path
+    os.environ["BANKING_API_URL"] = f"http://127.0.0.1:{args.async_port}"
+    ports = {"sync": args.sync_port, "async": args.async_port}
+    servers = [serve("bench_async_api:build_sync_app", args.sync_port, factory=True),
+               serve("main:app", args.async_port)]
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    users = [dict(row) for row in conn.execute("SELECT username, password, accountId FROM UserDetails LIMIT 500")]
+    conn.close()
+
+    report = {"db": args.db, "requests": args.requests, "db_workers": DB_WORKERS, "levels": []}
+    try:
+        for concurrency in args.concurrency:
+            level = {"concurrency": concurrency}
+            for mode, port in ports.items():
+                level[mode] = asyncio.run(run_load(f"http://127.0.0.1:{port}", users, concurrency, args.requests))
+            report["levels"].append(level)
+    finally:
+        for process in servers:
+            process.terminate()
+            process.wait()
+
+    print(f"\n{args.requests} requests per level (balance / transactions / statements / login mix), "
+          f"{report['db_workers']} DB workers")
+    print(f"{'concurrency':<13}{'mode':<7}{'req/s':>9}{'p50':>11}{'p95':>11}{'p99':>11}{'errors':>8}")
+    for level in report["levels"]:
+        for mode in ports:
+            r = level[mode]
+            print(f"{level['concurrency']:<13}{mode:<7}{r['throughput_rps']:>9}{r['p50_ms']:>9.2f}ms"
+                  f"{r['p95_ms']:>9.2f}ms{r['p99_ms']:>9.2f}ms{r['errors']:>8}")
+        level["speedup"] = round(level["async"]["throughput_rps"] / level["sync"]["throughput_rps"], 2) \
+            if level["sync"]["throughput_rps"] else None
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
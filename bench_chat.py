@@ -0,0 +1,213 @@
+"""
+End-to-end load benchmark for /chat, fully offline.
+
+Starts mock_ollama.MockOllama and main.app (uvicorn) in this process, logs
+every user in UserDetails in through /login, then fires /chat requests at a
+target concurrency and reports latency percentiles, throughput and LLM calls
+per request.
+
+Run from the project folder:
+    python bench_chat.py
+    python bench_chat.py --concurrency 16 --requests 200 --latency-ms 500 --json chat_report.json
+    python bench_chat.py --max-p95-ms 8000 --max-llm-calls 3   # exit 1 on regression (CI)
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import numpy as np
+
+from mock_ollama import MockOllama
+
+# Mix of questions that exercise the main pipeline paths
+QUESTIONS = [
+    "what is my account balance",
+    "show my last 5 transactions",
+    "why did my balance change this month compared to last month",
+    "compare my balance with last quarter's statements",
+    "how much did I spend on payments recently",
+    "download my monthly statement",
+    "what's the weather in sydney",
+]
+
+ERROR_PREFIX = "I encountered an error"
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+SAMPLE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AIGurukul.db")
+
+
+def scratch_db(path: str) -> str:
+    """
+    Path the benchmarked app should use for `path`: the checked-in sample
+    database is copied to a temp folder first, so starting the app (WAL,
+    migrations) and the benchmark's logins never modify it. Generated
+    databases are used in place.
+    """
+    if not (os.path.exists(path) and os.path.samefile(path, SAMPLE_DB)):
+        return path
+    return shutil.copy(path, os.path.join(tempfile.mkdtemp(prefix="bench_db_"), os.path.basename(path)))
+
+
+def start_api(port: int):
+    """Serve main.app with uvicorn in a daemon thread; returns (server, app module)"""
+    import uvicorn
+    import main
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-api", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, main
+
+
+async def run_load(base_url: str, users: list, concurrency: int, total: int) -> dict:
+    latencies_ms, errors = [], 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        tokens = []
+        for username, password in users:
+            r = await client.post("/login", json={"username": username, "password": password})
+            r.raise_for_status()
+            tokens.append(r.json()["token"])
+
+        before = (await client.get("/metrics")).json()
+        jobs = asyncio.Queue()
+        for i in range(total):
+            jobs.put_nowait(i)
+
+        async def worker():
+            nonlocal errors
+            while not jobs.empty():
+                i = jobs.get_nowait()
+                payload = {"message": QUESTIONS[i % len(QUESTIONS)], "token": tokens[i % len(tokens)]}
+                started = time.perf_counter()
+                try:
+                    r = await client.post("/chat", json=payload)
+                    failed = r.status_code != 200 or r.json()["response"].startswith(ERROR_PREFIX)
+                except httpx.HTTPError:
+                    failed = True
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        after = (await client.get("/metrics")).json()
+
+    served = after["agent"]["requests"] - before["agent"]["requests"]
+    llm_calls = after["agent"]["llm_calls"] - before["agent"]["llm_calls"]
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 1),
+            "p95": round(percentile(latencies_ms, 95), 1),
+            "p99": round(percentile(latencies_ms, 99), 1),
+            "max": round(max(latencies_ms), 1),
+        },
+        "llm_calls_per_request": round(llm_calls / served, 2) if served else 0.0,
+        "llm_gateway": after.get("llm_gateway"),
+        "single_flight": after.get("single_flight"),
+    }
+
+
+def print_report(report: dict):
+    latency = report["latency_ms"]
+    print(f"\n/chat x {report['requests']} at concurrency {report['concurrency']} "
+          f"({report['errors']} errors) in {report['elapsed_s']} s")
+    print(f"Throughput: {report['throughput_rps']} req/s")
+    print(f"Latency: p50 {latency['p50']} ms | p95 {latency['p95']} ms | p99 {latency['p99']} ms | max {latency['max']} ms")
+    print(f"LLM calls per request: {report['llm_calls_per_request']}")
+    if report.get("mock_ollama"):
+        print(f"Mock Ollama calls by prompt kind: {report['mock_ollama']['by_kind']}")
+    gateway = report.get("llm_gateway")
+    if gateway:
+        print(f"Gateway queue wait: p50 {gateway['wait_ms_p50']} ms | p95 {gateway['wait_ms_p95']} ms | max {round(gateway['wait_ms_max'], 1)} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end /chat load benchmark")
+    parser.add_argument("--db", default=os.getenv("AIGURUKUL_DB", "AIGurukul.db"),
+                        help="Database to serve (the checked-in sample is copied first)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mock Ollama time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=40)
+    parser.add_argument("--final-tokens", type=int, default=60)
+    parser.add_argument("--parallel", type=int, default=1, help="Generations the mock serves at once")
+    parser.add_argument("--mock-port", type=int, default=11500)
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--real-ollama", action="store_true", help="Use OLLAMA_BASE_URL instead of the mock")
+    parser.add_argument("--keep-caches", action="store_true", help="Leave the semantic answer cache on")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's per-request logging")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail (exit 1) if p95 latency is above this")
+    parser.add_argument("--max-llm-calls", type=float, help="Fail (exit 1) if LLM calls per request is above this")
+    args = parser.parse_args()
+
+    mock = None
+    if not args.real_ollama:
+        mock = MockOllama(port=args.mock_port, latency_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec,
+                          final_token_count=args.final_tokens, parallel=args.parallel).start()
+        os.environ["OLLAMA_BASE_URL"] = mock.url
+    # Must be set before main is imported: the app migrates its database on
+    # startup, with TOOL_TRANSPORT=http the tools call back into this server,
+    # and the insights refresher must not touch the real report file
+    os.environ["AIGURUKUL_DB"] = scratch_db(args.db)
+    os.environ["BANKING_API_URL"] = f"http://127.0.0.1:{args.api_port}"
+    os.environ.setdefault("INSIGHTS_REPORTS_PATH", os.path.join(tempfile.mkdtemp(), "insights_reports.json"))
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        server, app_module = start_api(args.api_port)
+        if not args.keep_caches:
+            app_module.answer_cache.max_entries = 0  # every request runs the full pipeline
+
+        from data_access import get_db_connection
+        conn = get_db_connection()
+        users = [(row["username"], row["password"]) for row in conn.execute("SELECT username, password FROM UserDetails")]
+
+        report = asyncio.run(run_load(f"http://127.0.0.1:{args.api_port}", users, args.concurrency, args.requests))
+        server.should_exit = True
+
+    if mock is not None:
+        report["mock_ollama"] = mock.stats()
+        mock.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+    failures = []
+    if args.max_p95_ms is not None and report["latency_ms"]["p95"] > args.max_p95_ms:
+        failures.append(f"p95 {report['latency_ms']['p95']} ms > {args.max_p95_ms} ms")
+    if args.max_llm_calls is not None and report["llm_calls_per_request"] > args.max_llm_calls:
+        failures.append(f"LLM calls per request {report['llm_calls_per_request']} > {args.max_llm_calls}")
+    if report["errors"]:
+        failures.append(f"{report['errors']} failed requests")
+    if failures:
+        print("❌ " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Per-query SQLite latency: a fresh connection per query (the old
+get_db_connection) vs the per-thread pooled connections of db_pool.py.
+
+Both run on temporary copies of the database, so AIGurukul.db is left
+untouched and the "fresh" copy keeps the default rollback journal.
+--writer adds a thread committing small writes in a loop, to show readers
+waiting on the writer without WAL.
+
+Run from the project folder:
+    python bench_db.py
+    python bench_db.py --iterations 2000 --concurrency 8 --writer --json db_report.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from db_pool import ConnectionPool
+
+# The queries behind /login and the /api/accounts/* routes
+QUERIES = {
+    "user_lookup": ("SELECT username, password, accountId FROM UserDetails WHERE username = ? AND password = ?",
+                    lambda user: (user["username"], user["password"])),
+    "balance": ("SELECT accountId, balanceAmount, currency, asOfDate FROM AccountBalance "
+                "WHERE accountId = ? ORDER BY asOfDate DESC LIMIT 1",
+                lambda user: (user["accountId"],)),
+    "transactions_page": ('SELECT transactionId, date, description, netAmount, type, "balance after" '
+                          "FROM TransactionHistory WHERE accountId = ? "
+                          "ORDER BY date DESC, transactionId DESC LIMIT 21",
+                          lambda user: (user["accountId"],)),
+    "spending_breakdown": ("SELECT type, COUNT(*), SUM(netAmount), SUM(grossAmount) FROM TransactionHistory "
+                           "WHERE accountId = ? AND status IN ('completed', 'pending') GROUP BY type",
+                           lambda user: (user["accountId"],)),
+    "periodic_statements": ("SELECT accountId, periodStartDate, periodEndDate, OpeningBalance, ClosingBalance "
+                            "FROM PeriodicStatement WHERE accountId = ? ORDER BY periodEndDate DESC",
+                            lambda user: (user["accountId"],)),
+}
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def fresh_query(path: str, sql: str, params: tuple):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def time_query(run, sql: str, params_for, users: list, iterations: int, concurrency: int) -> dict:
+    def one(i):
+        params = params_for(users[i % len(users)])
+        started = time.perf_counter()
+        try:
+            run(sql, params)
+        except sqlite3.OperationalError:  # "database is locked"
+            return None
+        return (time.perf_counter() - started) * 1e6
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(concurrency * 2)))  # warm up every worker thread
+        started = time.perf_counter()
+        results = list(pool.map(one, range(iterations)))
+        elapsed = time.perf_counter() - started
+
+    latencies_us = [r for r in results if r is not None]
+    return {
+        "errors": len(results) - len(latencies_us),
+        "p50_us": round(percentile(latencies_us, 50), 1),
+        "p95_us": round(percentile(latencies_us, 95), 1),
+        "p99_us": round(percentile(latencies_us, 99), 1),
+        "queries_per_sec": round(iterations / elapsed, 1),
+    }
+
+
+class Writer(threading.Thread):
+    """Commits one small insert after another until stopped"""
+
+    def __init__(self, path: str, wal: bool):
+        super().__init__(name="bench-writer", daemon=True)
+        self.path = path
+        self.wal = wal
+        self.stop = threading.Event()
+        self.commits = 0
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS BenchWrites (id INTEGER PRIMARY KEY, payload TEXT)")
+        while not self.stop.is_set():
+            with conn:
+                conn.execute("INSERT INTO BenchWrites (payload) VALUES (?)", ("x" * 256,))
+            self.commits += 1
+            time.sleep(0.001)
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fresh vs pooled SQLite connections")
+    parser.add_argument("--db", default=os.getenv("AIGURUKUL_DB", "AIGurukul.db"))
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--writer", action="store_true", help="Run a concurrent writer thread")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_db_")
+    fresh_path = shutil.copy(args.db, os.path.join(workdir, "fresh.db"))
+    pooled_path = shutil.copy(args.db, os.path.join(workdir, "pooled.db"))
+    pool = ConnectionPool()
+
+    conn = sqlite3.connect(fresh_path)
+    conn.row_factory = sqlite3.Row
+    users = [dict(row) for row in conn.execute("SELECT username, password, accountId FROM UserDetails")]
+    conn.close()
+
+    modes = {
+        "fresh": (fresh_path, lambda sql, params: fresh_query(fresh_path, sql, params)),
+        "pooled": (pooled_path, lambda sql, params: pool.connection(pooled_path).execute(sql, params).fetchall()),
+    }
+
+    report = {"iterations": args.iterations, "concurrency": args.concurrency, "writer": args.writer, "queries": {}}
+    for mode, (path, run) in modes.items():
+        writer = None
+        if args.writer:
+            writer = Writer(path, wal=mode == "pooled")
+            writer.start()
+        for name, (sql, params_for) in QUERIES.items():
+            report["queries"].setdefault(name, {})[mode] = time_query(
+                run, sql, params_for, users, args.iterations, args.concurrency
+            )
+        if writer is not None:
+            writer.stop.set()
+            writer.join()
+            report.setdefault("writer_commits", {})[mode] = writer.commits
+
+    pool.close_all()
+    report["pool"] = pool.stats()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{args.iterations} queries each, concurrency {args.concurrency}"
+          f"{', with a concurrent writer' if args.writer else ''}")
+    print(f"{'query':<22}{'fresh p50':>12}{'pooled p50':>12}{'fresh p95':>12}{'pooled p95':>12}{'speedup':>9}")
+    for name, result in report["queries"].items():
+        fresh, pooled = result["fresh"], result["pooled"]
+        result["speedup_p50"] = round(fresh["p50_us"] / pooled["p50_us"], 1) if pooled["p50_us"] else None
+        print(f"{name:<22}{fresh['p50_us']:>10.1f}us{pooled['p50_us']:>10.1f}us"
+              f"{fresh['p95_us']:>10.1f}us{pooled['p95_us']:>10.1f}us{result['speedup_p50']:>8}x")
+    if args.writer:
+        errors = {mode: sum(r[mode]["errors"] for r in report["queries"].values()) for mode in modes}
+        print(f"Writer commits: {report['writer_commits']} | reads failed with 'database is locked': {errors}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
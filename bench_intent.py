@@ -0,0 +1,132 @@
+"""
+Confusion-matrix and latency benchmark for the local intent classifier.
+
+Run from the project folder (needs the faiss_index and embedding model):
+    python bench_intent.py
+    python bench_intent.py --threshold 0.75 --json intent_report.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from intent_classifier import (
+    CLASSIFIER_AVAILABLE, CONFIDENCE_THRESHOLD, MIN_MARGIN, INTENT_EXEMPLARS, INTENT_TOOLS,
+    classifier, classify_intent
+)
+
+# Held-out questions (not in INTENT_EXEMPLARS) with the intent we expect
+EVAL_SET = [
+    ("what's my balance?", "balance"),
+    ("how much do i have in my account", "balance"),
+    ("tell me my available balance", "balance"),
+    ("current account balance", "balance"),
+    ("can you check how much money is left", "balance"),
+    ("balance", "balance"),
+    ("show my last transactions", "transactions"),
+    ("last 10 transactions please", "transactions"),
+    ("what did I spend money on recently", "transactions"),
+    ("list all my deposits and withdrawals", "transactions"),
+    ("show transaction history", "transactions"),
+    ("what were my latest payments", "transactions"),
+    ("download my statement", "documents"),
+    ("can I get my annual statement", "documents"),
+    ("i need the pdf of my june statement", "documents"),
+    ("download statements for 2025", "documents"),
+    ("monthly statement download", "documents"),
+    ("why is my balance lower than last month", "other"),
+    ("should I move money into bonds", "other"),
+    ("how much did I spend on fees last quarter compared to this one", "other"),
+    ("what's the weather in sydney", "other"),
+    ("write me a poem", "other"),
+    ("who is the prime minister", "other"),
+    ("explain what a unit price is", "other"),
+]
+
+FALLBACK = "llm"
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def run(threshold: float, min_margin: float) -> dict:
+    labels = list(INTENT_EXEMPLARS)
+    # Only intents in INTENT_TOOLS are ever routed locally; the rest go to the LLM
+    columns = list(INTENT_TOOLS) + [FALLBACK]
+
+    # Warm up: embeds the exemplars once and loads the model weights
+    classify_intent(classifier.embed("warm up"), threshold, min_margin)
+
+    confusion = {expected: {predicted: 0 for predicted in columns} for expected in labels}
+    latencies_ms = []
+
+    for question, expected in EVAL_SET:
+        started = time.perf_counter()
+        route = classify_intent(classifier.embed(question), threshold, min_margin)
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+
+        predicted = route["intent"] if route else FALLBACK
+        confusion[expected][predicted] += 1
+
+    routed = sum(confusion[e][p] for e in labels for p in INTENT_TOOLS)
+    correct = sum(confusion[label][label] for label in INTENT_TOOLS)
+    wrong_routes = routed - correct
+
+    return {
+        "threshold": threshold,
+        "min_margin": min_margin,
+        "questions": len(EVAL_SET),
+        "confusion_matrix": confusion,
+        "routed_locally": routed,
+        "coverage": round(routed / len(EVAL_SET), 3),
+        "routed_accuracy": round(correct / routed, 3) if routed else 0.0,
+        "wrong_tool_routes": wrong_routes,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p95": round(percentile(latencies_ms, 95), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "max": round(max(latencies_ms), 2),
+        },
+    }
+
+
+def print_report(report: dict):
+    confusion = report["confusion_matrix"]
+    columns = list(next(iter(confusion.values())))
+
+    print(f"\nConfusion matrix (rows = expected, columns = predicted, '{FALLBACK}' = sent to LLM router)")
+    print(f"{'':>14}" + "".join(f"{c:>14}" for c in columns))
+    for expected, row in confusion.items():
+        print(f"{expected:>14}" + "".join(f"{row[c]:>14}" for c in columns))
+
+    print(f"\nThreshold {report['threshold']} / margin {report['min_margin']}")
+    print(f"Routed locally: {report['routed_locally']}/{report['questions']} (coverage {report['coverage']:.0%})")
+    print(f"Accuracy of local routes: {report['routed_accuracy']:.0%} ({report['wrong_tool_routes']} wrong)")
+    latency = report["latency_ms"]
+    print(f"Latency per question: p50 {latency['p50']} ms | p95 {latency['p95']} ms | p99 {latency['p99']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local intent classifier")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--min-margin", type=float, default=MIN_MARGIN)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    if not CLASSIFIER_AVAILABLE:
+        print("❌ Intent classifier not available - build the FAISS index and install the embedding model first")
+        return
+
+    report = run(args.threshold, args.min_margin)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+find_statement_files: per-request glob scans vs the in-memory statement index.
+
+Writes placeholder statement PDFs (13 per account, named like
+Account_docs) into a temporary directory, then for each directory size
+times the old glob implementation against StatementIndex: one-off build,
+per-lookup latency, and an incremental refresh after a file is added.
+
+Run from the project folder:
+    python bench_statements.py
+    python bench_statements.py --accounts 300 3000 20000 --lookups 200 --json statements_report.json
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from generate_data import write_statement_files
+from statement_index import StatementIndex
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def glob_find_statement_files(docs_dir: Path, account_id: int, statement_type: str = "all") -> list:
+    """The baseline: what main.find_statement_files did before the index (globs, stat per hit)"""
+    account_str = str(account_id)
+    patterns = []
+    if statement_type in ("monthly", "all"):
+        patterns += [f"*{account_str}*monthly*.pdf", f"*{account_str}*month*.pdf",
+                     f"{account_str}_monthly*.pdf", f"{account_str}_month*.pdf"]
+    if statement_type in ("annual", "all"):
+        patterns += [f"*{account_str}*annual*.pdf", f"*{account_str}*yearly*.pdf", f"*{account_str}*year*.pdf",
+                     f"{account_str}_annual*.pdf", f"{account_str}_year*.pdf"]
+    if statement_type == "all":
+        patterns += [f"*{account_str}*statement*.pdf", f"{account_str}_statement*.pdf", f"{account_str}*.pdf"]
+
+    files, seen = [], set()
+    for pattern in patterns:
+        for file_path in docs_dir.glob(pattern):
+            if file_path.name not in seen:
+                seen.add(file_path.name)
+                files.append({"name": file_path.name, "size": file_path.stat().st_size})
+    return files
+
+
+def time_lookups(find, account_ids: list, lookups: int) -> dict:
+    latencies_ms, found = [], 0
+    for i in range(lookups):
+        started = time.perf_counter()
+        found += len(find(account_ids[i % len(account_ids)]))
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(percentile(latencies_ms, 50), 4),
+        "p95_ms": round(percentile(latencies_ms, 95), 4),
+        "avg_files_found": round(found / lookups, 1),
+    }
+
+
+def bench_size(accounts: int, lookups: int, glob_lookups: int) -> dict:
+    docs_dir = Path(tempfile.mkdtemp(prefix="bench_statements_"))
+    try:
+        account_ids = np.arange(1065100000, 1065100000 + accounts)
+        write_statement_files(str(docs_dir), account_ids, 2025)
+        sample = np.random.default_rng(7).choice(account_ids, size=min(500, accounts), replace=False).tolist()
+
+        index = StatementIndex(docs_dir, refresh_interval=0)
+        started = time.perf_counter()
+        index.build()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        result = {
+            "accounts": accounts,
+            "files": accounts * 13,
+            "glob": time_lookups(lambda a: glob_find_statement_files(docs_dir, a), sample, glob_lookups),
+            "index": {"build_ms": round(build_ms, 1), **time_lookups(index.find, sample, lookups)},
+        }
+
+        # Incremental pick-up of a new file on the next lookup
+        time.sleep(0.01)
+        (docs_dir / f"{sample[0]}_monthly_statement_jan_2026.pdf").write_bytes(b"%PDF")
+        started = time.perf_counter()
+        assert index.find(sample[0])[0]["period"] == "2026-01"
+        result["index"]["refresh_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["speedup_p50"] = round(result["glob"]["p50_ms"] / result["index"]["p50_ms"], 1) \
+            if result["index"]["p50_ms"] else None
+        return result
+    finally:
+        shutil.rmtree(docs_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark glob scans vs the statement index")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[300, 3000, 10000],
+                        help="Directory sizes to test (13 PDFs per account)")
+    parser.add_argument("--lookups", type=int, default=2000, help="Index lookups per size")
+    parser.add_argument("--glob-lookups", type=int, default=50, help="Glob lookups per size (they are slow)")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    runs = [bench_size(accounts, args.lookups, args.glob_lookups) for accounts in args.accounts]
+
+    print(f"\n{'files':>9}{'glob p50':>13}{'glob p95':>13}{'index p50':>13}{'index p95':>13}"
+          f"{'build':>11}{'refresh':>11}{'speedup':>10}")
+    for run in runs:
+        g, i = run["glob"], run["index"]
+        print(f"{run['files']:>9,}{g['p50_ms']:>11.3f}ms{g['p95_ms']:>11.3f}ms{i['p50_ms']:>11.4f}ms"
+              f"{i['p95_ms']:>11.4f}ms{i['build_ms']:>9.1f}ms{i['refresh_ms']:>9.1f}ms{run['speedup_p50']:>9}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": runs}, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Per-tool latency: in-process data access vs the HTTP loopback MCP path.
+
+Starts main.app (uvicorn) in this process so the mcp_server tool functions
+have a banking API to call, then times every tool both ways. Both columns
+are uncached: "local" calls the data_access function itself, not
+execute_tool, so tool_cache never answers it. Warm tool_cache hits through
+execute_tool are reported separately as "cached".
+
+Run from the project folder:
+    python bench_tools.py
+    python bench_tools.py --iterations 500 --concurrency 8 --json tools_report.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_chat import scratch_db, start_api
+
+BENCH_TOOLS = [
+    "get_account_balance", "get_transaction_history", "get_periodic_statements", "get_adhoc_statements",
+    "get_spending_breakdown", "get_monthly_totals", "get_fee_summary", "get_balance_stats",
+]
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def time_tool(fn, account_id: int, iterations: int, concurrency: int) -> dict:
+    def one(_):
+        started = time.perf_counter()
+        fn(account_id=account_id)
+        return (time.perf_counter() - started) * 1000
+
+    try:
+        fn(account_id=account_id)  # warm up (and skip tools that fail outright)
+    except Exception as e:
+        return {"error": str(e)}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies_ms = list(pool.map(one, range(iterations)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "calls_per_sec": round(iterations / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process vs HTTP loopback tool calls")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--api-port", type=int, default=8766)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    os.environ["AIGURUKUL_DB"] = scratch_db(os.getenv("AIGURUKUL_DB", "AIGurukul.db"))
+    os.environ["BANKING_API_URL"] = f"http://127.0.0.1:{args.api_port}"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server, _ = start_api(args.api_port)
+        from mcp_server import TOOLS
+        from tool_executor import LOCAL_TOOLS, execute_tool
+        from tool_cache import tool_cache
+        from data_access import get_db_connection
+
+        conn = get_db_connection()
+        account_id = conn.execute("SELECT accountId FROM UserDetails LIMIT 1").fetchone()[0]
+
+        report = {"account_id": account_id, "iterations": args.iterations, "concurrency": args.concurrency, "tools": {}}
+        for name in BENCH_TOOLS:
+            tool_cache.invalidate_account(account_id)
+            report["tools"][name] = {
+                "http": time_tool(TOOLS[name], account_id, args.iterations, args.concurrency),
+                "local": time_tool(LOCAL_TOOLS[name], account_id, args.iterations, args.concurrency),
+                # the warm-up call fills the cache, so every timed call is a hit
+                "cached": time_tool(lambda account_id, name=name: execute_tool(name, {"account_id": account_id}),
+                                    account_id, args.iterations, args.concurrency),
+            }
+        server.should_exit = True
+
+    print(f"\n{args.iterations} calls per tool, concurrency {args.concurrency}")
+    print(f"{'tool':<26}{'http p50':>11}{'local p50':>11}{'http p95':>11}{'local p95':>11}{'speedup':>9}"
+          f"{'cached p50':>12}")
+    for name, result in report["tools"].items():
+        http, local, cached = result["http"], result["local"], result["cached"]
+        if "error" in http or "error" in local:
+            print(f"{name:<26}  skipped: {http.get('error') or local.get('error')}")
+            continue
+        result["speedup_p50"] = round(http["p50_ms"] / local["p50_ms"], 1) if local["p50_ms"] else None
+        cached_p50 = f"{cached['p50_ms']:>10.3f}ms" if "error" not in cached else f"{'-':>12}"
+        print(f"{name:<26}{http['p50_ms']:>9.2f}ms{local['p50_ms']:>9.2f}ms"
+              f"{http['p95_ms']:>9.2f}ms{local['p95_ms']:>9.2f}ms{result['speedup_p50']:>8}x{cached_p50}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+/chat throughput as the number of uvicorn worker processes grows.
+
+Starts mock_ollama.MockOllama in this process and, for each worker count,
+`uvicorn main:app --workers N` with a shared session backend, so a token
+issued by one worker is accepted by every other. Every user logs in
+(through whichever worker answers) and /chat is loaded at a fixed
+concurrency. The mock serves many generations at once, so the API tier,
+not the model, is what is measured.
+
+With SESSION_BACKEND=memory and more than one worker, requests that land
+on a worker which didn't issue the token fail with 401 - that is the
+problem the shared backends solve, and it shows up as errors here.
+
+Run from the project folder:
+    python bench_workers.py
+    python bench_workers.py --workers 1 2 4 8 --concurrency 32 --requests 400 --json workers_report.json
+    python bench_workers.py --session-backend redis   # needs REDIS_URL
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from bench_chat import ERROR_PREFIX, QUESTIONS, scratch_db
+from mock_ollama import MockOllama
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def start_workers(workers: int, port: int, env: dict) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/welcome", timeout=1).raise_for_status()
+            # every worker imports the app on its own; give the others time to come up
+            time.sleep(2 + workers)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError(f"uvicorn with {workers} workers did not start on port {port}")
+
+
+async def run_load(base_url: str, users: list, concurrency: int, total: int) -> dict:
+    latencies_ms, errors, unauthorized = [], 0, 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        tokens = []
+        for username, password in users:
+            r = await client.post("/login", json={"username": username, "password": password})
+            r.raise_for_status()
+            tokens.append(r.json()["token"])
+
+        counter = iter(range(total))
+
+        async def worker():
+            nonlocal errors, unauthorized
+            for i in counter:
+                payload = {"message": QUESTIONS[i % len(QUESTIONS)], "token": tokens[i % len(tokens)]}
+                started = time.perf_counter()
+                try:
+                    r = await client.post("/chat", json=payload)
+                    unauthorized += r.status_code == 401
+                    failed = r.status_code != 200 or r.json()["response"].startswith(ERROR_PREFIX)
+                except httpx.HTTPError:
+                    failed = True
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "unauthorized": unauthorized,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies_ms, 50), 1),
+        "p95_ms": round(percentile(latencies_ms, 95), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat throughput vs uvicorn worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=160, help="/chat requests per worker count")
+    parser.add_argument("--session-backend", default="sqlite", choices=["sqlite", "redis", "memory"])
+    parser.add_argument("--latency-ms", type=float, default=200, help="Mock Ollama time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=200)
+    parser.add_argument("--final-tokens", type=int, default=40)
+    parser.add_argument("--mock-port", type=int, default=11501)
+    parser.add_argument("--api-port", type=int, default=8770)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    mock = MockOllama(port=args.mock_port, latency_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec,
+                      final_token_count=args.final_tokens, parallel=256).start()
+    workdir = tempfile.mkdtemp(prefix="bench_workers_")
+    env = {
+        **os.environ,
+        "OLLAMA_BASE_URL": mock.url,
+        "BANKING_API_URL": f"http://127.0.0.1:{args.api_port}",
+        "INSIGHTS_REPORTS_PATH": os.path.join(workdir, "insights_reports.json"),
+        "SESSION_BACKEND": args.session_backend,
+        "SESSION_DB": os.path.join(workdir, "sessions.db"),
+        "AIGURUKUL_DB": scratch_db(os.getenv("AIGURUKUL_DB", "AIGurukul.db")),
+        "ANSWER_CACHE_MAX_ENTRIES": "0",  # every request runs the full pipeline
+    }
+
+    conn = sqlite3.connect(env["AIGURUKUL_DB"])
+    users = conn.execute("SELECT username, password FROM UserDetails LIMIT 100").fetchall()
+    conn.close()
+
+    report = {"session_backend": args.session_backend, "concurrency": args.concurrency, "runs": []}
+    for workers in args.workers:
+        process = start_workers(workers, args.api_port, env)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.api_port}", users, args.concurrency,
+                                          args.requests))
+        finally:
+            process.terminate()
+            process.wait()
+        report["runs"].append({"workers": workers, **result})
+        print(f"{workers} worker(s): {result['throughput_rps']} req/s, p50 {result['p50_ms']} ms, "
+              f"p95 {result['p95_ms']} ms, {result['errors']} errors ({result['unauthorized']} x 401)")
+
+    mock.stop()
+    base = report["runs"][0]["throughput_rps"]
+    for run in report["runs"]:
+        run["scaling"] = round(run["throughput_rps"] / base, 2) if base else None
+    print(f"\nScaling vs {report['runs'][0]['workers']} worker(s): "
+          + ", ".join(f"{run['workers']}w x{run['scaling']}" for run in report["runs"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+    if any(run["errors"] for run in report["runs"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
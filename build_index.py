@@ -1,54 +1,339 @@
+"""
+Build the FAISS index the RAG service loads from Account_docs.
+
+    python build_index.py                  # full rebuild
+    python build_index.py --incremental    # embed only new or changed files
+
+Every build writes faiss_index/manifest.json with each source file's
+SHA-256 and the IDs of its chunks in the index. An incremental build
+compares the docs folder with the manifest: unchanged files are skipped,
+vectors of changed and removed files are deleted by ID, and only new or
+changed files are loaded, split and embedded. If the embedding model or
+chunking settings changed since the manifest was written, it falls back
+to a full rebuild.
+
+Each build is saved to a new faiss_index.v-<timestamp> folder and
+faiss_index, a symlink, is switched to it with one atomic rename, so a
+reader never sees a half-written index or no index at all.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
 from pathlib import Path
+
 from langchain_community.document_loaders import CSVLoader, PyPDFLoader
 from langchain_text_splitters import CharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from index_paths import INDEX_DIR, KEEP_VERSIONS, VERSION_GLOB, resolve_index_dir, version_dir
+
 DOCS_DIR = Path("Account_docs")
-INDEX_DIR = "faiss_index"
+MANIFEST_NAME = "manifest.json"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
 
-def load_documents():
-    documents = []
+# Anything that changes the chunks or vectors forces a full rebuild
+BUILD_SETTINGS = {"embedding_model": EMBEDDING_MODEL, "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
 
-    # Load CSV
-    for csv_file in DOCS_DIR.glob("*.csv"):
-        loader = CSVLoader(str(csv_file), encoding="utf-8")
-        docs = loader.load()
-        for d in docs:
-            d.metadata["source"] = csv_file.name
-        documents.extend(docs)
 
-    # Load PDFs
-    for pdf_file in DOCS_DIR.glob("*.pdf"):
-        loader = PyPDFLoader(str(pdf_file))
-        docs = loader.load()
+def source_files(docs_dir: Path = DOCS_DIR) -> list:
+    return sorted(list(docs_dir.glob("*.csv")) + list(docs_dir.glob("*.pdf")))
 
+
+def load_file(path: Path) -> list:
+    """Documents (CSV rows, or split PDF chunks) of one source file"""
+    if path.suffix.lower() == ".csv":
+        docs = CSVLoader(str(path), encoding="utf-8").load()
+    else:
         splitter = CharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP
         )
-        split_docs = splitter.split_documents(docs)
+        docs = splitter.split_documents(PyPDFLoader(str(path)).load())
 
-        for d in split_docs:
-            d.metadata["source"] = pdf_file.name
+    for d in docs:
+        d.metadata["source"] = path.name
+    return docs
 
-        documents.extend(split_docs)
 
+def load_documents(docs_dir: Path = DOCS_DIR):
+    documents = []
+    for path in source_files(docs_dir):
+        documents.extend(load_file(path))
     return documents
 
 
-def main():
-    docs = load_documents()
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(name: str, sha256: str, count: int) -> list:
+    """Stable IDs, unique per file version, so old chunks can be deleted by ID"""
+    return [f"{name}:{sha256[:16]}:{i}" for i in range(count)]
+
+
+# ─────────────────────────────────────────────
+# MANIFEST
+# ─────────────────────────────────────────────
+def read_manifest(index_dir: str = INDEX_DIR):
+    path = Path(index_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest: dict, directory: Path):
+    """
+    Write manifest.json via a uniquely named temporary file and os.replace,
+    so a reader (or a concurrent build) only ever sees a complete manifest
+    """
+    fd, staging = tempfile.mkstemp(dir=directory, prefix=f"{MANIFEST_NAME}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, Path(directory) / MANIFEST_NAME)
+    except BaseException:
+        os.unlink(staging)
+        raise
+
+
+def scan(docs_dir: Path, manifest: dict) -> dict:
+    """
+    Sort the docs folder against the manifest.
+
+    Files whose size and mtime match the manifest are not re-hashed; a
+    file that was only touched hashes the same and is still skipped.
+
+    Returns:
+        {"unchanged": {name: entry}, "new": {name: entry}, "changed": {name: entry},
+         "removed": [names]} - entries carry sha256, size and mtime
+    """
+    known = manifest["files"] if manifest else {}
+    result = {"unchanged": {}, "new": {}, "changed": {}, "removed": []}
+    seen = set()
+
+    for path in source_files(docs_dir):
+        seen.add(path.name)
+        stat_result = path.stat()
+        previous = known.get(path.name)
+        if previous and previous["size"] == stat_result.st_size and previous["mtime"] == stat_result.st_mtime:
+            result["unchanged"][path.name] = previous
+            continue
+
+        entry = {"sha256": file_hash(path), "size": stat_result.st_size, "mtime": stat_result.st_mtime}
+        if previous is None:
+            result["new"][path.name] = entry
+        elif previous["sha256"] == entry["sha256"]:
+            result["unchanged"][path.name] = {**previous, "mtime": entry["mtime"]}
+        else:
+            result["changed"][path.name] = entry
+
+    result["removed"] = [name for name in known if name not in seen]
+    return result
+
+
+# ─────────────────────────────────────────────
+# ATOMIC SAVE
+# faiss_index is a symlink to a versioned sibling folder (see
+# index_paths.py). A build writes a new version folder and swaps the link
+# with a single os.replace, so a loader always finds a complete index -
+# there is no moment without one.
+# ─────────────────────────────────────────────
+def _prune_versions(target: Path, keep: int = KEEP_VERSIONS):
+    versions = sorted(target.parent.glob(VERSION_GLOB.format(name=target.name)), key=lambda path: path.name)
+    current = target.resolve() if target.is_symlink() else None
+    for path in versions[:-keep]:
+        if path.resolve() != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def save_atomically(vectorstore, manifest: dict, index_dir: str = INDEX_DIR):
+    """
+    Write index + manifest to a new version folder, then point index_dir
+    at it.
+
+    The first build after the old layout (index_dir a real folder) moves
+    that folder aside as a version first; resolve_index_dir covers the
+    instant between the two renames. Where symlinks are not available
+    (Windows without developer mode) the swap is two renames with the
+    same fallback.
+    """
+    target = Path(index_dir)
+    version = version_dir(index_dir, time.time_ns())
+    vectorstore.save_local(str(version))
+    write_manifest(manifest, version)
+
+    link = target.with_name(f"{target.name}.link-{os.getpid()}")
+    try:
+        if link.is_symlink():
+            link.unlink()
+        os.symlink(version.name, link, target_is_directory=True)
+    except (OSError, NotImplementedError) as e:
+        print(f"⚠️ Symlinks unavailable ({e}); swapping {index_dir} with two renames")
+        retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+        if target.exists():
+            os.replace(target, retired)
+        os.replace(version, target)
+        shutil.rmtree(retired, ignore_errors=True)
+        return
+
+    if target.exists() and not target.is_symlink():
+        os.replace(target, target.with_name(f"{target.name}.v-0-legacy"))
+    os.replace(link, target)
+    _prune_versions(target)
+
+
+# ─────────────────────────────────────────────
+# BUILDS
+# ─────────────────────────────────────────────
+def embed_files(files: dict, docs_dir: Path):
+    """Load and split `files`; returns (documents, ids, manifest entries with chunk_ids)"""
+    documents, ids, entries = [], [], {}
+    for name, entry in files.items():
+        docs = load_file(docs_dir / name)
+        entry_ids = chunk_ids(name, entry["sha256"], len(docs))
+        documents.extend(docs)
+        ids.extend(entry_ids)
+        entries[name] = {**entry, "chunk_ids": entry_ids}
+    return documents, ids, entries
+
+
+def full_build(embeddings, docs_dir: Path = DOCS_DIR, index_dir: str = INDEX_DIR) -> dict:
+    started = time.perf_counter()
+    scanned = scan(docs_dir, None)
+    docs, ids, entries = embed_files(scanned["new"], docs_dir)
     print(f"Loaded {len(docs)} documents")
+    if not docs:
+        raise ValueError(f"No CSV or PDF documents found in {docs_dir}")
+
+    embed_started = time.perf_counter()
+    vectorstore = FAISS.from_documents(docs, embeddings, ids=ids)
+    embed_seconds = time.perf_counter() - embed_started
+
+    manifest = {**BUILD_SETTINGS, "files": entries, "seconds_per_chunk": embed_seconds / len(docs)}
+    save_atomically(vectorstore, manifest, index_dir)
+    return {
+        "mode": "full",
+        "files_total": len(entries),
+        "files_skipped": 0,
+        "files_added": len(entries),
+        "files_changed": 0,
+        "files_removed": 0,
+        "chunks_embedded": len(docs),
+        "chunks_deleted": 0,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "time_saved_s": 0.0,
+    }
+
+
+def incremental_build(embeddings, docs_dir: Path = DOCS_DIR, index_dir: str = INDEX_DIR) -> dict:
+    """
+    Raises:
+        ValueError: no documents at all (from the full-build fallback)
+    """
+    try:
+        live = resolve_index_dir(index_dir)
+    except FileNotFoundError:
+        live = None
+    manifest = read_manifest(live) if live else None
+    if manifest is None:
+        print("No manifest or index yet - running a full build")
+        return full_build(embeddings, docs_dir, index_dir)
+    if any(manifest.get(key) != value for key, value in BUILD_SETTINGS.items()):
+        print("Embedding model or chunking changed since the last build - running a full build")
+        return full_build(embeddings, docs_dir, index_dir)
+
+    started = time.perf_counter()
+    scanned = scan(docs_dir, manifest)
+    stale = scanned["removed"] + list(scanned["changed"])
+    stale_ids = [chunk_id for name in stale for chunk_id in manifest["files"][name]["chunk_ids"]]
+    pending = {**scanned["new"], **scanned["changed"]}
+
+    files = dict(scanned["unchanged"])
+    report = {
+        "mode": "incremental",
+        "files_total": len(files) + len(pending),
+        "files_skipped": len(scanned["unchanged"]),
+        "files_added": len(scanned["new"]),
+        "files_changed": len(scanned["changed"]),
+        "files_removed": len(scanned["removed"]),
+        "chunks_embedded": 0,
+        "chunks_deleted": len(stale_ids),
+    }
+
+    # Nothing to embed or delete; a fallback version folder (index_dir lost
+    # mid-swap) still goes through save_atomically to restore index_dir
+    if not pending and not stale_ids and live == str(Path(index_dir)):
+        if files != manifest["files"]:  # only mtimes moved
+            # The index itself is unchanged, so the live folder only gets the
+            # new manifest, swapped in whole by write_manifest
+            write_manifest({**manifest, "files": files}, Path(live).resolve())
+        skipped_chunks = sum(len(entry["chunk_ids"]) for entry in files.values())
+        return {**report, "elapsed_s": round(time.perf_counter() - started, 2),
+                "time_saved_s": round(skipped_chunks * manifest.get("seconds_per_chunk", 0.0), 2)}
+
+    vectorstore = FAISS.load_local(live, embeddings, allow_dangerous_deserialization=True)
+    if stale_ids:
+        vectorstore.delete(stale_ids)
+
+    seconds_per_chunk = manifest.get("seconds_per_chunk", 0.0)
+    docs, ids, entries = embed_files(pending, docs_dir)
+    if docs:
+        embed_started = time.perf_counter()
+        vectorstore.add_documents(docs, ids=ids)
+        seconds_per_chunk = (time.perf_counter() - embed_started) / len(docs)
+    files.update(entries)
+
+    save_atomically(vectorstore, {**BUILD_SETTINGS, "files": files, "seconds_per_chunk": seconds_per_chunk},
+                    index_dir)
+    skipped_chunks = sum(len(entry["chunk_ids"]) for name, entry in files.items() if name not in entries)
+    return {
+        **report,
+        "chunks_embedded": len(docs),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        # what re-embedding the skipped files would have cost at this run's rate
+        "time_saved_s": round(skipped_chunks * seconds_per_chunk, 2),
+    }
+
+
+def print_report(report: dict):
+    print(f"FAISS index {'created' if report['mode'] == 'full' else 'updated'} successfully ({report['mode']})")
+    print(f"Files: {report['files_total']} total, {report['files_skipped']} skipped, {report['files_added']} added, "
+          f"{report['files_changed']} changed, {report['files_removed']} removed")
+    print(f"Chunks: {report['chunks_embedded']} embedded, {report['chunks_deleted']} deleted")
+    print(f"Took {report['elapsed_s']} s, saved ~{report['time_saved_s']} s of embedding")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FAISS index from the account documents")
+    parser.add_argument("--incremental", action="store_true", help="Embed only new or changed files")
+    parser.add_argument("--docs-dir", default=str(DOCS_DIR))
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
 
     embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
+        model_name=EMBEDDING_MODEL
     )
 
-    vectorstore = FAISS.from_documents(docs, embeddings)
-    vectorstore.save_local(INDEX_DIR)
+    build = incremental_build if args.incremental else full_build
+    report = build(embeddings, Path(args.docs_dir), args.index_dir)
+    print_report(report)
 
-    print("FAISS index created successfully")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
 
 
 if __name__ == "__main__":
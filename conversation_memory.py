@@ -0,0 +1,217 @@
+"""
+Token-aware conversation memory shared by the planner and the agent.
+
+Histories live in session_store (so every worker sees them, and the
+memory backend's LRU / TTL / byte caps bound them). On top of that, a
+history whose estimated token count passes MEMORY_TOKEN_BUDGET - or that
+would overflow the store's MAX_HISTORY_MESSAGES - is compacted: all but
+the newest MEMORY_KEEP_MESSAGES messages are folded into a running
+summary, stored as a system message at the head of the history.
+
+Agent prompts get context(): the summary plus as many recent turns as fit
+in MEMORY_CONTEXT_TOKENS, never the full history.
+
+MEMORY_SUMMARIZER picks how older turns are summarised:
+    extractive - the first line of every turn, newest kept (default, no LLM call)
+    llm        - a background-priority LLM call, falling back to extractive
+"""
+import json
+import os
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, message_to_dict
+
+from llm_gateway import gateway, PRIORITY_BACKGROUND
+from session_store import session_store
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", 1200))
+MEMORY_KEEP_MESSAGES = int(os.getenv("MEMORY_KEEP_MESSAGES", 4))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", 250))
+MEMORY_CONTEXT_TOKENS = int(os.getenv("MEMORY_CONTEXT_TOKENS", 600))
+MEMORY_SUMMARIZER = os.getenv("MEMORY_SUMMARIZER", "extractive")
+
+SUMMARY_MARKER = "summary"  # additional_kwargs flag on the summary message
+ROLE_NAMES = {"human": "User", "ai": "Assistant"}
+SUMMARY_LINE_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting"""
+    return (len(text) + 3) // 4
+
+
+def message_text(message: dict) -> str:
+    return str(message.get("data", {}).get("content", ""))
+
+
+def is_summary(message: dict) -> bool:
+    return message.get("type") == "system" and message.get("data", {}).get("additional_kwargs", {}).get(SUMMARY_MARKER)
+
+
+def _turn_line(message: dict) -> str:
+    text = " ".join(message_text(message).split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 3] + "..."
+    return f"{ROLE_NAMES.get(message.get('type'), message.get('type'))}: {text}"
+
+
+def extractive_summary(previous: str, messages: list, max_tokens: int) -> str:
+    """
+    Append one clipped line per message to the previous summary, dropping
+    the oldest lines until it fits in max_tokens.
+    """
+    lines = (previous.splitlines() if previous else []) + [_turn_line(m) for m in messages]
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def llm_summary(previous: str, messages: list, max_tokens: int) -> str:
+    """Summarise with the LLM at background priority; extractive on any failure"""
+    transcript = "\n".join(_turn_line(m) for m in messages)
+    prompt = f"""
+Summarise this banking-assistant conversation for the assistant's own memory.
+Keep facts the user may refer back to: dates, amounts, transaction types,
+statement periods and what was asked. At most {max_tokens * 3 // 4} words.
+Never include full account numbers.
+
+Summary so far:
+{previous or "(none)"}
+
+New turns:
+{transcript}
+
+Updated summary:
+"""
+    try:
+        summary = gateway.invoke(prompt, PRIORITY_BACKGROUND).strip()
+        if summary:
+            return summary
+    except Exception as e:
+        print(f"⚠️ LLM summary failed, using extractive summary: {e}")
+    return extractive_summary(previous, messages, max_tokens)
+
+
+SUMMARIZERS = {"extractive": extractive_summary, "llm": llm_summary}
+
+
+class ConversationMemory:
+    """
+    Chat histories (langchain message dicts, oldest first) with token-aware
+    compaction. Stateless apart from counters: the session store holds the
+    data, so any worker can serve any session.
+    """
+
+    def __init__(self, store=session_store, token_budget: int = MEMORY_TOKEN_BUDGET,
+                 keep_messages: int = MEMORY_KEEP_MESSAGES, summary_tokens: int = MEMORY_SUMMARY_TOKENS,
+                 summarizer=None):
+        self.store = store
+        self.token_budget = token_budget
+        # the summary takes one of the store's message slots
+        self.keep_messages = max(1, min(keep_messages, store.max_messages - 1))
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or SUMMARIZERS.get(MEMORY_SUMMARIZER, extractive_summary)
+        self._lock = threading.Lock()
+        self.metrics = {"appends": 0, "compactions": 0, "messages_summarized": 0, "tokens_saved": 0}
+
+    def messages(self, session_id: str) -> list:
+        """The stored history, summary message (if any) first"""
+        return self.store.get_messages(session_id)
+
+    def _split(self, messages: list):
+        if messages and is_summary(messages[0]):
+            return message_text(messages[0]), messages[1:]
+        return "", messages
+
+    def append(self, session_id: str, new_messages: list):
+        """
+        Add messages, compacting the history first if it would go over budget.
+
+        Holds the store's history_lock, so a compaction in one worker cannot
+        drop turns another worker appends while the summary is written.
+        """
+        with self._lock:
+            self.metrics["appends"] += 1
+        with self.store.history_lock(session_id):
+            self._append(session_id, new_messages)
+
+    def _append(self, session_id: str, new_messages: list):
+        summary, turns = self._split(self.messages(session_id))
+        turns = turns + list(new_messages)
+        tokens = estimate_tokens(summary) + sum(estimate_tokens(message_text(m)) for m in turns)
+        slots = self.store.max_messages - (1 if summary else 0)
+        if tokens <= self.token_budget and len(turns) <= slots:
+            self.store.append_messages(session_id, list(new_messages))
+            return
+
+        older, turns = turns[:-self.keep_messages], turns[-self.keep_messages:]
+        summary = self.summarizer(summary, older, self.summary_tokens)
+        compacted = [message_to_dict(SystemMessage(content=summary, additional_kwargs={SUMMARY_MARKER: True}))] + turns
+        self.store.replace_messages(session_id, compacted)
+        with self._lock:
+            self.metrics["compactions"] += 1
+            self.metrics["messages_summarized"] += len(older)
+            self.metrics["tokens_saved"] += max(0, tokens - self._tokens(compacted))
+
+    def remember_turn(self, session_id: str, question: str, answer: str):
+        """Record one user question and the assistant's reply"""
+        self.append(session_id, [message_to_dict(HumanMessage(content=question)),
+                                 message_to_dict(AIMessage(content=answer))])
+
+    def context(self, session_id: str, max_tokens: int = MEMORY_CONTEXT_TOKENS) -> str:
+        """
+        Earlier conversation for a prompt: the summary, then the newest turns
+        that still fit in max_tokens. Empty string for a new session.
+        """
+        summary, turns = self._split(self.messages(session_id))
+        budget = max_tokens - estimate_tokens(summary)
+        recent = []
+        for message in reversed(turns):
+            line = _turn_line(message)
+            budget -= estimate_tokens(line)
+            if budget < 0:
+                break
+            recent.append(line)
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier turns:\n{summary}")
+        if recent:
+            parts.append("Recent turns:\n" + "\n".join(reversed(recent)))
+        return "\n\n".join(parts)
+
+    def clear(self, session_id: str):
+        self.store.clear_messages(session_id)
+
+    def sessions(self) -> list:
+        return self.store.history_sessions()
+
+    def _tokens(self, messages: list) -> int:
+        return sum(estimate_tokens(message_text(m)) for m in messages)
+
+    def usage(self, session_id: str) -> dict:
+        """Memory used by one session's history"""
+        messages = self.messages(session_id)
+        summary, turns = self._split(messages)
+        return {
+            "session_id": session_id,
+            "messages": len(turns),
+            "has_summary": bool(summary),
+            "tokens": self._tokens(messages),
+            "summary_tokens": estimate_tokens(summary),
+            "bytes": sum(len(json.dumps(m)) for m in messages),
+        }
+
+    def stats(self, top: int = 5) -> dict:
+        """Totals from the store plus the largest sessions"""
+        with self._lock:
+            metrics = dict(self.metrics)
+        return {
+            **metrics,
+            "token_budget": self.token_budget,
+            "store": self.store.stats(),
+            "largest_sessions": self.store.history_usage(top),
+        }
+
+
+conversation_memory = ConversationMemory()
@@ -0,0 +1,481 @@
+import base64
+import json
+import os
+import re
+from datetime import datetime
+
+from db_pool import db_executor, db_pool
+
+# AIGURUKUL_DB points the app at another database, e.g. one made by generate_data.py
+DB_NAME = os.getenv("AIGURUKUL_DB", "AIGurukul.db")
+
+
+def get_db_connection():
+    """The calling thread's pooled connection to DB_NAME - do not close it"""
+    return db_pool.connection(DB_NAME)
+
+
+# Per-table version probes - each is an aggregate over one account's rows,
+# so it only changes when they do
+TABLE_VERSION_QUERIES = {
+    "AccountBalance": "SELECT MAX(asOfDate), COUNT(*) FROM AccountBalance WHERE accountId = ?",
+    "TransactionHistory": "SELECT MAX(rowid), COUNT(*), MAX(date) FROM TransactionHistory WHERE accountId = ?",
+    "PeriodicStatement": "SELECT MAX(periodEndDate), COUNT(*) FROM PeriodicStatement WHERE accountId = ?",
+    "AdHocStatement": "SELECT MAX(requestTimestamp), COUNT(*) FROM AdHocStatement WHERE accountId = ?",
+}
+
+
+def get_account_data_version(account_id: int) -> str:
+    """
+    Cheap fingerprint of an account's rows.
+
+    Changes whenever a new balance snapshot (asOfDate), transaction,
+    periodic or ad-hoc statement is added for the account, so caches keyed
+    on it are invalidated without tracking writes. Built from the same
+    probes as the tool cache's per-table versions.
+    """
+    return get_table_data_version(account_id, TABLE_VERSION_QUERIES)
+
+
+def get_table_data_version(account_id: int, tables) -> str:
+    """Like get_account_data_version, but only for the given tables"""
+    conn = get_db_connection()
+    parts = []
+    for table in tables:
+        row = conn.execute(TABLE_VERSION_QUERIES[table], (account_id,)).fetchone()
+        parts.append(",".join("" if value is None else str(value) for value in row))
+    return "|".join(parts)
+
+# ─────────────────────────────────────────────
+# ACCOUNT QUERIES
+# Shared by the REST routes in main.py and the in-process agent tools
+# (tool_executor.py), so tool calls don't loop back over HTTP.
+# ─────────────────────────────────────────────
+class AccountNotFound(LookupError):
+    pass
+
+
+def get_account_balance(account_id: int) -> dict:
+    """Latest balance snapshot of the account"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT accountId, balanceAmount, currency, asOfDate
+        FROM AccountBalance
+        WHERE accountId = ?
+        ORDER BY asOfDate DESC
+        LIMIT 1
+    """, (account_id,))
+
+    row = cursor.fetchone()
+
+    if not row:
+        raise AccountNotFound(f"Account {account_id} not found")
+
+    return dict(row)
+
+
+# Columns get_transaction_history can project (transactionId and date are
+# always returned - the cursor is built from them). Names are matched
+# case-insensitively; rows use these spellings as keys ("balance After" is
+# the key the transactions API has always returned).
+TRANSACTION_FIELDS = [
+    "transactionId", "date", "type", "grossAmount", "netAmount", "currency",
+    "description", "productCode", "investmentOption", "status", "balance After",
+]
+DEFAULT_TRANSACTION_FIELDS = ["transactionId", "date", "description", "netAmount", "type", "balance After"]
+_TRANSACTION_FIELD_NAMES = {field.lower(): field for field in TRANSACTION_FIELDS}
+MAX_TRANSACTION_PAGE = 500
+
+
+def encode_cursor(date: str, transaction_id: str) -> str:
+    raw = json.dumps([date, transaction_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(date), str(transaction_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [str(v) for v in value]
+
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _check_date(name: str, value: str):
+    """A bad date would silently match nothing in SQLite, so refuse it"""
+    try:
+        if not _ISO_DATE.match(value):
+            raise ValueError
+        datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD), got {value!r}") from None
+
+
+def _transaction_filters(account_id, startDate=None, endDate=None, transactionType=None, productCode=None,
+                         status=None):
+    """
+    WHERE clause (without the keyword) and params shared by the transaction queries
+
+    Raises:
+        ValueError: startDate or endDate is not a date
+    """
+    where = "accountId = ?"
+    params = [account_id]
+
+    for name, value in (("startDate", startDate), ("endDate", endDate)):
+        if value:
+            _check_date(name, value)
+
+    if startDate:
+        where += " AND date >= ?"
+        params.append(startDate)
+
+    if endDate:
+        # Dates carry a time, so compare against the start of the next day
+        where += " AND date < date(?, '+1 day')"
+        params.append(endDate)
+
+    for column, values in (("type", transactionType), ("productCode", productCode), ("status", status)):
+        values = _as_list(values)
+        if values:
+            where += f" AND {column} IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+
+    return where, params
+
+
+def get_transaction_history(
+    account_id: int,
+    startDate: str = None,
+    endDate: str = None,
+    transactionType=None,
+    productCode=None,
+    status=None,
+    limit: int = None,
+    cursor: str = None,
+    fields=None,
+) -> dict:
+    """
+    Transactions of the account, newest first.
+
+    Args:
+        startDate / endDate: inclusive date range (YYYY-MM-DD)
+        transactionType / productCode / status: one value, a list or a
+            comma-separated string
+        limit: page size (capped at MAX_TRANSACTION_PAGE); no limit returns
+            every matching row
+        cursor: nextCursor of the previous page
+        fields: columns to return (see TRANSACTION_FIELDS)
+
+    Returns:
+        {"accountId", "transactions", "count", "nextCursor"} - nextCursor is
+        None on the last page
+
+    Raises:
+        ValueError: unknown field, bad date or cursor, or a limit below 1
+    """
+    requested = _as_list(fields) or DEFAULT_TRANSACTION_FIELDS
+    unknown = [c for c in requested if c.lower() not in _TRANSACTION_FIELD_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown transaction fields {unknown}; choose from {TRANSACTION_FIELDS}")
+    columns = list(dict.fromkeys(_TRANSACTION_FIELD_NAMES[c.lower()] for c in requested))
+    columns = ["transactionId", "date"] + [c for c in columns if c not in ("transactionId", "date")]
+
+    where, params = _transaction_filters(account_id, startDate, endDate, transactionType, productCode, status)
+    query = f"""
+        SELECT {", ".join(f'"{c}" AS "{c}"' for c in columns)}
+        FROM TransactionHistory
+        WHERE {where}
+    """
+
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query += " AND (date < ? OR (date = ? AND transactionId < ?))"
+        params.extend([cursor_date, cursor_date, cursor_id])
+
+    query += " ORDER BY date DESC, transactionId DESC"
+
+    page_size = None
+    if limit is not None:
+        if int(limit) < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        page_size = min(int(limit), MAX_TRANSACTION_PAGE)
+        query += " LIMIT ?"
+        params.append(page_size + 1)  # one extra row tells us if there is a next page
+
+    conn = get_db_connection()
+    cursor_ = conn.cursor()
+    cursor_.execute(query, params)
+    rows = [dict(row) for row in cursor_.fetchall()]
+
+    next_cursor = None
+    if page_size is not None and len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["date"], rows[-1]["transactionId"])
+
+    return {
+        "accountId": account_id,
+        "transactions": rows,
+        "count": len(rows),
+        "nextCursor": next_cursor
+    }
+
+
+# ─────────────────────────────────────────────
+# TRANSACTION ANALYTICS
+# Aggregates computed in SQL, so the agent hands the LLM a few numbers
+# instead of every row. Amounts are signed: netAmount < 0 is money out.
+# Failed and reversed transactions are left out unless a status filter
+# asks for them.
+# ─────────────────────────────────────────────
+BREAKDOWN_GROUPS = ["type", "productCode", "investmentOption"]
+COUNTED_STATUSES = ["completed", "pending"]
+
+
+def _analytics_filters(account_id, startDate, endDate, transactionType=None, productCode=None, status=None):
+    return _transaction_filters(account_id, startDate, endDate, transactionType, productCode,
+                                status or COUNTED_STATUSES)
+
+
+def _analytics_query(query: str, params: list) -> list:
+    return [dict(row) for row in get_db_connection().execute(query, params).fetchall()]
+
+
+def get_spending_breakdown(
+    account_id: int,
+    groupBy: str = "type",
+    startDate: str = None,
+    endDate: str = None,
+    transactionType=None,
+    productCode=None,
+    status=None,
+) -> dict:
+    """
+    Totals per transaction type, productCode or investmentOption.
+
+    Returns:
+        {"accountId", "groupBy", "groups": [{key, count, moneyIn, moneyOut,
+        netTotal, grossTotal, deductions}], "totals": {...same fields}} -
+        groups are ordered by the size of their net total
+
+    Raises:
+        ValueError: unknown groupBy or a bad date
+    """
+    if groupBy not in BREAKDOWN_GROUPS:
+        raise ValueError(f"Unknown groupBy {groupBy!r}; choose from {BREAKDOWN_GROUPS}")
+
+    where, params = _analytics_filters(account_id, startDate, endDate, transactionType, productCode, status)
+    sums = """
+            COUNT(*) AS count,
+            ROUND(COALESCE(SUM(CASE WHEN netAmount > 0 THEN netAmount END), 0), 2) AS moneyIn,
+            ROUND(COALESCE(-SUM(CASE WHEN netAmount < 0 THEN netAmount END), 0), 2) AS moneyOut,
+            ROUND(COALESCE(SUM(netAmount), 0), 2) AS netTotal,
+            ROUND(COALESCE(SUM(grossAmount), 0), 2) AS grossTotal,
+            ROUND(COALESCE(SUM(ABS(grossAmount - netAmount)), 0), 2) AS deductions
+    """
+    groups = _analytics_query(f"""
+        SELECT {groupBy} AS key, {sums}
+        FROM TransactionHistory
+        WHERE {where}
+        GROUP BY {groupBy}
+        ORDER BY ABS(SUM(netAmount)) DESC
+    """, params)
+    totals = _analytics_query(f"SELECT {sums} FROM TransactionHistory WHERE {where}", params)[0]
+
+    return {
+        "accountId": account_id,
+        "groupBy": groupBy,
+        "startDate": startDate,
+        "endDate": endDate,
+        "groups": groups,
+        "totals": totals
+    }
+
+
+def get_monthly_totals(
+    account_id: int,
+    startDate: str = None,
+    endDate: str = None,
+    transactionType=None,
+    productCode=None,
+    status=None,
+) -> dict:
+    """
+    Money in, money out and net flow per calendar month, oldest first.
+
+    Returns:
+        {"accountId", "months": [{month (YYYY-MM), count, moneyIn, moneyOut,
+        netFlow}], "averageNetFlow"}
+    """
+    where, params = _analytics_filters(account_id, startDate, endDate, transactionType, productCode, status)
+    months = _analytics_query(f"""
+        SELECT
+            substr(date, 1, 7) AS month,
+            COUNT(*) AS count,
+            ROUND(COALESCE(SUM(CASE WHEN netAmount > 0 THEN netAmount END), 0), 2) AS moneyIn,
+            ROUND(COALESCE(-SUM(CASE WHEN netAmount < 0 THEN netAmount END), 0), 2) AS moneyOut,
+            ROUND(SUM(netAmount), 2) AS netFlow
+        FROM TransactionHistory
+        WHERE {where}
+        GROUP BY month
+        ORDER BY month
+    """, params)
+
+    return {
+        "accountId": account_id,
+        "months": months,
+        "averageNetFlow": round(sum(m["netFlow"] for m in months) / len(months), 2) if months else None
+    }
+
+
+def get_fee_summary(account_id: int, startDate: str = None, endDate: str = None, status=None) -> dict:
+    """
+    What fees cost the account: fee transactions plus the gross-to-net
+    deductions on every other transaction (a fee row's own deduction is
+    already part of its net amount, so it is not counted twice).
+
+    Returns:
+        {"accountId", "feeTransactions": {count, total}, "deductions":
+        {total, byType: [{type, count, total}]}, "totalCost"}
+    """
+    where, params = _analytics_filters(account_id, startDate, endDate, status=status)
+    by_type = _analytics_query(f"""
+        SELECT
+            type,
+            COUNT(*) AS count,
+            ROUND(SUM(ABS(grossAmount - netAmount)), 2) AS total
+        FROM TransactionHistory
+        WHERE {where} AND type IS NOT 'fee'
+        GROUP BY type
+        ORDER BY total DESC
+    """, params)
+    fees = _analytics_query(f"""
+        SELECT COUNT(*) AS count, ROUND(COALESCE(-SUM(netAmount), 0), 2) AS total
+        FROM TransactionHistory
+        WHERE {where} AND type = 'fee'
+    """, params)[0]
+
+    deducted = round(sum(row["total"] for row in by_type), 2)
+    return {
+        "accountId": account_id,
+        "startDate": startDate,
+        "endDate": endDate,
+        "feeTransactions": fees,
+        "deductions": {"total": deducted, "byType": by_type},
+        "totalCost": round(fees["total"] + deducted, 2)
+    }
+
+
+def get_balance_stats(account_id: int, startDate: str = None, endDate: str = None) -> dict:
+    """
+    Running balance ("balance after" of each transaction) over the period.
+
+    Returns:
+        {"accountId", "transactions", "opening", "closing", "change", "min",
+        "max", "average", "minDate", "maxDate"} - opening/closing are the
+        balances after the first and last transaction
+    """
+    # Every transaction moved the balance, whatever its status
+    where, params = _transaction_filters(account_id, startDate, endDate)
+    stats = _analytics_query(f"""
+        WITH period AS (
+            SELECT date, transactionId, "balance after" AS balance
+            FROM TransactionHistory
+            WHERE {where}
+        )
+        SELECT
+            COUNT(*) AS transactions,
+            (SELECT balance FROM period ORDER BY date, transactionId LIMIT 1) AS opening,
+            (SELECT balance FROM period ORDER BY date DESC, transactionId DESC LIMIT 1) AS closing,
+            MIN(balance) AS min,
+            MAX(balance) AS max,
+            ROUND(AVG(balance), 2) AS average,
+            (SELECT date FROM period ORDER BY balance, date LIMIT 1) AS minDate,
+            (SELECT date FROM period ORDER BY balance DESC, date LIMIT 1) AS maxDate
+        FROM period
+    """, params)[0]
+
+    change = None
+    if stats["opening"] is not None:
+        change = round(stats["closing"] - stats["opening"], 2)
+    return {"accountId": account_id, "startDate": startDate, "endDate": endDate, **stats, "change": change}
+
+
+def get_adhoc_statements(account_id: int) -> dict:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT statementId, startDate, endDate, requestId,
+               submittedByRole, requestTimestamp
+        FROM AdHocStatement
+        WHERE accountId = ?
+        ORDER BY requestTimestamp DESC
+    """, (account_id,))
+
+    rows = cursor.fetchall()
+
+    return {
+        "accountId": account_id,
+        "adhocStatements": [dict(row) for row in rows]
+    }
+
+
+def get_periodic_statements(account_id: int, periodStartDate: str = None, periodEndDate: str = None) -> dict:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Build query with optional date filters
+    query = """
+        SELECT accountId, periodStartDate, periodEndDate, OpeningBalance, ClosingBalance
+        FROM PeriodicStatement
+        WHERE accountId = ?
+    """
+    params = [account_id]
+
+    if periodStartDate:
+        query += " AND periodStartDate >= ?"
+        params.append(periodStartDate)
+
+    if periodEndDate:
+        query += " AND periodEndDate <= ?"
+        params.append(periodEndDate)
+
+    query += " ORDER BY periodEndDate DESC"
+
+    cursor.execute(query, params)
+
+    rows = cursor.fetchall()
+
+    return {
+        "accountId": account_id,
+        "periodicStatements": [dict(row) for row in rows]
+    }
+
+
+# ─────────────────────────────────────────────
+# ASYNC VERSIONS
+# Same queries, run on the bounded DB executor (db_pool.DBExecutor) so
+# async routes never block the event loop or a Starlette threadpool slot
+# ─────────────────────────────────────────────
+aget_account_balance = db_executor.wrap(get_account_balance)
+aget_transaction_history = db_executor.wrap(get_transaction_history)
+aget_spending_breakdown = db_executor.wrap(get_spending_breakdown)
+aget_monthly_totals = db_executor.wrap(get_monthly_totals)
+aget_fee_summary = db_executor.wrap(get_fee_summary)
+aget_balance_stats = db_executor.wrap(get_balance_stats)
+aget_adhoc_statements = db_executor.wrap(get_adhoc_statements)
+aget_periodic_statements = db_executor.wrap(get_periodic_statements)
@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_MB = int(os.getenv("DB_CACHE_MB", 16))
+MMAP_MB = int(os.getenv("DB_MMAP_MB", 256))
+STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", 256))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_WORKERS = int(os.getenv("DB_WORKERS", 8))
+
+# Applied once when a connection is opened. WAL lets readers run while a
+# writer commits; synchronous=NORMAL is the usual pairing with WAL.
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA cache_size = -{CACHE_MB * 1024}",  # negative = KiB
+    f"PRAGMA mmap_size = {MMAP_MB * 1024 * 1024}",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+]
+
+
+class ConnectionPool:
+    """
+    One long-lived SQLite connection per thread and database file.
+
+    Opening a connection, parsing the schema and warming the page cache is
+    paid once per thread instead of once per query, and sqlite3's
+    per-connection statement cache (`cached_statements`) means repeated
+    queries skip the SQL compile. Connections are never shared between
+    threads; those of finished threads are closed the next time a
+    connection is opened.
+
+    Callers must not close the connection they get.
+    """
+
+    def __init__(self, pragmas: list = None, statement_cache: int = STATEMENT_CACHE):
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self.statement_cache = statement_cache
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = {}  # thread -> its {path: connection} dict
+        self.metrics = {"opened": 0, "reused": 0, "closed": 0}
+
+    def connection(self, path: str) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+            with self._lock:
+                self._threads[threading.current_thread()] = connections
+
+        conn = connections.get(path)
+        if conn is not None:
+            with self._lock:
+                self.metrics["reused"] += 1
+            return conn
+
+        conn = connections[path] = self._open(path)
+        self._close_dead_threads()
+        return conn
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        # check_same_thread=False only so close_all / dead-thread cleanup can
+        # close it from another thread; each connection is used by one thread
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               cached_statements=self.statement_cache)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        with self._lock:
+            self.metrics["opened"] += 1
+        return conn
+
+    def _close_dead_threads(self):
+        with self._lock:
+            dead = [thread for thread in self._threads if not thread.is_alive()]
+            dropped = [self._threads.pop(thread) for thread in dead]
+        for connections in dropped:
+            self._close(connections)
+
+    def _close(self, connections: dict):
+        for conn in connections.values():
+            conn.close()
+        with self._lock:
+            self.metrics["closed"] += len(connections)
+        connections.clear()
+
+    def close_all(self):
+        """Close every pooled connection (threads reopen on next use)"""
+        with self._lock:
+            all_connections = list(self._threads.values())
+        for connections in all_connections:
+            self._close(connections)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.metrics,
+                "open": sum(len(c) for c in self._threads.values()),
+                "threads": len(self._threads),
+                "statement_cache": self.statement_cache,
+            }
+
+
+db_pool = ConnectionPool()
+
+
+class DBExecutor:
+    """
+    Small, bounded thread pool that runs every blocking SQLite call made
+    from async code.
+
+    Async routes await run() instead of holding one of Starlette's
+    threadpool slots per request: thousands of requests can wait on the
+    event loop while only DB_WORKERS threads (each with its pooled
+    connection) touch the database.
+    """
+
+    def __init__(self, workers: int = DB_WORKERS):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self.metrics = {"calls": 0, "errors": 0, "in_flight": 0, "queue_wait_ms_total": 0.0}
+
+    async def run(self, fn, *args, **kwargs):
+        submitted = time.perf_counter()
+
+        def call():
+            with self._lock:
+                self.metrics["queue_wait_ms_total"] += (time.perf_counter() - submitted) * 1000
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            self.metrics["calls"] += 1
+            self.metrics["in_flight"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        except Exception:
+            with self._lock:
+                self.metrics["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.metrics["in_flight"] -= 1
+
+    def wrap(self, fn):
+        """Async version of a blocking data-access function"""
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await self.run(fn, *args, **kwargs)
+        return wrapper
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.metrics["calls"]
+            return {
+                "workers": self.workers,
+                "calls": calls,
+                "errors": self.metrics["errors"],
+                "in_flight": self.metrics["in_flight"],
+                "avg_queue_wait_ms": round(self.metrics["queue_wait_ms_total"] / calls, 3) if calls else 0.0,
+            }
+
+
+db_executor = DBExecutor()
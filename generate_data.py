@@ -0,0 +1,304 @@
+"""
+Synthetic data generator: fills the AIGurukul.db schema at production-like
+volumes for benchmarks.
+
+Tables are created from the shipped database's own CREATE statements, the
+demo accounts are copied over (so anish / shilpa / guest still log in),
+then every table is bulk-loaded with generated accounts. Type, productCode,
+investmentOption and status follow the shipped data's mix; transactions
+per account are skewed (a few busy accounts, a long tail of quiet ones)
+and "balance after" is a true running balance. Indexes and the
+AdHocStatement table come from migrations.py, after the load.
+
+Generated users log in as user<n> / pass<n> (n zero-padded to 6 digits).
+
+Run from the project folder:
+    python generate_data.py --accounts 1000 --transactions 200000
+    python generate_data.py --accounts 100000 --transactions 50000000 --db /data/AIGurukul_scale.db
+    python generate_data.py --accounts 5000 --docs-dir bench_docs --docs-accounts 5000
+Point the app at the result with AIGURUKUL_DB (and ACCOUNT_DOCS_DIR):
+    AIGURUKUL_DB=AIGurukul_scale.db uvicorn main:app
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from migrations import migrate
+
+FIRST_ACCOUNT_ID = 2_000_000_000
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (value, weight) - weights from the shipped TransactionHistory
+TRANSACTION_TYPES = [("purchase", 15), ("withdrawal", 13), ("deposit", 12), ("interest", 9), ("refund", 7), ("fee", 4)]
+MONEY_IN_TYPES = {"deposit", "interest", "refund"}
+DESCRIPTIONS = {
+    "purchase": "Investment purchase",
+    "withdrawal": "Cash withdrawal",
+    "deposit": "Account deposit",
+    "interest": "Monthly interest credit",
+    "refund": "Refund for prior purchase",
+    "fee": "Service fee",
+}
+PRODUCT_CODES = [("ETF-BETA", 16), ("MMF-EPSILON", 13), ("BND-GAMMA", 13), ("FND-ALPHA", 10), ("STK-DELTA", 8)]
+PRODUCT_NAMES = {
+    "ETF-BETA": "Beta ETF",
+    "MMF-EPSILON": "Epsilon Money Market",
+    "BND-GAMMA": "Gamma Bond",
+    "FND-ALPHA": "Alpha Fund",
+    "STK-DELTA": "Delta Shares",
+}
+INVESTMENT_OPTIONS = [("Income", 13), ("Cash", 15), ("Growth", 8), ("Index", 9), ("Australian shares", 7),
+                      ("fixed interest", 5), ("Balanced", 3)]
+STATUSES = [("completed", 40), ("reversed", 10), ("pending", 7), ("failed", 3)]
+STATEMENT_PRODUCTS = ["Term Deposit", "Insurance", "Cash Account", "Super", "Managed Fund"]
+STATEMENT_STATUSES = [("Published", 3), ("Generated", 1)]
+ADHOC_ROLES = [("customer", 6), ("adviser", 3), ("operations", 1)]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+BASE_TABLES = ["UserDetails", "AccountBalance", "TransactionHistory", "PeriodicStatement"]
+PLACEHOLDER_PDF = b"%PDF-1.4\n% generated placeholder\n%%EOF\n"
+
+
+def _choice(rng, weighted: list, size: int) -> np.ndarray:
+    values = np.array([value for value, _ in weighted], dtype=object)
+    weights = np.array([weight for _, weight in weighted], dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def _date_strings(epoch_seconds: np.ndarray) -> list:
+    # numpy writes "2025-08-07T00:46:03"; the shipped data uses a space
+    iso = np.datetime_as_string(epoch_seconds.astype("datetime64[s]"), unit="s")
+    return np.char.replace(iso, "T", " ").tolist()
+
+
+# ─────────────────────────────────────────────
+# SCHEMA
+# ─────────────────────────────────────────────
+def create_schema(conn: sqlite3.Connection, source: str, copy_demo: bool):
+    conn.execute("ATTACH DATABASE ? AS source", (source,))
+    for table in BASE_TABLES:
+        ddl = conn.execute("SELECT sql FROM source.sqlite_master WHERE type = 'table' AND name = ?",
+                           (table,)).fetchone()
+        if ddl is None:
+            raise RuntimeError(f"{source} has no {table} table")
+        conn.execute(ddl[0])
+        if copy_demo:
+            conn.execute(f'INSERT INTO "{table}" SELECT * FROM source."{table}"')
+    conn.commit()
+    conn.execute("DETACH DATABASE source")
+
+
+# ─────────────────────────────────────────────
+# GENERATORS (one chunk of accounts at a time)
+# ─────────────────────────────────────────────
+def users_rows(account_ids: np.ndarray, first_index: int) -> list:
+    return [(f"user{first_index + i:06d}", f"pass{first_index + i:06d}", int(account_id))
+            for i, account_id in enumerate(account_ids)]
+
+
+def transaction_rows(rng, account_ids: np.ndarray, counts: np.ndarray, opening: np.ndarray,
+                     start: float, end: float, first_tx: int):
+    """
+    Returns:
+        (rows, closing balance per account) - rows are ordered by account then date
+    """
+    total = int(counts.sum())
+    account_index = np.repeat(np.arange(len(account_ids)), counts)
+    seconds = rng.uniform(start, end, size=total).astype(np.int64)
+    order = np.lexsort((seconds, account_index))
+    account_index, seconds = account_index[order], seconds[order]
+
+    types = _choice(rng, TRANSACTION_TYPES, total)
+    money_in = np.isin(types, list(MONEY_IN_TYPES))
+    gross = np.round(rng.lognormal(mean=6.5, sigma=0.8, size=total), 2)
+    gross = np.where(money_in, gross, -gross)
+    deduction = np.round(np.abs(gross) * rng.uniform(0.002, 0.025, size=total), 2)
+    net = np.round(gross - deduction, 2)
+
+    # Running balance per account: opening + cumulative net within the account
+    ends = np.cumsum(counts)
+    running = np.concatenate(([0.0], np.cumsum(net)))  # running[i] = sum of net[:i]
+    before = running[ends - counts]
+    balance_after = np.round(opening[account_index] + running[1:] - np.repeat(before, counts), 2)
+    closing = np.round(opening + running[ends] - before, 2)
+
+    rows = zip(
+        (f"TX-{first_tx + i:010d}" for i in range(total)),
+        account_ids[account_index].tolist(),
+        _date_strings(seconds),
+        types.tolist(),
+        gross.tolist(),
+        net.tolist(),
+        ["AUD"] * total,
+        [DESCRIPTIONS[t] for t in types],
+        _choice(rng, PRODUCT_CODES, total).tolist(),
+        _choice(rng, INVESTMENT_OPTIONS, total).tolist(),
+        _choice(rng, STATUSES, total).tolist(),
+        balance_after.tolist(),
+    )
+    return rows, closing
+
+
+def balance_rows(rng, account_ids: np.ndarray, closing: np.ndarray, snapshots: int, end: float) -> list:
+    rows = []
+    codes = _choice(rng, PRODUCT_CODES, len(account_ids))
+    options = _choice(rng, INVESTMENT_OPTIONS, len(account_ids))
+    for account_id, balance, code, option in zip(account_ids.tolist(), closing.tolist(), codes, options):
+        for k in range(snapshots):
+            # The newest snapshot matches the last "balance after"; older ones drift from it
+            amount = balance if k == 0 else round(balance * rng.uniform(0.85, 1.15), 2)
+            price = round(rng.uniform(10, 40), 4)
+            as_of = datetime.fromtimestamp(end, timezone.utc) - timedelta(days=30 * k)
+            rows.append((account_id, as_of.strftime(DATE_FORMAT), "AUD", code, PRODUCT_NAMES[code], option,
+                         round(amount / price, 4), price, round(price * rng.uniform(0.97, 1.03), 4), amount))
+    return rows
+
+
+def statement_rows(rng, account_ids: np.ndarray, months: int, end: float) -> list:
+    rows = []
+    last_month = datetime.fromtimestamp(end, timezone.utc).replace(day=1)
+    for account_id in account_ids.tolist():
+        closing = int(rng.integers(1_000, 100_000))
+        for k in range(months, 0, -1):
+            period_start = (last_month - timedelta(days=31 * k)).replace(day=1)
+            period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            opening, closing = closing, max(0, closing + int(rng.normal(0, 4_000)))
+            rows.append((account_id, 1, STATEMENT_PRODUCTS[k % len(STATEMENT_PRODUCTS)],
+                         period_start.strftime("%Y-%m-%d"), period_end.strftime("%Y-%m-%d"), opening, closing,
+                         _choice(rng, STATEMENT_STATUSES, 1)[0],
+                         f"https://daas.example.com/statements/mock/{account_id:012d}_{months - k + 1}.pdf"))
+    return rows
+
+
+def adhoc_rows(rng, account_ids: np.ndarray, per_account: int, start: float, end: float, first_id: int) -> list:
+    rows = []
+    n = first_id
+    for account_id in account_ids.tolist():
+        for _ in range(per_account):
+            requested = rng.uniform(start, end)
+            period_end = datetime.fromtimestamp(requested, timezone.utc)
+            period_start = period_end - timedelta(days=int(rng.integers(30, 365)))
+            rows.append((f"ADH-{n:010d}", account_id, period_start.strftime("%Y-%m-%d"),
+                         period_end.strftime("%Y-%m-%d"), f"REQ-{n:010d}", _choice(rng, ADHOC_ROLES, 1)[0],
+                         period_end.strftime(DATE_FORMAT)))
+            n += 1
+    return rows
+
+
+def write_statement_files(docs_dir: str, account_ids: np.ndarray, year: int):
+    """Placeholder PDFs named like Account_docs, for find_statement_files at scale"""
+    os.makedirs(docs_dir, exist_ok=True)
+    for account_id in account_ids.tolist():
+        names = [f"{account_id}_monthly_statement_{month}_{year}.pdf" for month in MONTHS]
+        names.append(f"{account_id}_annual_statement_{year}.pdf")
+        for name in names:
+            with open(os.path.join(docs_dir, name), "wb") as f:
+                f.write(PLACEHOLDER_PDF)
+
+
+# ─────────────────────────────────────────────
+# DRIVER
+# ─────────────────────────────────────────────
+def generate(args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    end = datetime.strptime(args.end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    start = end - args.days * 86400
+
+    conn = sqlite3.connect(args.db)
+    # Bulk load: no journal, no fsync - the file is rebuilt from scratch on failure anyway
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    create_schema(conn, args.source, copy_demo=not args.no_demo)
+
+    account_ids = np.arange(FIRST_ACCOUNT_ID, FIRST_ACCOUNT_ID + args.accounts, dtype=np.int64)
+    # Skewed activity: lognormal weights, then exactly --transactions rows in total
+    weights = rng.lognormal(mean=0.0, sigma=1.0, size=args.accounts)
+    counts = rng.multinomial(args.transactions, weights / weights.sum()) if args.accounts else np.array([])
+    opening = np.round(rng.lognormal(mean=9.0, sigma=1.0, size=args.accounts), 2)
+
+    chunk = max(1, int(args.batch_rows / max(1, args.transactions / max(1, args.accounts))))
+    chunk = min(chunk, 10_000)
+    started = time.perf_counter()
+    written = 0
+    adhoc = []
+
+    for lo in range(0, args.accounts, chunk):
+        hi = min(lo + chunk, args.accounts)
+        ids, chunk_counts = account_ids[lo:hi], counts[lo:hi]
+        conn.executemany('INSERT INTO UserDetails VALUES (?, ?, ?)', users_rows(ids, lo))
+        rows, closing = transaction_rows(rng, ids, chunk_counts, opening[lo:hi], start, end, written)
+        conn.executemany("INSERT INTO TransactionHistory VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO AccountBalance VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         balance_rows(rng, ids, closing, args.balances_per_account, end))
+        conn.executemany("INSERT INTO PeriodicStatement VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         statement_rows(rng, ids, args.statements_per_account, end))
+        adhoc.extend(adhoc_rows(rng, ids, args.adhoc_per_account, start, end, lo * args.adhoc_per_account))
+        conn.commit()
+
+        written += int(chunk_counts.sum())
+        rate = written / max(time.perf_counter() - started, 1e-9)
+        print(f"\r⏳ {hi:,}/{args.accounts:,} accounts, {written:,} transactions ({rate:,.0f} rows/s)",
+              end="", flush=True)
+    print()
+    conn.close()
+
+    # Indexes are built once over the loaded tables, then the adhoc rows go in
+    migrate(args.db)
+    conn = sqlite3.connect(args.db)
+    conn.executemany("INSERT INTO AdHocStatement VALUES (?, ?, ?, ?, ?, ?, ?)", adhoc)
+    conn.commit()
+    conn.execute("ANALYZE")
+    counts_by_table = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                       for table in BASE_TABLES + ["AdHocStatement"]}
+    conn.close()
+
+    if args.docs_dir and args.docs_accounts:
+        write_statement_files(args.docs_dir, account_ids[:args.docs_accounts],
+                              datetime.fromtimestamp(end, timezone.utc).year)
+
+    return {
+        "db": args.db,
+        "rows": counts_by_table,
+        "size_mb": round(os.path.getsize(args.db) / 1e6, 1),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic AIGurukul database")
+    parser.add_argument("--db", default="AIGurukul_scale.db", help="Output database file")
+    parser.add_argument("--source", default="AIGurukul.db", help="Database whose schema (and demo rows) to copy")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=100_000, help="Total across all accounts")
+    parser.add_argument("--balances-per-account", type=int, default=3)
+    parser.add_argument("--statements-per-account", type=int, default=12)
+    parser.add_argument("--adhoc-per-account", type=int, default=1)
+    parser.add_argument("--days", type=int, default=365, help="Transaction history span")
+    parser.add_argument("--end-date", default="2026-02-01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-rows", type=int, default=500_000, help="Transactions generated per chunk")
+    parser.add_argument("--no-demo", action="store_true", help="Don't copy the shipped demo accounts")
+    parser.add_argument("--docs-dir", help="Also write placeholder statement PDFs here")
+    parser.add_argument("--docs-accounts", type=int, default=0, help="How many accounts get statement PDFs")
+    parser.add_argument("--force", action="store_true", help="Overwrite --db if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            sys.exit(f"❌ {args.db} exists (use --force to overwrite)")
+        os.remove(args.db)
+
+    summary = generate(args)
+    print(f"✅ {summary['db']}: {summary['size_mb']} MB in {summary['seconds']} s")
+    for table, count in summary["rows"].items():
+        print(f"   {table:<20}{count:>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", 32))
+CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 3.0))
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 10.0))
+RETRIES = int(os.getenv("API_RETRIES", 3))
+BACKOFF_SECONDS = float(os.getenv("API_BACKOFF_SECONDS", 0.2))
+
+# Responses worth retrying: the API restarting or overloaded
+RETRY_STATUSES = (502, 503, 504)
+
+# Latency histogram bucket upper bounds, in ms
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def endpoint_label(path: str) -> str:
+    """/api/accounts/1065000029/balance -> /api/accounts/{id}/balance"""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.errors = 0
+        self.retries = 0
+
+    def observe(self, elapsed_ms: float):
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.counts[i] += 1
+                return
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th request"""
+        target, seen = q * self.total, 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.total,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "p50_ms_le": self.quantile(0.50),
+            "p95_ms_le": self.quantile(0.95),
+            "p99_ms_le": self.quantile(0.99),
+            "buckets": {("+Inf" if b == float("inf") else f"le_{b}ms"): c for b, c in zip(BUCKETS_MS, self.counts)},
+        }
+
+
+class APIClient:
+    """
+    Pooled keep-alive HTTP client for the banking API.
+
+    One requests.Session (for the sync tool functions) and one
+    httpx.AsyncClient per event loop (for the async ones), both with a
+    bounded connection pool, connect/read timeouts and retries with
+    exponential backoff on connection errors and 502/503/504. Every call is
+    recorded in a per-endpoint latency histogram.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, retries: int = RETRIES, backoff: float = BACKOFF_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+    def get(self, path: str, params: dict = None) -> dict:
+        histogram = self._histogram(path)
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                r = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+                if r.status_code in RETRY_STATUSES and attempt < self.retries:
+                    self._retry(histogram, started)
+                    time.sleep(self._delay(attempt))
+                    continue
+                self._record(histogram, started, failed=r.status_code >= 400)
+                r.raise_for_status()
+                return r.json()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    self._record(histogram, started, failed=True)
+                    raise
+                self._retry(histogram, started)
+                time.sleep(self._delay(attempt))
+
+    # ── Async ────────────────────────────────────────────────────────────────
+    def async_client(self) -> httpx.AsyncClient:
+        # httpx connection pools are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def aget(self, path: str, params: dict = None) -> dict:
+        client = self.async_client()
+        histogram = self._histogram(path)
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                r = await client.get(path, params=params)
+                if r.status_code in RETRY_STATUSES and attempt < self.retries:
+                    self._retry(histogram, started)
+                    await asyncio.sleep(self._delay(attempt))
+                    continue
+                self._record(histogram, started, failed=r.status_code >= 400)
+                r.raise_for_status()
+                return r.json()
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt == self.retries:
+                    self._record(histogram, started, failed=True)
+                    raise
+                self._retry(histogram, started)
+                await asyncio.sleep(self._delay(attempt))
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        self.session.close()
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt)
+
+    def _histogram(self, path: str) -> LatencyHistogram:
+        label = endpoint_label(path)
+        with self._lock:
+            return self._histograms.setdefault(label, LatencyHistogram())
+
+    def _record(self, histogram: LatencyHistogram, started: float, failed: bool = False):
+        with self._lock:
+            histogram.observe((time.perf_counter() - started) * 1000)
+            histogram.errors += failed
+
+    def _retry(self, histogram: LatencyHistogram, started: float):
+        with self._lock:
+            histogram.observe((time.perf_counter() - started) * 1000)
+            histogram.retries += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "pool_size": self.pool_size,
+                "timeouts_s": {"connect": self.timeout[0], "read": self.timeout[1]},
+                "endpoints": {label: h.to_dict() for label, h in self._histograms.items()},
+            }
@@ -0,0 +1,43 @@
+"""
+Where the FAISS index lives on disk, shared by build_index.py (which
+writes it) and rag_service.py (which loads it) without the loader pulling
+in the build's document loaders.
+
+faiss_index is a symlink to a versioned sibling folder
+(faiss_index.v-<timestamp>); a build writes a new version folder and
+swaps the link with a single os.replace.
+"""
+from pathlib import Path
+
+INDEX_DIR = "faiss_index"
+VERSION_GLOB = "{name}.v-*"
+RETIRED_GLOB = "{name}.old-*"  # left behind by a two-rename swap where symlinks are unavailable
+KEEP_VERSIONS = 2  # the current index and the one before, for loaders still reading it
+
+
+def version_dir(index_dir: str, stamp) -> Path:
+    """Sibling folder a build writes version `stamp` of the index to"""
+    target = Path(index_dir)
+    return target.with_name(f"{target.name}.v-{stamp}")
+
+
+def resolve_index_dir(index_dir: str = INDEX_DIR) -> str:
+    """
+    The folder to load the index from: index_dir itself (or what its link
+    points to), else the newest complete version folder - e.g. after a
+    crash mid-swap on a system without symlinks.
+
+    Raises:
+        FileNotFoundError: no index has been built
+    """
+    target = Path(index_dir)
+    if (target / "index.faiss").exists():
+        return str(target)
+    candidates = [path for pattern in (VERSION_GLOB, RETIRED_GLOB)
+                  for path in target.parent.glob(pattern.format(name=target.name))
+                  if (path / "index.faiss").exists()]
+    if not candidates:
+        raise FileNotFoundError(f"No FAISS index at {index_dir} - run python build_index.py")
+    newest = max(candidates, key=lambda path: path.stat().st_mtime)
+    print(f"⚠️ {index_dir} is missing, loading {newest}")
+    return str(newest)
@@ -0,0 +1,275 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Import RAG service
+try:
+    from rag_service import get_insights_from_other_customers
+    RAG_AVAILABLE = True
+except ImportError:
+    RAG_AVAILABLE = False
+
+INSIGHT_CATEGORIES = ("investment", "spending", "savings")
+REPORTS_PATH = os.getenv("INSIGHTS_REPORTS_PATH", "insights_reports.json")
+REFRESH_INTERVAL_SECONDS = int(os.getenv("INSIGHTS_REFRESH_SECONDS", 6 * 60 * 60))
+
+# Serve a stored report for up to twice the refresh interval, so a single
+# failed refresh never sends users back to live generation
+MAX_REPORT_AGE_SECONDS = 2 * REFRESH_INTERVAL_SECONDS
+
+
+def build_insight_prompt(investment_data: str, spending_data: str, savings_data: str) -> str:
+    combined_data = f"""
+INVESTMENT PATTERNS FROM OTHER CUSTOMERS:
+{investment_data if investment_data else "No investment data available."}
+
+SPENDING PATTERNS FROM OTHER CUSTOMERS:
+{spending_data if spending_data else "No spending data available."}
+
+SAVINGS PATTERNS FROM OTHER CUSTOMERS:
+{savings_data if savings_data else "No savings data available."}
+"""
+
+    insight_prompt = f"""
+You are a financial advisor for FirstNet Investor.
+
+Analyze the anonymized transaction and statement data from other customers below and provide
+clear, structured, and actionable insights to help this customer improve their profit
+and investment decisions.
+
+Customer Data from Other Accounts (Anonymized):
+{combined_data}
+
+Generate a detailed response covering EXACTLY these 5 sections:
+
+1. 📈 TOP INVESTED PRODUCTS
+   - List the top 3-5 products/categories most customers are investing in
+   - Include approximate percentage of customers investing in each
+
+2. 💹 MARKET TRENDS
+   - What financial trends are observed across customers
+   - Which sectors/products are growing in popularity
+
+3. 🏆 BEST PERFORMING CATEGORIES
+   - Which investment categories are yielding the best returns
+   - Include any specific products with notable performance
+
+4. 💡 PERSONALIZED RECOMMENDATIONS
+   - Specific steps this customer can take to improve profit
+   - Suggest 2-3 actionable investment moves based on what others are doing
+
+5. ⚠️ RISK CONSIDERATIONS
+   - Any risks or market volatility to be aware of
+   - Diversification suggestions
+
+IMPORTANT RULES:
+- DO NOT reveal any specific account numbers or personal details
+- Base insights ONLY on the data provided above
+- Be specific with product names, percentages, and figures where available
+- Keep the tone professional and encouraging
+"""
+    return insight_prompt
+
+
+class InsightsStore:
+    """
+    Market-insight reports precomputed for the whole customer cohort.
+
+    The report is generated on a schedule from all customers' retrieved data,
+    persisted to REPORTS_PATH (so restarts serve it immediately), and only
+    personalized per request. With several uvicorn workers, the one holding
+    the REPORTS_PATH.lock file lock refreshes; the others reload the file
+    when its mtime changes.
+    """
+
+    def __init__(self, path: str = REPORTS_PATH):
+        self.path = path
+        self._report = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._refresher_lock = None  # open lock file while this process is the refresher
+        self.metrics = {"served": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0, "reloads": 0,
+                        "last_refresh_seconds": None}
+        self.load()
+
+    def load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path) as f:
+                stored = json.load(f)
+            # Only the generated text is served; retrieved customer data is never kept
+            report = {"generated_at": stored["generated_at"], "report": stored["report"]}
+            with self._lock:
+                self._report, self._mtime = report, mtime
+            print(f"📥 Loaded insights report generated at {time.ctime(report['generated_at'])}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable insights report {self.path}: {e}")
+
+    def reload_if_changed(self) -> bool:
+        """Load the report file again if another process has rewritten it"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        self.metrics["reloads"] += 1
+        return True
+
+    def try_become_refresher(self) -> bool:
+        """
+        Take the non-blocking lock on REPORTS_PATH.lock, once per process.
+
+        The OS releases it when the holder exits, so another worker takes
+        over refreshing on its next attempt.
+        """
+        if self._refresher_lock is not None:
+            return True
+        lock_file = open(f"{self.path}.lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._refresher_lock = lock_file
+        print(f"🔒 This worker (pid {os.getpid()}) refreshes the insights report")
+        return True
+
+    def get(self, max_age: float = MAX_REPORT_AGE_SECONDS):
+        """Stored report dict, or None when missing or too old"""
+        with self._lock:
+            report = self._report
+        if report is None or time.time() - report["generated_at"] > max_age:
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["served"] += 1
+        return report
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            report = self._report
+        return report is None or time.time() - report["generated_at"] > REFRESH_INTERVAL_SECONDS
+
+    def refresh(self, generate) -> bool:
+        """
+        Retrieve every category for the whole cohort and generate the report.
+
+        Args:
+            generate: callable(prompt) -> text, e.g. the shared LLM's invoke
+        """
+        if not RAG_AVAILABLE:
+            return False
+        if not self._refreshing.acquire(blocking=False):
+            return False  # another refresh is already running
+
+        started = time.perf_counter()
+        try:
+            category_data = {
+                category: get_insights_from_other_customers(None, category)
+                for category in INSIGHT_CATEGORIES
+            }
+            report_text = generate(build_insight_prompt(
+                category_data["investment"], category_data["spending"], category_data["savings"]
+            ))
+            report = {
+                "generated_at": time.time(),
+                "report": report_text,
+            }
+            mtime = self._save(report)
+            with self._lock:
+                self._report, self._mtime = report, mtime
+
+            self.metrics["refreshes"] += 1
+            self.metrics["last_refresh_seconds"] = round(time.perf_counter() - started, 1)
+            print(f"✅ Insights report refreshed in {self.metrics['last_refresh_seconds']}s")
+            return True
+
+        except Exception as e:
+            self.metrics["refresh_failures"] += 1
+            print(f"❌ Insights report refresh failed: {e}")
+            return False
+        finally:
+            self._refreshing.release()
+
+    def _save(self, report: dict):
+        # Write then rename so readers never see a half-written file. The
+        # temporary name is unique, so concurrent writers never share one.
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.",
+                                        suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(report, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return os.stat(self.path).st_mtime_ns
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = self._report
+        return {
+            **self.metrics,
+            "refresher": self._refresher_lock is not None,
+            "report_age_seconds": round(time.time() - report["generated_at"]) if report else None,
+        }
+
+
+def personalize_report(report_text: str, user_account_id: int, username: str = None) -> str:
+    """
+    Per-request step on top of the cohort report: drop any line that mentions
+    the customer's own account and mask any remaining account digits.
+    """
+    account_str = str(user_account_id)
+    masked = "*" * (len(account_str) - 4) + account_str[-4:]
+    lines = [line for line in report_text.splitlines() if account_str not in line]
+    text = "\n".join(lines)
+    text = re.sub(r"\b\d{8,12}\b", lambda m: "*" * (len(m.group()) - 4) + m.group()[-4:], text)
+
+    greeting = f"Here are your market insights, {username}." if username else "Here are your market insights."
+    return f"{greeting}\n\n{text}".replace(account_str, masked)
+
+
+def start_refresher(generate, interval: float = REFRESH_INTERVAL_SECONDS) -> threading.Thread:
+    """
+    Background thread that keeps the stored report fresh: the elected
+    worker regenerates it when stale, every other worker picks up the file
+    it writes.
+    """
+    def loop():
+        while True:
+            if insights_store.try_become_refresher():
+                if insights_store.is_stale():
+                    insights_store.refresh(generate)
+            else:
+                insights_store.reload_if_changed()
+            time.sleep(min(interval, 60))
+
+    thread = threading.Thread(target=loop, name="insights-refresher", daemon=True)
+    thread.start()
+    return thread
+
+
+insights_store = InsightsStore()
+
+
+if __name__ == "__main__":
+    # One-off refresh, e.g. from cron: python insights_store.py
+    from llm_gateway import gateway, PRIORITY_BACKGROUND
+    insights_store.refresh(lambda prompt: gateway.invoke(prompt, PRIORITY_BACKGROUND))
@@ -0,0 +1,153 @@
+import numpy as np
+
+# Reuse the all-MiniLM-L6-v2 model that rag_service already loaded
+try:
+    from rag_service import embedding
+    CLASSIFIER_AVAILABLE = True
+except ImportError:
+    embedding = None
+    CLASSIFIER_AVAILABLE = False
+    print("⚠️ Intent classifier not available (RAG service embeddings missing)")
+
+# Minimum cosine similarity to the best exemplar, and minimum lead over the
+# runner-up intent, before we trust the classifier and skip the LLM router
+CONFIDENCE_THRESHOLD = 0.72
+MIN_MARGIN = 0.05
+
+# Labelled exemplars per intent. "other" catches banking questions that need
+# reasoning and non-banking chatter, so they are never forced into a tool.
+INTENT_EXEMPLARS = {
+    "balance": [
+        "what's my balance",
+        "what is my account balance",
+        "how much money do I have",
+        "show my current balance",
+        "check my balance",
+        "how much is in my account",
+        "balance please",
+        "what are my funds right now",
+    ],
+    "transactions": [
+        "show my last transactions",
+        "show my recent transactions",
+        "list my transaction history",
+        "what are my latest transactions",
+        "show me my last 5 transactions",
+        "recent account activity",
+        "what payments went through my account",
+        "transaction history please",
+    ],
+    "documents": [
+        "download my statement",
+        "i want to download my monthly statement",
+        "send me my annual statement pdf",
+        "get my bank statement document",
+        "where can I download my statements",
+        "give me my statement for last month",
+    ],
+    "other": [
+        "why did my balance go down last month",
+        "compare my spending with last quarter",
+        "how can I improve my investment returns",
+        "what is the weather today",
+        "tell me a joke",
+        "who won the football match",
+        "what is the capital of france",
+        "explain how interest is calculated",
+    ],
+}
+
+# What a confident intent maps to (tool names are keys of mcp_server.TOOLS).
+# "documents" has no tool - the agent's statement shortcut handles it.
+INTENT_TOOLS = {
+    "balance": "get_account_balance",
+    "transactions": "get_transaction_history",
+    "documents": None,
+}
+
+
+class IntentClassifier:
+    """Nearest-exemplar intent classifier over sentence embeddings"""
+
+    def __init__(self, embedder, exemplars: dict):
+        self.embedder = embedder
+        self.exemplars = exemplars
+        self._labels = None
+        self._matrix = None
+
+    def _ensure_exemplars(self):
+        # Embed exemplars lazily so importing this module stays cheap
+        if self._matrix is not None:
+            return
+        labels, texts = [], []
+        for intent, examples in self.exemplars.items():
+            labels.extend([intent] * len(examples))
+            texts.extend(examples)
+        self._matrix = _normalize(np.array(self.embedder.embed_documents(texts), dtype=np.float32))
+        self._labels = np.array(labels)
+
+    def embed(self, text: str) -> list:
+        return self.embedder.embed_query(text)
+
+    def scores(self, vector) -> dict:
+        """Best exemplar similarity per intent"""
+        self._ensure_exemplars()
+        query = _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        similarities = self._matrix @ query
+        return {
+            intent: float(similarities[self._labels == intent].max())
+            for intent in self.exemplars
+        }
+
+    def classify(self, vector):
+        """
+        Returns:
+            (intent, score, margin) for the best-scoring intent
+        """
+        ranked = sorted(self.scores(vector).items(), key=lambda kv: kv[1], reverse=True)
+        (intent, score), runner_up = ranked[0], ranked[1][1] if len(ranked) > 1 else 0.0
+        return intent, score, score - runner_up
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+classifier = IntentClassifier(embedding, INTENT_EXEMPLARS) if CLASSIFIER_AVAILABLE else None
+
+
+def embed_question(question: str) -> list:
+    """Embedding of the user's question (shared by the classifier and later caches)"""
+    return classifier.embed(question)
+
+
+def classify_intent(vector, threshold: float = CONFIDENCE_THRESHOLD, min_margin: float = MIN_MARGIN):
+    """
+    Route a question locally when the classifier is confident.
+
+    Returns:
+        dict shaped like an agent route (is_banking, intent, action, tool_name,
+        tool_args) or None when the LLM router should decide
+    """
+    if classifier is None:
+        return None
+
+    intent, score, margin = classifier.classify(vector)
+    print(f"🎯 Local intent: {intent} (score={score:.2f}, margin={margin:.2f})")
+
+    if intent not in INTENT_TOOLS or score < threshold or margin < min_margin:
+        return None
+
+    tool_name = INTENT_TOOLS[intent]
+    return {
+        "is_banking": True,
+        "reason": f"Local intent classifier ({score:.2f})",
+        "intent": intent,
+        "action": "tool" if tool_name else None,
+        "tool_name": tool_name,
+        "tool_args": {},
+        "response": None,
+        "confidence": score,
+        "source": "classifier",
+    }
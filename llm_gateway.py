@@ -0,0 +1,222 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from langchain_core.runnables import RunnableLambda
+from langchain_ollama import OllamaLLM
+
+from singleflight import llm_flight
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma3:4b")
+
+# How many generations may run against Ollama at once. A CPU Ollama host
+# serves one or two generations efficiently; everything else waits here.
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 2))
+
+# Lower number = served first
+PRIORITY_CLASSIFY = 0    # guard / router / decision calls - short JSON replies
+PRIORITY_ANSWER = 1      # final answers a user is waiting on
+PRIORITY_INSIGHTS = 2    # long market-insight generations
+PRIORITY_BACKGROUND = 3  # scheduled jobs (insight report refresh, ...)
+
+PRIORITY_NAMES = {
+    PRIORITY_CLASSIFY: "classify",
+    PRIORITY_ANSWER: "answer",
+    PRIORITY_INSIGHTS: "insights",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Single shared client for every module
+llm = OllamaLLM(
+    model=OLLAMA_MODEL,
+    base_url=OLLAMA_BASE_URL
+)
+
+
+class _Waiter:
+    def __init__(self, user, loop=None):
+        self.user = user
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.cancelled = False
+        self.enqueued = time.perf_counter()
+
+
+class LLMGateway:
+    """
+    Bounded pool of in-flight LLM requests with a priority queue.
+
+    Waiting requests are ordered by (priority, the user's outstanding
+    requests when they queued, arrival), so cheap classification calls go
+    ahead of long generations and one busy user cannot starve the others.
+    Works for both threads (invoke/stream) and asyncio (ainvoke/astream).
+    """
+
+    def __init__(self, client, max_in_flight: int = MAX_IN_FLIGHT):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._queue = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._user_load = {}
+        self._waits_ms = deque(maxlen=1000)
+        self.metrics = {
+            "requests": 0,
+            "queued": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "by_priority": {name: 0 for name in PRIORITY_NAMES.values()},
+        }
+
+    # ── Slot management ──────────────────────────────────────────────────────
+    def _enqueue(self, priority: int, user, waiter: _Waiter) -> bool:
+        """Returns True when the slot was granted immediately"""
+        with self._lock:
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            self.metrics["requests"] += 1
+            self.metrics["by_priority"][name] = self.metrics["by_priority"].get(name, 0) + 1
+            load = self._user_load.get(user, 0)
+            self._user_load[user] = load + 1
+
+            if self._in_flight < self.max_in_flight and not self._queue:
+                self._in_flight += 1
+                self._record_wait(0.0)
+                return True
+
+            self.metrics["queued"] += 1
+            heapq.heappush(self._queue, (priority, load, next(self._seq), waiter))
+            return False
+
+    def _release(self, user):
+        with self._lock:
+            self._drop_user(user)
+            self._handoff()
+
+    def _drop_user(self, user):
+        # Caller holds self._lock
+        self._user_load[user] = self._user_load.get(user, 1) - 1
+        if self._user_load[user] <= 0:
+            del self._user_load[user]
+
+    def _handoff(self):
+        """Give a freed slot to the next live waiter (caller holds self._lock)"""
+        while self._queue:
+            _, _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            self._record_wait((time.perf_counter() - waiter.enqueued) * 1000)
+            if waiter.loop is None:
+                waiter.event.set()
+            else:
+                waiter.loop.call_soon_threadsafe(self._wake_async, waiter)
+            return
+        self._in_flight -= 1
+
+    def _wake_async(self, waiter: _Waiter):
+        if waiter.future.cancelled():
+            # The task gave up after being granted - pass the slot on
+            with self._lock:
+                self._handoff()
+        else:
+            waiter.future.set_result(True)
+
+    def _record_wait(self, wait_ms: float):
+        self._waits_ms.append(wait_ms)
+        self.metrics["wait_ms_total"] += wait_ms
+        self.metrics["wait_ms_max"] = max(self.metrics["wait_ms_max"], wait_ms)
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_ANSWER, user=None):
+        waiter = _Waiter(user)
+        if not self._enqueue(priority, user, waiter):
+            waiter.event.wait()
+        try:
+            yield
+        finally:
+            self._release(user)
+
+    @asynccontextmanager
+    async def aslot(self, priority: int = PRIORITY_ANSWER, user=None):
+        waiter = _Waiter(user, asyncio.get_running_loop())
+        if not self._enqueue(priority, user, waiter):
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Cancelled after _wake_async granted the slot - give it back
+                    self._release(user)
+                else:
+                    with self._lock:
+                        waiter.cancelled = True
+                        self._drop_user(user)
+                raise
+        try:
+            yield
+        finally:
+            self._release(user)
+
+    # ── LLM calls ────────────────────────────────────────────────────────────
+    # Identical prompts already in flight share one generation (and one slot).
+    # Streams are not coalesced - every stream has its own client waiting on it.
+    def invoke(self, prompt: str, priority: int = PRIORITY_ANSWER, user=None) -> str:
+        return llm_flight.do(prompt, lambda: self._invoke(prompt, priority, user))
+
+    async def ainvoke(self, prompt: str, priority: int = PRIORITY_ANSWER, user=None) -> str:
+        return await llm_flight.ado(prompt, lambda: self._ainvoke(prompt, priority, user))
+
+    def _invoke(self, prompt: str, priority: int, user) -> str:
+        with self.slot(priority, user):
+            return self.client.invoke(prompt)
+
+    async def _ainvoke(self, prompt: str, priority: int, user) -> str:
+        async with self.aslot(priority, user):
+            return await self.client.ainvoke(prompt)
+
+    def stream(self, prompt: str, priority: int = PRIORITY_ANSWER, user=None):
+        with self.slot(priority, user):
+            yield from self.client.stream(prompt)
+
+    async def astream(self, prompt: str, priority: int = PRIORITY_ANSWER, user=None):
+        async with self.aslot(priority, user):
+            async for chunk in self.client.astream(prompt):
+                yield chunk
+
+    def runnable(self, priority: int = PRIORITY_ANSWER) -> RunnableLambda:
+        """The gateway as an LCEL runnable, for chains like `prompt | llm`"""
+        def _invoke(prompt_value):
+            return self.invoke(_prompt_text(prompt_value), priority)
+
+        async def _ainvoke(prompt_value):
+            return await self.ainvoke(_prompt_text(prompt_value), priority)
+
+        return RunnableLambda(_invoke, afunc=_ainvoke)
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            granted = len(self._waits_ms)
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "queue_depth": sum(1 for entry in self._queue if not entry[3].cancelled),
+                **self.metrics,
+                "by_priority": dict(self.metrics["by_priority"]),
+                "wait_ms_p50": round(waits[int(0.50 * (granted - 1))], 1) if granted else 0.0,
+                "wait_ms_p95": round(waits[int(0.95 * (granted - 1))], 1) if granted else 0.0,
+            }
+
+
+def _prompt_text(prompt_value) -> str:
+    return prompt_value if isinstance(prompt_value, str) else prompt_value.to_string()
+
+
+gateway = LLMGateway(llm)
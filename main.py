@@ -1,26 +1,38 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import FileResponse
-from langchain_ollama import OllamaLLM
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
 
 
 from planner import plan_tool_call
 #from mcp_client import call_mcp_tool
 from summarizer import summarize
 from tool_executor import execute_tool
-from agent import run_simple_agent  # Import the agent
-import sqlite3
+from mcp_server import api_client
+from agent import arun_agent, astream_agent, AGENT_METRICS  # Import the agent
+from llm_gateway import gateway, PRIORITY_BACKGROUND
+from singleflight import single_flight_stats
+from answer_cache import answer_cache
+from tool_cache import tool_cache
+from db_pool import db_executor, db_pool
+from migrations import migrate
+from session_store import session_store
+from conversation_memory import conversation_memory
+from statement_index import DOCS_DIR, statement_index
+from downloads import CACHE_CONTROL, bundle_etag, file_etag, is_not_modified, last_modified, zip_stream
+import data_access
+from data_access import get_db_connection
+from insights_store import insights_store, start_refresher, RAG_AVAILABLE as INSIGHTS_AVAILABLE
+from contextlib import asynccontextmanager
 from typing import Optional
-import secrets
 from pathlib import Path
 import os
+import secrets
 
 import json
 
-DB_NAME = "AIGurukul.db"
-DOCS_DIR = Path("Account_docs")  # Directory containing customer documents
 
 '''from mcp_tools import (
     get_account_balance,
@@ -38,15 +50,25 @@ tools = [
     get_periodic_statements,
 ]'''
 
-app = FastAPI()
-
-llm = OllamaLLM(
-    model="gemma3:4b",
-    base_url="http://localhost:11434"
-)
-
-# Session storage: {token: {"username": str, "accountId": int}}
-active_sessions = {}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the schema (indexes, AdHocStatement) up to date before serving
+    migrate(data_access.DB_NAME)
+    # One directory listing up front; lookups are then served from memory
+    statement_index.start()
+    # Keep the precomputed market-insights report fresh in the background
+    if INSIGHTS_AVAILABLE:
+        start_refresher(lambda prompt: gateway.invoke(prompt, PRIORITY_BACKGROUND))
+    yield
+    await api_client.aclose()
+    api_client.close()
+    db_pool.close_all()
+    statement_index.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Session storage: token -> {"username": str, "accountId": int}, shared
+# between workers unless SESSION_BACKEND is memory (see session_store.py)
 
 # Allow React frontend
 app.add_middleware(
@@ -68,11 +90,6 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def mask_account_number(account_id):
     """Mask account number to show only last 4 digits"""
     account_str = str(account_id)
@@ -97,81 +114,45 @@ def mask_account_numbers_in_result(data, account_id):
     else:
         return data
 
-def find_statement_files(account_id: int, statement_type: str = "all") -> list:
+class StreamMasker:
+    """
+    Masks the account number in streamed text, even when the LLM splits it
+    across chunks: a tail that could be the start of the number is held
+    back until the next chunk (or flush) shows whether it is.
     """
-    Find statement files for a given account
+
+    def __init__(self, account_id):
+        self.account = str(account_id)
+        self.masked = mask_account_number(account_id)
+        self.pending = ""
+
+    def feed(self, text: str) -> str:
+        """Masked text that is safe to send now"""
+        text = (self.pending + text).replace(self.account, self.masked)
+        hold = next((n for n in range(min(len(self.account) - 1, len(text)), 0, -1)
+                     if self.account.startswith(text[-n:])), 0)
+        self.pending = text[len(text) - hold:]
+        return text[:len(text) - hold]
+
+    def flush(self) -> str:
+        """Whatever is still held back (it was not the account number)"""
+        text, self.pending = self.pending, ""
+        return text
+
+def find_statement_files(account_id: int, statement_type: str = "all", year: Optional[int] = None) -> list:
+    """
+    Find statement files for a given account (served from the statement index)
     
     Args:
         account_id: The account ID
         statement_type: "monthly", "annual", or "all"
+        year: only statements for this year
     
     Returns:
-        List of dicts with file info: {name, path, type, size}
+        List of dicts with file info: {name, path, type, period, size, download_url}
     """
-    files = []
-    account_str = str(account_id)
-    
-    if not DOCS_DIR.exists():
-        print(f"⚠️ Documents directory not found: {DOCS_DIR}")
-        return files
-    
-    # Search patterns - make more flexible
-    patterns = []
-    
-    if statement_type == "monthly" or statement_type == "all":
-        patterns.extend([
-            f"*{account_str}*monthly*.pdf",
-            f"*{account_str}*month*.pdf",
-            f"{account_str}_monthly*.pdf",
-            f"{account_str}_month*.pdf"
-        ])
-    
-    if statement_type == "annual" or statement_type == "all":
-        patterns.extend([
-            f"*{account_str}*annual*.pdf",
-            f"*{account_str}*yearly*.pdf",
-            f"*{account_str}*year*.pdf",
-            f"{account_str}_annual*.pdf",
-            f"{account_str}_year*.pdf"
-        ])
-    
-    if statement_type == "all":
-        patterns.extend([
-            f"*{account_str}*statement*.pdf",
-            f"{account_str}_statement*.pdf",
-            f"{account_str}*.pdf"
-        ])
-    
-    seen_files = set()
-    
-    for pattern in patterns:
-        matching_files = list(DOCS_DIR.glob(pattern))
-        print(f"🔍 Pattern '{pattern}' found {len(matching_files)} files")
-        
-        for file_path in matching_files:
-            if file_path.name not in seen_files:
-                seen_files.add(file_path.name)
-                
-                # Determine file type
-                name_lower = file_path.name.lower()
-                if "month" in name_lower and "annual" not in name_lower:
-                    file_type = "monthly"
-                elif "annual" in name_lower or "yearly" in name_lower or "year" in name_lower:
-                    file_type = "annual"
-                elif "statement" in name_lower:
-                    file_type = "statement"
-                else:
-                    file_type = "document"
-                
-                files.append({
-                    "name": file_path.name,
-                    "path": str(file_path),
-                    "type": file_type,
-                    "size": file_path.stat().st_size,
-                    "download_url": f"/api/download/{file_path.name}"
-                })
-    
-    print(f"📄 Found {len(files)} total files for account {account_str}")
+    files = statement_index.find(account_id, statement_type, year=year)
+    print(f"📄 Found {len(files)} total files for account {account_id}")
     return files
 
 def get_user_from_db(username: str, password: str):
@@ -186,33 +167,38 @@ def get_user_from_db(username: str, password: str):
     """, (username, password))
     
     row = cursor.fetchone()
-    conn.close()
     
     if row:
         return dict(row)
     return None
 
+aget_user_from_db = db_executor.wrap(get_user_from_db)
+
 def get_session_user(token: str) -> Optional[dict]:
     """Get user info from active session"""
-    return active_sessions.get(token)
+    return session_store.get_session(token)
+
+# Session lookups are SQLite / Redis round trips with those backends, so
+# async routes run them on the DB executor instead of the event loop
+aget_session_user = db_executor.wrap(get_session_user)
+acreate_session = db_executor.wrap(session_store.create_session)
 
 # ---- Routes ----
 @app.post("/login")
-def login(req: LoginRequest):
+async def login(req: LoginRequest):
     # Authenticate user from database
-    user = get_user_from_db(req.username, req.password)
+    user = await aget_user_from_db(req.username, req.password)
     
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Generate session token
-    token = secrets.token_urlsafe(32)
-    
-    # Store session with accountId (full number for internal use)
-    active_sessions[token] = {
+    # Store session with accountId (full number for internal use) under a new token.
+    # chatSession keys the conversation memory, so the token never appears in /metrics.
+    token = await acreate_session({
         "username": user["username"],
-        "accountId": user["accountId"]
-    }
+        "accountId": user["accountId"],
+        "chatSession": secrets.token_hex(8)
+    })
     
     return {
         "status": "success",
@@ -224,9 +210,11 @@ def login(req: LoginRequest):
 
 @app.post("/logout")
 def logout(token: str):
-    """Logout and clear session"""
-    if token in active_sessions:
-        del active_sessions[token]
+    """Logout and clear session (and its conversation memory)"""
+    user_session = get_session_user(token)
+    if user_session and user_session.get("chatSession"):
+        conversation_memory.clear(user_session["chatSession"])
+    session_store.delete_session(token)
     return {"status": "logged out"}
 
 # ADDED THIS NEW ENDPOINT HERE
@@ -237,19 +225,55 @@ def get_welcome_message():
         "status": "ready"
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Running counters for watching the agent pipeline"""
+    requests_served = AGENT_METRICS["requests"]
+    streamed = AGENT_METRICS["streamed_requests"]
+    return {
+        "agent": {
+            **AGENT_METRICS,
+            "llm_calls_per_request": round(AGENT_METRICS["llm_calls"] / requests_served, 2) if requests_served else 0.0,
+            "avg_ttft_ms": round(AGENT_METRICS["ttft_ms_total"] / streamed, 1) if streamed else 0.0
+        },
+        "llm_gateway": gateway.stats(),
+        "single_flight": single_flight_stats(),
+        "tool_http": api_client.stats(),
+        "answer_cache": answer_cache.stats(),
+        "tool_cache": tool_cache.stats(),
+        "db_pool": db_pool.stats(),
+        "db_executor": db_executor.stats(),
+        "sessions": session_store.stats(),
+        "statement_index": statement_index.stats(),
+        "conversation_memory": conversation_memory.stats(),
+        "insights_reports": insights_store.stats()
+    }
+
+@app.get("/memory")
+def get_memory_usage(token: str):
+    """Conversation memory used by the caller's own session"""
+    user_session = get_session_user(token)
+    if not user_session:
+        raise HTTPException(status_code=401, detail="Invalid or expired session.")
+    if not user_session.get("chatSession"):
+        return {"messages": 0, "has_summary": False, "tokens": 0, "summary_tokens": 0, "bytes": 0}
+    usage = conversation_memory.usage(user_session["chatSession"])
+    usage.pop("session_id")
+    return usage
+
 # New endpoint for getting insights
 @app.post("/insights")
-def get_insights(req: ChatRequest):
+async def get_insights(req: ChatRequest):
     """Get personalized insights based on other customers' data"""
-    user_session = get_session_user(req.token)
+    user_session = await aget_session_user(req.token)
     if not user_session:
         raise HTTPException(status_code=401, detail="Invalid or expired session.")
     
     try:
-        from rag_service import get_insights_from_other_customers
+        from rag_service import aget_insights_from_other_customers
         
         user_account_id = user_session["accountId"]
-        insights = get_insights_from_other_customers(user_account_id, "general")
+        insights = await aget_insights_from_other_customers(user_account_id, "general")
         
         return {"insights": insights}
     except ImportError:
@@ -259,8 +283,8 @@ def get_insights(req: ChatRequest):
 
 # New endpoint for listing available documents
 @app.get("/api/statements/{account}/files")
-def list_statement_files(account: int, token: str):
-    """List available statement files for an account"""
+def list_statement_files(account: int, token: str, statementType: str = "all", year: Optional[int] = None):
+    """List available statement files for an account (newest first, optionally by type and year)"""
     user_session = get_session_user(token)
     if not user_session:
         raise HTTPException(status_code=401, detail="Invalid or expired session.")
@@ -269,28 +293,37 @@ def list_statement_files(account: int, token: str):
     if user_session["accountId"] != account:
         raise HTTPException(status_code=403, detail="Access denied.")
     
-    files = find_statement_files(account)
+    files = find_statement_files(account, statementType, year)
     return {
         "accountId": account,
         "files": files,
         "count": len(files)
     }
 
-# New endpoint for downloading files
-@app.get("/api/download/{filename}")
-def download_file(filename: str, token: str):
-    """Download a statement file"""
-    user_session = get_session_user(token)
-    if not user_session:
-        raise HTTPException(status_code=401, detail="Invalid or expired session.")
+def resolve_statement_file(filename: str, user_session: dict) -> Path:
+    """
+    Ownership and path checks shared by single downloads and bundles
     
-    # Security: Verify filename contains user's account ID
-    user_account_id = str(user_session["accountId"])
-    if user_account_id not in filename:
+    Only names the statement index lists for the session's account are
+    served, so a path like "<own account>/<other account's file>" can never
+    reach another account's statement.
+    
+    Raises:
+        HTTPException: 400 for a name with a path in it, 403 if the file
+            doesn't belong to the session's account, 404 if it doesn't
+            exist, 400 if it isn't a regular file
+    """
+    # Prevent directory traversal attacks: plain file names only
+    if "/" in filename or "\\" in filename or ".." in filename or filename != os.path.basename(filename):
+        raise HTTPException(status_code=400, detail="Invalid file name.")
+    
+    # Security: Verify the index lists the file under the user's account
+    user_account_id = user_session["accountId"]
+    if not statement_index.belongs_to(filename, user_account_id):
+        if str(user_account_id) in filename and not (DOCS_DIR / filename).exists():
+            raise HTTPException(status_code=404, detail="File not found.")
         raise HTTPException(status_code=403, detail="Access denied. This file doesn't belong to your account.")
     
-    # Prevent directory traversal attacks
-    filename = os.path.basename(filename)
     file_path = DOCS_DIR / filename
     
     if not file_path.exists():
@@ -299,79 +332,180 @@ def download_file(filename: str, token: str):
     if not file_path.is_file():
         raise HTTPException(status_code=400, detail="Invalid file.")
     
+    return file_path
+
+# New endpoint for downloading files
+@app.get("/api/download/{filename}")
+def download_file(filename: str, token: str, request: Request):
+    """
+    Download a statement file
+    
+    Sends ETag / Last-Modified: a repeat download with If-None-Match or
+    If-Modified-Since gets a 304, and Range requests (resumed downloads)
+    get 206 partial content.
+    """
+    user_session = get_session_user(token)
+    if not user_session:
+        raise HTTPException(status_code=401, detail="Invalid or expired session.")
+    
+    file_path = resolve_statement_file(filename, user_session)
+    stat_result = file_path.stat()
+    validators = {
+        "ETag": file_etag(stat_result),
+        "Last-Modified": last_modified(stat_result.st_mtime),
+        "Cache-Control": CACHE_CONTROL,
+    }
+    if is_not_modified(request.headers, validators["ETag"], stat_result.st_mtime):
+        return Response(status_code=304, headers=validators)
+    
     return FileResponse(
         path=str(file_path),
-        filename=filename,
-        media_type='application/pdf'
+        filename=file_path.name,
+        media_type='application/pdf',
+        headers=validators,
+        stat_result=stat_result
+    )
+
+# Several statements in one download
+@app.get("/api/statements/{account}/bundle")
+def download_statement_bundle(
+    account: int,
+    token: str,
+    request: Request,
+    statementType: str = "all",
+    year: Optional[int] = None,
+    files: Optional[str] = None
+):
+    """
+    Stream a ZIP of an account's statements, built on the fly
+    
+    Either `files` (comma-separated names, as returned by
+    /api/statements/{account}/files) or the statementType / year filter
+    picks the statements. Every file goes through the same ownership
+    check as /api/download.
+    """
+    user_session = get_session_user(token)
+    if not user_session:
+        raise HTTPException(status_code=401, detail="Invalid or expired session.")
+    
+    if user_session["accountId"] != account:
+        raise HTTPException(status_code=403, detail="Access denied.")
+    
+    if files:
+        names = list(dict.fromkeys(name.strip() for name in files.split(",") if name.strip()))
+    else:
+        names = [f["name"] for f in find_statement_files(account, statementType, year)]
+    if not names:
+        raise HTTPException(status_code=404, detail="No statements match.")
+    
+    paths = [resolve_statement_file(name, user_session) for name in names]
+    stats = [(path.name, path.stat()) for path in paths]
+    newest = max(stat_result.st_mtime for _, stat_result in stats)
+    validators = {
+        "ETag": bundle_etag(stats),
+        "Last-Modified": last_modified(newest),
+        "Cache-Control": CACHE_CONTROL,
+    }
+    if is_not_modified(request.headers, validators["ETag"], newest):
+        return Response(status_code=304, headers=validators)
+    
+    bundle_name = f"statements_{account}_{year or 'all'}_{statementType}.zip" if not files else f"statements_{account}.zip"
+    return StreamingResponse(
+        zip_stream([(path.name, path) for path in paths]),
+        media_type="application/zip",
+        headers={**validators, "Content-Disposition": f'attachment; filename="{bundle_name}"'}
     )
 
 # 1️⃣ Account Balance - Now requires authentication
 @app.get("/api/accounts/{account}/balance")
-def get_account_balance_api(account: int):
+async def get_account_balance_api(account: int):
     """Direct API endpoint - public for now"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT accountId, balanceAmount, currency, asOfDate
-        FROM AccountBalance
-        WHERE accountId = ?
-        ORDER BY asOfDate DESC
-        LIMIT 1
-    """, (account,))
-
-    row = cursor.fetchone()
-    conn.close()
-
-    if not row:
+    try:
+        return await data_access.aget_account_balance(account)
+    except data_access.AccountNotFound:
         raise HTTPException(status_code=404, detail="Account not found")
 
-    return dict(row)
-
 # 3️⃣ Transaction History
 @app.get("/api/accounts/{account}/transactions")
-def get_transaction_history_api(account: int):
-    """Direct API endpoint - public for now"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+async def get_transaction_history_api(
+    account: int,
+    startDate: Optional[str] = None,
+    endDate: Optional[str] = None,
+    transactionType: Optional[str] = None,
+    productCode: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Direct API endpoint - public for now. List filters and fields are comma-separated."""
+    try:
+        return await data_access.aget_transaction_history(
+            account, startDate, endDate, transactionType, productCode, status, limit, cursor, fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    cursor.execute("""
-        SELECT transactionId, date, description, netAmount, type, "balance After"
-        FROM TransactionHistory
-        WHERE accountId = ?
-        ORDER BY date DESC
-    """, (account,))
+# 📊 Transaction analytics (aggregated in SQL)
+@app.get("/api/accounts/{account}/analytics/breakdown")
+async def get_spending_breakdown_api(
+    account: int,
+    groupBy: str = "type",
+    startDate: Optional[str] = None,
+    endDate: Optional[str] = None,
+    transactionType: Optional[str] = None,
+    productCode: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Totals per type, productCode or investmentOption. List filters are comma-separated."""
+    try:
+        return await data_access.aget_spending_breakdown(
+            account, groupBy, startDate, endDate, transactionType, productCode, status
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    rows = cursor.fetchall()
-    conn.close()
+@app.get("/api/accounts/{account}/analytics/monthly")
+async def get_monthly_totals_api(
+    account: int,
+    startDate: Optional[str] = None,
+    endDate: Optional[str] = None,
+    transactionType: Optional[str] = None,
+    productCode: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Money in, money out and net flow per month"""
+    try:
+        return await data_access.aget_monthly_totals(account, startDate, endDate, transactionType, productCode, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "accountId": account,
-        "transactions": [dict(row) for row in rows]
-    }
+@app.get("/api/accounts/{account}/analytics/fees")
+async def get_fee_summary_api(
+    account: int,
+    startDate: Optional[str] = None,
+    endDate: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Fee transactions and gross vs net deductions"""
+    try:
+        return await data_access.aget_fee_summary(account, startDate, endDate, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/accounts/{account}/analytics/balance")
+async def get_balance_stats_api(account: int, startDate: Optional[str] = None, endDate: Optional[str] = None):
+    """Running balance statistics"""
+    try:
+        return await data_access.aget_balance_stats(account, startDate, endDate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # 4️⃣ AdHoc Statements
 @app.get("/api/accounts/{account}/statements/adhoc")
-def get_adhoc_statements_api(account: int):
+async def get_adhoc_statements_api(account: int):
     """Direct API endpoint - public for now"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT statementId, startDate, endDate, requestId,
-               submittedByRole, requestTimestamp
-        FROM AdHocStatement
-        WHERE accountId = ?
-        ORDER BY requestTimestamp DESC
-    """, (account,))
-
-    rows = cursor.fetchall()
-    conn.close()
-
-    return {
-        "accountId": account,
-        "adhocStatements": [dict(row) for row in rows]
-    }
+    return await data_access.aget_adhoc_statements(account)
 
 FINAL_ANSWER_PROMPT = """
 You are a banking assistant.
@@ -399,49 +533,20 @@ Answer clearly and professionally.
 
 # 5️⃣ Periodic (Current) Statements
 @app.get("/api/accounts/{account}/statements/current")
-def get_periodic_statements_api(
+async def get_periodic_statements_api(
     account: int,
     periodStartDate: Optional[str] = None,
     periodEndDate: Optional[str] = None
 ):
     """Direct API endpoint - public for now"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Build query with optional date filters
-    query = """
-        SELECT accountId, periodStartDate, periodEndDate, OpeningBalance, ClosingBalance
-        FROM PeriodicStatement
-        WHERE accountId = ?
-    """
-    params = [account]
-    
-    if periodStartDate:
-        query += " AND periodStartDate >= ?"
-        params.append(periodStartDate)
-    
-    if periodEndDate:
-        query += " AND periodEndDate <= ?"
-        params.append(periodEndDate)
-    
-    query += " ORDER BY periodEndDate DESC"
-    
-    cursor.execute(query, params)
-
-    rows = cursor.fetchall()
-    conn.close()
-
-    return {
-        "accountId": account,
-        "periodicStatements": [dict(row) for row in rows]
-    }
+    return await data_access.aget_periodic_statements(account, periodStartDate, periodEndDate)
 
 from tool_executor import execute_tool
 
 @app.post("/chat")
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     # Verify session
-    user_session = get_session_user(req.token)
+    user_session = await aget_session_user(req.token)
     if not user_session:
         raise HTTPException(status_code=401, detail="Invalid or expired session. Please login again.")
     
@@ -456,18 +561,20 @@ def chat(req: ChatRequest):
     print(f"Question: {req.message}")
     print(f"{'='*60}\n")
     
-    # Use the agentic system
+    # Use the agentic system (async: LLM, tool and RAG calls don't hold a worker thread)
     try:
-        result = run_simple_agent(
+        result = await arun_agent(
             user_question=req.message,
             user_account_id=user_account_id,
-            username=username
+            username=username,
+            session_id=user_session.get("chatSession")
         )
         
         print(f"\n{'='*60}")
         print(f"🎯 AGENT COMPLETED")
         print(f"Type: {result['type']}")
         print(f"Iterations: {result.get('iterations', 0)}")
+        print(f"LLM calls: {result.get('llm_calls', 0)}")
         if 'tools_used' in result:
             print(f"Tools used: {[t['tool'] for t in result['tools_used']]}")
         if 'note' in result:
@@ -477,35 +584,11 @@ def chat(req: ChatRequest):
         # Get response text
         response_text = result.get("response", "I couldn't process your request.")
         
-        # Add note if partial answer
-        if result.get('type') == 'partial_answer' and result.get('note'):
-            response_text += f"\n\n_Note: {result['note']}_"
-        
         # Mask account numbers in response
         response_text = response_text.replace(str(user_account_id), masked_account)
         
-        # Append insight prompt if applicable
-        if result.get("ask_insights", False):
-            response_text += "\n\n---\n💡 **Would you like insights on your account by comparing to market trends on how to improve your profit and investment?**"
-        
-        # Check if documents are available
-        documents = []
-        if result.get('has_documents', False):
-            # Determine what type of statement is being requested
-            statement_type = "all"
-            if "annual" in req.message.lower() or "yearly" in req.message.lower():
-                statement_type = "annual"
-            elif "monthly" in req.message.lower() or "month" in req.message.lower():
-                statement_type = "monthly"
-            
-            documents = find_statement_files(user_account_id, statement_type)
-            
-            # Enhance response if documents found
-            if documents:
-                doc_count = len(documents)
-                response_text += f"\n\n📄 I found {doc_count} document{'s' if doc_count != 1 else ''} for you. Click the download button{'s' if doc_count != 1 else ''} below to access your statement{'s' if doc_count != 1 else ''}."
-            else:
-                response_text += f"\n\n⚠️ I couldn't find any statement documents in our system. Please contact support if you believe this is an error."
+        documents = await run_in_threadpool(get_result_documents, result, req.message, user_account_id)
+        response_text += build_response_suffix(result, documents)
         
         return {
             "response": response_text,
@@ -520,4 +603,113 @@ def chat(req: ChatRequest):
         return {
             "response": "I encountered an error processing your request. Please try again or rephrase your question.",
             "documents": None
-        }
\ No newline at end of file
+        }
+
+def get_result_documents(result: dict, message: str, user_account_id: int) -> list:
+    """Statement files to attach when the agent flagged a document request"""
+    if not result.get('has_documents', False):
+        return []
+    
+    # Determine what type of statement is being requested
+    statement_type = "all"
+    if "annual" in message.lower() or "yearly" in message.lower():
+        statement_type = "annual"
+    elif "monthly" in message.lower() or "month" in message.lower():
+        statement_type = "monthly"
+    
+    return find_statement_files(user_account_id, statement_type)
+
+def build_response_suffix(result: dict, documents: list) -> str:
+    """Text appended after the agent's answer (notes, insight offer, document summary)"""
+    suffix = ""
+    
+    # Add note if partial answer
+    if result.get('type') == 'partial_answer' and result.get('note'):
+        suffix += f"\n\n_Note: {result['note']}_"
+    
+    # Append insight prompt if applicable
+    if result.get("ask_insights", False):
+        suffix += "\n\n---\n💡 **Would you like insights on your account by comparing to market trends on how to improve your profit and investment?**"
+    
+    # Enhance response if documents found
+    if result.get('has_documents', False):
+        if documents:
+            doc_count = len(documents)
+            suffix += f"\n\n📄 I found {doc_count} document{'s' if doc_count != 1 else ''} for you. Click the download button{'s' if doc_count != 1 else ''} below to access your statement{'s' if doc_count != 1 else ''}."
+        else:
+            suffix += f"\n\n⚠️ I couldn't find any statement documents in our system. Please contact support if you believe this is an error."
+    
+    return suffix
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Streaming variant of /chat (Server-Sent Events).
+    
+    Events: "stage" (guard / tool / rag / insights / generating), "token"
+    (answer text as Ollama generates it), "documents" (statement attachments)
+    and a final "done" with llm_calls and ttft_ms.
+    """
+    # Verify session
+    user_session = await aget_session_user(req.token)
+    if not user_session:
+        raise HTTPException(status_code=401, detail="Invalid or expired session. Please login again.")
+    
+    user_account_id = user_session["accountId"]
+    username = user_session["username"]
+    masked_account = mask_account_number(user_account_id)
+    
+    print(f"\n{'='*60}")
+    print(f"💬 NEW STREAMING CHAT REQUEST")
+    print(f"User: {username} | Account: {masked_account}")
+    print(f"Question: {req.message}")
+    print(f"{'='*60}\n")
+    
+    async def event_stream():
+        try:
+            result = {}
+            masker = StreamMasker(user_account_id)
+            async for event in astream_agent(req.message, user_account_id, username,
+                                             session_id=user_session.get("chatSession")):
+                if event["event"] == "stage":
+                    yield sse_event("stage", {k: v for k, v in event.items() if k != "event"})
+                elif event["event"] == "token":
+                    text = masker.feed(event["text"])
+                    if text:
+                        yield sse_event("token", {"text": text})
+                elif event["event"] == "result":
+                    result = event["result"]
+            text = masker.flush()
+            if text:
+                yield sse_event("token", {"text": text})
+            
+            documents = await run_in_threadpool(get_result_documents, result, req.message, user_account_id)
+            suffix = build_response_suffix(result, documents)
+            if suffix:
+                yield sse_event("token", {"text": suffix})
+            if documents:
+                yield sse_event("documents", {"documents": documents})
+            
+            yield sse_event("done", {
+                "type": result.get("type"),
+                "llm_calls": result.get("llm_calls", 0),
+                "ttft_ms": result.get("ttft_ms")
+            })
+        
+        except Exception as e:
+            print(f"❌ Agent error: {e}")
+            import traceback
+            traceback.print_exc()
+            yield sse_event("error", {
+                "response": "I encountered an error processing your request. Please try again or rephrase your question."
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
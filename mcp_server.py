@@ -1,48 +1,67 @@
 from fastmcp import FastMCP
-import requests
+import os
 
-BASE_API_URL = "http://localhost:8000"
+from http_client import APIClient
+
+BASE_API_URL = os.getenv("BANKING_API_URL", "http://localhost:8000")
+
+# Pooled keep-alive client shared by every tool function
+api_client = APIClient(BASE_API_URL)
 
 mcp = FastMCP("banking-mcp-tools")
 
 # Store the raw functions, not the decorated ones
 TOOLS = {}   
 
+# Async versions of the same tools (used by the async agent path)
+ASYNC_TOOLS = {}
+
 
 def get_account_balance_fn(account_id: int) -> dict:
     """Get account balance"""
-    r = requests.get(f"{BASE_API_URL}/api/accounts/{account_id}/balance")
-    r.raise_for_status()
-    return r.json()
+    return api_client.get(f"/api/accounts/{account_id}/balance")
+
+
+def get_transaction_history_fn(account_id: int, startDate: str = None, endDate: str = None,
+                               transactionType: str = None, productCode: str = None, status: str = None,
+                               limit: int = None, cursor: str = None, fields: str = None) -> dict:
+    """
+    Get transaction history, newest first. Optional: date range (YYYY-MM-DD),
+    comma-separated transactionType / productCode / status filters, limit,
+    cursor (nextCursor of the previous page) and comma-separated fields
+    """
+    return api_client.get(
+        f"/api/accounts/{account_id}/transactions",
+        params=_transaction_params(startDate, endDate, transactionType, productCode, status, limit, cursor, fields)
+    )
 
 
-def get_transaction_history_fn(account_id: int) -> dict:
-    """Get transaction history"""
-    r = requests.get(f"{BASE_API_URL}/api/accounts/{account_id}/transactions")
-    r.raise_for_status()
-    return r.json()
+def _transaction_params(startDate, endDate, transactionType, productCode, status, limit, cursor, fields) -> dict:
+    params = {
+        "startDate": startDate, "endDate": endDate, "transactionType": transactionType,
+        "productCode": productCode, "status": status, "limit": limit, "cursor": cursor, "fields": fields,
+    }
+    # Lists from the agent go over the wire comma-separated
+    return {
+        key: ",".join(map(str, value)) if isinstance(value, (list, tuple)) else value
+        for key, value in params.items() if value is not None
+    } or None
 
 
 def get_adhoc_statements_fn(account_id: int) -> dict:
     """Get ad-hoc statements"""
-    r = requests.get(
-        f"{BASE_API_URL}/api/accounts/{account_id}/statements/adhoc"
-    )
-    r.raise_for_status()
-    return r.json()
+    return api_client.get(f"/api/accounts/{account_id}/statements/adhoc")
 
 
 def get_periodic_statements_fn(account_id: int, periodStartDate: str = None, periodEndDate: str = None) -> dict:
     """Get periodic statements"""
-    r = requests.get(
-        f"{BASE_API_URL}/api/accounts/{account_id}/statements/current",
+    return api_client.get(
+        f"/api/accounts/{account_id}/statements/current",
         params={
             "periodStartDate": periodStartDate,
             "periodEndDate": periodEndDate
         } if periodStartDate or periodEndDate else None
     )
-    r.raise_for_status()
-    return r.json()
 
 
 def get_statement_documents_fn(account_id: int) -> dict:
@@ -56,16 +75,160 @@ def get_statement_documents_fn(account_id: int) -> dict:
     }
 
 
+def get_spending_breakdown_fn(account_id: int, groupBy: str = "type", startDate: str = None, endDate: str = None,
+                              transactionType: str = None, productCode: str = None, status: str = None) -> dict:
+    """
+    Spending totals (money in, money out, net, fees deducted) grouped by
+    type, productCode or investmentOption. Optional date range (YYYY-MM-DD)
+    and comma-separated filters
+    """
+    return api_client.get(
+        f"/api/accounts/{account_id}/analytics/breakdown",
+        params=_analytics_params(groupBy=groupBy, startDate=startDate, endDate=endDate,
+                                 transactionType=transactionType, productCode=productCode, status=status)
+    )
+
+
+def get_monthly_totals_fn(account_id: int, startDate: str = None, endDate: str = None,
+                          transactionType: str = None, productCode: str = None, status: str = None) -> dict:
+    """Money in, money out and net flow per month. Optional date range (YYYY-MM-DD) and filters"""
+    return api_client.get(
+        f"/api/accounts/{account_id}/analytics/monthly",
+        params=_analytics_params(startDate=startDate, endDate=endDate, transactionType=transactionType,
+                                 productCode=productCode, status=status)
+    )
+
+
+def get_fee_summary_fn(account_id: int, startDate: str = None, endDate: str = None, status: str = None) -> dict:
+    """Fees paid: fee transactions plus gross vs net deductions. Optional date range (YYYY-MM-DD)"""
+    return api_client.get(
+        f"/api/accounts/{account_id}/analytics/fees",
+        params=_analytics_params(startDate=startDate, endDate=endDate, status=status)
+    )
+
+
+def get_balance_stats_fn(account_id: int, startDate: str = None, endDate: str = None) -> dict:
+    """Running balance statistics (opening, closing, min, max, average). Optional date range (YYYY-MM-DD)"""
+    return api_client.get(
+        f"/api/accounts/{account_id}/analytics/balance",
+        params=_analytics_params(startDate=startDate, endDate=endDate)
+    )
+
+
+def _analytics_params(**params) -> dict:
+    return {
+        key: ",".join(map(str, value)) if isinstance(value, (list, tuple)) else value
+        for key, value in params.items() if value is not None
+    } or None
+
+
+async def _aget(path: str, params: dict = None) -> dict:
+    """Non-blocking GET against the banking API"""
+    return await api_client.aget(path, params)
+
+
+async def aget_account_balance_fn(account_id: int) -> dict:
+    """Get account balance (async)"""
+    return await _aget(f"/api/accounts/{account_id}/balance")
+
+
+async def aget_transaction_history_fn(account_id: int, startDate: str = None, endDate: str = None,
+                                     transactionType: str = None, productCode: str = None, status: str = None,
+                                     limit: int = None, cursor: str = None, fields: str = None) -> dict:
+    """Get transaction history (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/transactions",
+        params=_transaction_params(startDate, endDate, transactionType, productCode, status, limit, cursor, fields)
+    )
+
+
+async def aget_adhoc_statements_fn(account_id: int) -> dict:
+    """Get ad-hoc statements (async)"""
+    return await _aget(f"/api/accounts/{account_id}/statements/adhoc")
+
+
+async def aget_periodic_statements_fn(account_id: int, periodStartDate: str = None, periodEndDate: str = None) -> dict:
+    """Get periodic statements (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/statements/current",
+        params={
+            "periodStartDate": periodStartDate,
+            "periodEndDate": periodEndDate
+        } if periodStartDate or periodEndDate else None
+    )
+
+
+async def aget_statement_documents_fn(account_id: int) -> dict:
+    """Get available statement documents for download (async)"""
+    return get_statement_documents_fn(account_id)
+
+
+async def aget_spending_breakdown_fn(account_id: int, groupBy: str = "type", startDate: str = None,
+                                    endDate: str = None, transactionType: str = None, productCode: str = None,
+                                    status: str = None) -> dict:
+    """Get spending breakdown (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/analytics/breakdown",
+        params=_analytics_params(groupBy=groupBy, startDate=startDate, endDate=endDate,
+                                 transactionType=transactionType, productCode=productCode, status=status)
+    )
+
+
+async def aget_monthly_totals_fn(account_id: int, startDate: str = None, endDate: str = None,
+                                 transactionType: str = None, productCode: str = None, status: str = None) -> dict:
+    """Get monthly totals (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/analytics/monthly",
+        params=_analytics_params(startDate=startDate, endDate=endDate, transactionType=transactionType,
+                                 productCode=productCode, status=status)
+    )
+
+
+async def aget_fee_summary_fn(account_id: int, startDate: str = None, endDate: str = None,
+                              status: str = None) -> dict:
+    """Get fee summary (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/analytics/fees",
+        params=_analytics_params(startDate=startDate, endDate=endDate, status=status)
+    )
+
+
+async def aget_balance_stats_fn(account_id: int, startDate: str = None, endDate: str = None) -> dict:
+    """Get running balance statistics (async)"""
+    return await _aget(
+        f"/api/accounts/{account_id}/analytics/balance",
+        params=_analytics_params(startDate=startDate, endDate=endDate)
+    )
+
+
 # Store raw functions in TOOLS dictionary
 TOOLS["get_account_balance"] = get_account_balance_fn
 TOOLS["get_transaction_history"] = get_transaction_history_fn
 TOOLS["get_adhoc_statements"] = get_adhoc_statements_fn
 TOOLS["get_periodic_statements"] = get_periodic_statements_fn
 TOOLS["get_statement_documents"] = get_statement_documents_fn
+TOOLS["get_spending_breakdown"] = get_spending_breakdown_fn
+TOOLS["get_monthly_totals"] = get_monthly_totals_fn
+TOOLS["get_fee_summary"] = get_fee_summary_fn
+TOOLS["get_balance_stats"] = get_balance_stats_fn
+
+ASYNC_TOOLS["get_account_balance"] = aget_account_balance_fn
+ASYNC_TOOLS["get_transaction_history"] = aget_transaction_history_fn
+ASYNC_TOOLS["get_adhoc_statements"] = aget_adhoc_statements_fn
+ASYNC_TOOLS["get_periodic_statements"] = aget_periodic_statements_fn
+ASYNC_TOOLS["get_statement_documents"] = aget_statement_documents_fn
+ASYNC_TOOLS["get_spending_breakdown"] = aget_spending_breakdown_fn
+ASYNC_TOOLS["get_monthly_totals"] = aget_monthly_totals_fn
+ASYNC_TOOLS["get_fee_summary"] = aget_fee_summary_fn
+ASYNC_TOOLS["get_balance_stats"] = aget_balance_stats_fn
 
 # Register with MCP (for MCP functionality)
 mcp.tool()(get_account_balance_fn)
 mcp.tool()(get_transaction_history_fn)
 mcp.tool()(get_adhoc_statements_fn)
 mcp.tool()(get_periodic_statements_fn)
-mcp.tool()(get_statement_documents_fn)
\ No newline at end of file
+mcp.tool()(get_statement_documents_fn)
+mcp.tool()(get_spending_breakdown_fn)
+mcp.tool()(get_monthly_totals_fn)
+mcp.tool()(get_fee_summary_fn)
+mcp.tool()(get_balance_stats_fn)
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Versioned schema migrations for AIGurukul.db.
+
+The database's PRAGMA user_version is the number of the last migration
+applied; migrate() runs the newer ones in order, each in its own
+transaction, and is called from the app's startup (main.lifespan).
+
+Run from the project folder to migrate and check that the account queries
+use the indexes (exit 1 if one does a full scan or a temp sort):
+    python migrations.py
+    python migrations.py --db /tmp/copy.db
+"""
+import argparse
+import sqlite3
+import sys
+
+# (version, description, statements) - append only, never edit a shipped one
+MIGRATIONS = [
+    (1, "Composite indexes for the per-account queries", [
+        # WHERE accountId = ? [AND date range] ORDER BY date DESC, transactionId DESC
+        "CREATE INDEX IF NOT EXISTS idx_transactionhistory_account_date "
+        "ON TransactionHistory (accountId, date, transactionId)",
+        # latest balance: WHERE accountId = ? ORDER BY asOfDate DESC LIMIT 1
+        "CREATE INDEX IF NOT EXISTS idx_accountbalance_account_asof ON AccountBalance (accountId, asOfDate)",
+        # WHERE accountId = ? [AND period range] ORDER BY periodEndDate DESC
+        "CREATE INDEX IF NOT EXISTS idx_periodicstatement_account_end "
+        "ON PeriodicStatement (accountId, periodEndDate)",
+        # login: WHERE username = ? AND password = ? (not UNIQUE: existing
+        # databases may hold duplicate usernames, and this is only for speed)
+        "CREATE INDEX IF NOT EXISTS idx_userdetails_username ON UserDetails (username)",
+    ]),
+    (2, "AdHocStatement table queried by /statements/adhoc", [
+        """
+        CREATE TABLE IF NOT EXISTS "AdHocStatement" (
+            "statementId" TEXT PRIMARY KEY,
+            "accountId" INTEGER NOT NULL,
+            "startDate" TEXT,
+            "endDate" TEXT,
+            "requestId" TEXT,
+            "submittedByRole" TEXT,
+            "requestTimestamp" TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_adhocstatement_account_requested "
+        "ON AdHocStatement (accountId, requestTimestamp)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(path: str) -> list:
+    """
+    Apply every migration newer than the database's user_version.
+
+    Returns:
+        versions applied (empty when already up to date)
+
+    Raises:
+        sqlite3.Error: a migration failed (it is rolled back, and the
+            earlier ones stay applied)
+    """
+    conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+    applied = []
+    try:
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version(conn):
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check under the write lock: another worker may have just migrated
+                if version <= current_version(conn):
+                    conn.execute("ROLLBACK")
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            print(f"🗄️ Applied migration {version}: {description}")
+            applied.append(version)
+    finally:
+        conn.close()
+    return applied
+
+
+# ─────────────────────────────────────────────
+# QUERY PLAN CHECKS
+# The hot per-account queries, each with the index it must use
+# ─────────────────────────────────────────────
+QUERY_PLAN_CHECKS = {
+    "transactions_page": (
+        'SELECT transactionId, date FROM TransactionHistory WHERE accountId = ? '
+        'ORDER BY date DESC, transactionId DESC LIMIT 21',
+        "idx_transactionhistory_account_date",
+    ),
+    "transactions_range": (
+        "SELECT transactionId FROM TransactionHistory WHERE accountId = ? AND date >= ? "
+        "AND date < date(?, '+1 day') ORDER BY date DESC, transactionId DESC",
+        "idx_transactionhistory_account_date",
+    ),
+    "latest_balance": (
+        "SELECT balanceAmount FROM AccountBalance WHERE accountId = ? ORDER BY asOfDate DESC LIMIT 1",
+        "idx_accountbalance_account_asof",
+    ),
+    "periodic_statements": (
+        "SELECT periodEndDate FROM PeriodicStatement WHERE accountId = ? ORDER BY periodEndDate DESC",
+        "idx_periodicstatement_account_end",
+    ),
+    "adhoc_statements": (
+        "SELECT statementId FROM AdHocStatement WHERE accountId = ? ORDER BY requestTimestamp DESC",
+        "idx_adhocstatement_account_requested",
+    ),
+    "user_lookup": (
+        "SELECT accountId FROM UserDetails WHERE username = ? AND password = ?",
+        "idx_userdetails_username",
+    ),
+}
+
+
+def check_query_plans(conn: sqlite3.Connection) -> dict:
+    """
+    Returns:
+        {name: {"plan": [detail, ...], "ok": bool}} - ok when the query
+        searches its index and needs no temp b-tree sort
+    """
+    report = {}
+    for name, (sql, index) in QUERY_PLAN_CHECKS.items():
+        params = [None] * sql.count("?")
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        uses_index = any(detail.startswith("SEARCH") and index in detail for detail in plan)
+        sorts = any("TEMP B-TREE" in detail for detail in plan)
+        report[name] = {"plan": plan, "ok": uses_index and not sorts}
+    return report
+
+
+def main():
+    import data_access
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations and check query plans")
+    parser.add_argument("--db", default=data_access.DB_NAME)
+    args = parser.parse_args()
+
+    applied = migrate(args.db)
+    conn = sqlite3.connect(args.db)
+    print(f"Schema version {current_version(conn)} (applied now: {applied or 'none'})")
+    report = check_query_plans(conn)
+    conn.close()
+
+    for name, result in report.items():
+        print(f"{'✅' if result['ok'] else '❌'} {name:<22} {' | '.join(result['plan'])}")
+    if not all(result["ok"] for result in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Offline stand-in for the Ollama HTTP API, for benchmarks and CI.
+
+Answers /api/generate and /api/chat (streamed NDJSON or single JSON) with
+scripted replies: router / guard / decision prompts get valid JSON, every
+other prompt gets a filler answer. Latency, tokens/sec and how many
+generations run at once (like OLLAMA_NUM_PARALLEL) are configurable.
+
+Run standalone and point the app at it:
+    python mock_ollama.py --port 11500 --latency-ms 300 --tokens-per-sec 40
+    OLLAMA_BASE_URL=http://127.0.0.1:11500 uvicorn main:app
+
+Or start it in-process (see bench_chat.py):
+    server = MockOllama(port=11500).start()
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODEL = "gemma3:4b"
+
+NON_BANKING_WORDS = ["weather", "poem", "prime minister", "movie", "recipe", "football", "joke"]
+
+FILLER = (
+    "Based on your account data your balance and recent transactions look healthy "
+    "and your spending is in line with previous months so no action is needed right now"
+).split()
+
+
+# ─────────────────────────────────────────────
+# SCRIPTED REPLIES
+# ─────────────────────────────────────────────
+def prompt_kind(prompt: str) -> str:
+    if "You are the request router" in prompt:
+        return "router"
+    if "banking assistant filter" in prompt:
+        return "guard"
+    if "Based on the conversation so far, decide what to do next" in prompt:
+        return "decision"
+    return "final"
+
+
+def _question(prompt: str) -> str:
+    match = re.search(r'Question: "(.*?)"', prompt, re.S)
+    return (match.group(1) if match else prompt).lower()
+
+
+def router_reply(prompt: str) -> dict:
+    question = _question(prompt)
+    route = {"is_banking": True, "reason": "mock", "action": "tool", "tool_name": None,
+             "tool_args": {}, "response": None}
+
+    if any(word in question for word in NON_BANKING_WORDS):
+        return {**route, "is_banking": False, "reason": "not banking", "intent": "other",
+                "action": "answer", "response": "I can only help with banking questions."}
+    if "compare" in question:
+        plan = [
+            {"id": "t1", "tool": "get_account_balance", "args": {}, "depends_on": []},
+            {"id": "t2", "tool": "get_periodic_statements", "args": {}, "depends_on": []},
+        ]
+        return {**route, "intent": "statements", "tool_name": "get_account_balance", "plan": plan}
+    if "statement" in question or "download" in question:
+        return {**route, "intent": "documents", "action": "answer", "response": "Here are your statements."}
+    if any(word in question for word in ["how much", "spent", "spend", "fees"]):
+        return {**route, "intent": "transactions", "tool_name": "get_spending_breakdown"}
+    if any(word in question for word in ["transaction", "payment"]):
+        return {**route, "intent": "transactions", "tool_name": "get_transaction_history"}
+    return {**route, "intent": "balance", "tool_name": "get_account_balance"}
+
+
+def guard_reply(prompt: str) -> dict:
+    question = _question(prompt)
+    is_banking = not any(word in question for word in NON_BANKING_WORDS)
+    return {"is_banking": is_banking, "reason": "mock"}
+
+
+def decision_reply(prompt: str) -> dict:
+    return {"reasoning": "Tool data gathered, ready to answer", "action": "answer",
+            "tool_name": None, "tool_args": {}, "response": None}
+
+
+def final_tokens(count: int) -> list:
+    return [FILLER[i % len(FILLER)] + " " for i in range(count)]
+
+
+DEFAULT_SCRIPT = {
+    "router": router_reply,
+    "guard": guard_reply,
+    "decision": decision_reply,
+}
+
+
+# ─────────────────────────────────────────────
+# SERVER
+# ─────────────────────────────────────────────
+class MockOllama:
+    """
+    Args:
+        latency_ms: delay before the first token (prompt evaluation)
+        tokens_per_sec: generation speed after the first token
+        final_token_count: length of non-JSON answers, in tokens
+        parallel: generations served at once; the rest wait, like Ollama
+        script: {"router"|"guard"|"decision": dict or fn(prompt) -> dict,
+                 "final": str} overrides for the scripted replies
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11500, latency_ms: float = 300,
+                 tokens_per_sec: float = 40, final_token_count: int = 60, parallel: int = 1,
+                 script: dict = None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.final_token_count = final_token_count
+        self.script = {**DEFAULT_SCRIPT, **(script or {})}
+        self._slots = threading.BoundedSemaphore(parallel)
+        self._lock = threading.Lock()
+        self._server = None
+        self.metrics = {"requests": 0, "by_kind": {}, "busy_ms_total": 0.0}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def reply_tokens(self, prompt: str) -> list:
+        kind = prompt_kind(prompt)
+        with self._lock:
+            self.metrics["requests"] += 1
+            self.metrics["by_kind"][kind] = self.metrics["by_kind"].get(kind, 0) + 1
+
+        scripted = self.script.get(kind)
+        if kind == "final":
+            if isinstance(scripted, str):
+                return [word + " " for word in scripted.split()]
+            return final_tokens(self.final_token_count)
+        reply = scripted(prompt) if callable(scripted) else scripted
+        # JSON replies come back in a few chunks, like a real model
+        text = json.dumps(reply)
+        return [text[i:i + 16] for i in range(0, len(text), 16)]
+
+    def generate(self, prompt: str):
+        """Yields reply tokens with the configured timing, holding a slot"""
+        tokens = self.reply_tokens(prompt)
+        with self._slots:
+            started = time.perf_counter()
+            time.sleep(self.latency_ms / 1000)
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(1 / self.tokens_per_sec)
+                yield token
+            with self._lock:
+                self.metrics["busy_ms_total"] += (time.perf_counter() - started) * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.metrics, "by_kind": dict(self.metrics["by_kind"])}
+
+    def _bind(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler_for(self))
+        self._server.daemon_threads = True
+
+    def start(self):
+        """Serve in a daemon thread and return self"""
+        self._bind()
+        threading.Thread(target=self._server.serve_forever, name="mock-ollama", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve_forever(self):
+        self._bind()
+        self._server.serve_forever()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _handler_for(mock: MockOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # keep benchmark output clean
+
+        # ── helpers ──
+        def _send_json(self, data: dict, status: int = 200):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _send_chunk(self, data: dict):
+            line = (json.dumps(data) + "\n").encode()
+            self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        def _end_stream(self):
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        # ── routes ──
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._send_json({"models": [{"name": MODEL, "model": MODEL, "modified_at": _now(), "size": 0}]})
+            elif self.path == "/api/version":
+                self._send_json({"version": "0.0.0-mock"})
+            elif self.path == "/mock/stats":
+                self._send_json(mock.stats())
+            else:
+                self._send_json({"status": "Ollama is running (mock)"})
+
+        def do_POST(self):
+            body = self._read_json()
+            if self.path == "/api/generate":
+                self._generate(body, body.get("prompt", ""), lambda text: {"response": text})
+            elif self.path == "/api/chat":
+                messages = body.get("messages") or [{}]
+                prompt = "\n".join(m.get("content", "") for m in messages)
+                self._generate(body, prompt, lambda text: {"message": {"role": "assistant", "content": text}})
+            elif self.path == "/api/show":
+                self._send_json({"modelfile": "", "parameters": "", "details": {"family": "mock"}})
+            else:
+                self._send_json({"error": f"unknown endpoint {self.path}"}, status=404)
+
+        def _generate(self, body: dict, prompt: str, payload):
+            model = body.get("model", MODEL)
+            started = time.perf_counter_ns()
+            done = {"done": True, "done_reason": "stop", "eval_count": 0}
+
+            if body.get("stream", True):
+                self._start_stream()
+                for token in mock.generate(prompt):
+                    done["eval_count"] += 1
+                    self._send_chunk({"model": model, "created_at": _now(), **payload(token), "done": False})
+                done["total_duration"] = time.perf_counter_ns() - started
+                self._send_chunk({"model": model, "created_at": _now(), **payload(""), **done})
+                self._end_stream()
+            else:
+                tokens = list(mock.generate(prompt))
+                done["eval_count"] = len(tokens)
+                done["total_duration"] = time.perf_counter_ns() - started
+                self._send_json({"model": model, "created_at": _now(), **payload("".join(tokens)), **done})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Ollama stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-sec", type=float, default=40)
+    parser.add_argument("--final-tokens", type=int, default=60)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--script", help="JSON file with router/guard/decision replies and final text")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+
+    mock = MockOllama(args.host, args.port, args.latency_ms, args.tokens_per_sec,
+                      args.final_tokens, args.parallel, script)
+    print(f"🦙 Mock Ollama on {mock.url} (latency {args.latency_ms} ms, {args.tokens_per_sec} tok/s, "
+          f"parallel {args.parallel})")
+    mock.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 import json
-from langchain_ollama import OllamaLLM
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, message_to_dict, messages_from_dict
 import re
 
-llm = OllamaLLM(
-    model="gemma3:4b",
-    base_url="http://localhost:11434"
-)
+from llm_gateway import gateway, PRIORITY_CLASSIFY
+from conversation_memory import conversation_memory
+
+# Planner replies are short JSON decisions, so they queue as classification calls
+llm = gateway.runnable(PRIORITY_CLASSIFY)
 
 TOOLS = {
     "get_account_balance": ["account_id"],
@@ -18,23 +18,30 @@ TOOLS = {
     "get_periodic_statements": ["account_id"],
 }
 
-# Initialize chat history storage (supports multiple sessions)
-chat_histories = {}
-
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
+class StoredChatMessageHistory(BaseChatMessageHistory):
     """
-    Get or create chat history for a session.
-    Maintains last 10 messages per session.
+    Chat history kept in conversation_memory (backed by the shared session
+    store, so every worker sees it). Older turns are compacted into a
+    summary system message once the history goes over its token budget.
     """
-    if session_id not in chat_histories:
-        chat_histories[session_id] = InMemoryChatMessageHistory()
-    
-    # Trim to last 10 messages (5 exchanges)
-    history = chat_histories[session_id]
-    if len(history.messages) > 10:
-        history.messages = history.messages[-10:]
-    
-    return chat_histories[session_id]
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+
+    @property
+    def messages(self):
+        return messages_from_dict(conversation_memory.messages(self.session_id))
+
+    def add_messages(self, messages) -> None:
+        conversation_memory.append(self.session_id, [message_to_dict(m) for m in messages])
+
+    def clear(self) -> None:
+        conversation_memory.clear(self.session_id)
+
+
+def get_session_history(session_id: str) -> StoredChatMessageHistory:
+    """Chat history for a session (recent messages plus a summary of older ones)"""
+    return StoredChatMessageHistory(session_id)
 
 
 def extract_json(text: str) -> str:
@@ -109,13 +116,13 @@ def plan_tool_call(user_message: str, session_id: str = "default") -> dict:
     """
     
     # Check if this exact question was asked recently in history
-    history = get_session_history(session_id)
-    for i in range(len(history.messages) - 2, -1, -2):  # Check previous user messages
-        if i >= 0 and isinstance(history.messages[i], HumanMessage):
-            if history.messages[i].content.strip().lower() == user_message.strip().lower():
+    messages = get_session_history(session_id).messages  # one store read
+    for i in range(len(messages) - 2, -1, -2):  # Check previous user messages
+        if i >= 0 and isinstance(messages[i], HumanMessage):
+            if messages[i].content.strip().lower() == user_message.strip().lower():
                 # Return cached response
-                if i + 1 < len(history.messages) and isinstance(history.messages[i + 1], AIMessage):
-                    cached_content = history.messages[i + 1].content
+                if i + 1 < len(messages) and isinstance(messages[i + 1], AIMessage):
+                    cached_content = messages[i + 1].content
                     try:
                         cached_response = json.loads(extract_json(cached_content))
                         cached_response["cached"] = True
@@ -145,12 +152,12 @@ def plan_tool_call(user_message: str, session_id: str = "default") -> dict:
 
 def get_conversation_summary(session_id: str = "default") -> dict:
     """Get summary of conversation history"""
-    history = get_session_history(session_id)
+    messages = get_session_history(session_id).messages
     
     user_messages = []
     ai_messages = []
     
-    for msg in history.messages:
+    for msg in messages:
         if isinstance(msg, HumanMessage):
             user_messages.append(msg.content)
         elif isinstance(msg, AIMessage):
@@ -158,7 +165,7 @@ def get_conversation_summary(session_id: str = "default") -> dict:
     
     return {
         "session_id": session_id,
-        "total_messages": len(history.messages),
+        "total_messages": len(messages),
         "user_messages_count": len(user_messages),
         "ai_messages_count": len(ai_messages),
         "recent_user_messages": user_messages[-3:],
@@ -167,14 +174,13 @@ def get_conversation_summary(session_id: str = "default") -> dict:
 
 def clear_history(session_id: str = "default"):
     """Clear conversation history for a session"""
-    if session_id in chat_histories:
-        chat_histories[session_id].clear()
-        print(f"✓ Cleared history for session: {session_id}")
+    conversation_memory.clear(session_id)
+    print(f"✓ Cleared history for session: {session_id}")
 
 
 def list_sessions() -> list:
     """List all active session IDs"""
-    return list(chat_histories.keys())
+    return conversation_memory.sessions()
 
 
 # Example usage and testing
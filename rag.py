@@ -7,7 +7,7 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_classic.chains.combine_documents import create_stuff_documents_chain
 from langchain_classic.chains import create_retrieval_chain
-from langchain_ollama import OllamaLLM
+from llm_gateway import gateway, PRIORITY_ANSWER
 from pathlib import Path
 
 # 🔐 Load environment variables
@@ -125,10 +125,9 @@ retriever = vector_store.as_retriever(
     search_kwargs={"k": 4}  # Number of documents to retrieve
 )
 
-# Use Ollama LLaMA 3.2 model
-print("🤖 Initializing Ollama LLM...")
-llm = OllamaLLM(model="gemma3:4b", base_url="http://localhost:11434")
-print("✅ LLM initialized\n")
+# Shared Ollama client, queued through the app-wide LLM gateway
+llm = gateway.runnable(PRIORITY_ANSWER)
+print("✅ LLM gateway ready\n")
 
 # 🧠 Prompt template
 prompt = ChatPromptTemplate.from_messages([
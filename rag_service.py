@@ -1,12 +1,16 @@
+import asyncio
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from index_paths import INDEX_DIR, resolve_index_dir
+from singleflight import retrieval_flight
+
 embedding = HuggingFaceEmbeddings(
     model_name="sentence-transformers/all-MiniLM-L6-v2"
 )
 
 vector_store = FAISS.load_local(
-    "faiss_index",
+    resolve_index_dir(INDEX_DIR),
     embedding,
     allow_dangerous_deserialization=True
 )
@@ -14,6 +18,16 @@ vector_store = FAISS.load_local(
 retriever = vector_store.as_retriever(search_kwargs={"k": 5})  # Increased to get more context
 
 
+def retrieve(query: str):
+    """retriever.invoke, shared between concurrent callers with the same query"""
+    return retrieval_flight.do(query, lambda: retriever.invoke(query))
+
+
+async def aretrieve(query: str):
+    """Async version of retrieve"""
+    return await retrieval_flight.ado(query, lambda: retriever.ainvoke(query))
+
+
 def get_rag_context(query: str, exclude_account: str = None) -> str:
     """
     Get RAG context for explanation and formatting
@@ -22,8 +36,17 @@ def get_rag_context(query: str, exclude_account: str = None) -> str:
         query: The user's question
         exclude_account: Account ID to exclude (to avoid showing user their own data from docs)
     """
-    docs = retriever.invoke(query)
+    docs = retrieve(query)
+    return _format_rag_context(docs, exclude_account)
+
+
+async def aget_rag_context(query: str, exclude_account: str = None) -> str:
+    """Async version of get_rag_context"""
+    docs = await aretrieve(query)
+    return _format_rag_context(docs, exclude_account)
 
+
+def _format_rag_context(docs, exclude_account: str = None) -> str:
     if not docs:
         return ""
 
@@ -54,6 +77,19 @@ def get_insights_from_other_customers(user_account_id: int, query_type: str = "g
         query_type: Type of insight needed
     """
 
+    queries = _insight_queries(query_type)
+    docs_per_query = [retrieve(query) for query in queries]
+    return _format_insights(docs_per_query, user_account_id, query_type)
+
+
+async def aget_insights_from_other_customers(user_account_id: int, query_type: str = "general") -> str:
+    """Async version of get_insights_from_other_customers (queries run concurrently)"""
+    queries = _insight_queries(query_type)
+    docs_per_query = await asyncio.gather(*(aretrieve(query) for query in queries))
+    return _format_insights(docs_per_query, user_account_id, query_type)
+
+
+def _insight_queries(query_type: str) -> list:
     # Richer, more specific queries per type
     insight_queries = {
         "investment": [
@@ -77,17 +113,20 @@ def get_insights_from_other_customers(user_account_id: int, query_type: str = "g
         ]
     }
 
-    queries = insight_queries.get(query_type, insight_queries["general"])
-    user_account_str = str(user_account_id)
+    return insight_queries.get(query_type, insight_queries["general"])
+
+
+def _format_insights(docs_per_query, user_account_id: int, query_type: str) -> str:
+    # user_account_id=None keeps every customer (used for cohort-wide reports)
+    user_account_str = str(user_account_id) if user_account_id is not None else None
 
     all_docs = []
     seen_content = set()
 
-    for query in queries:
-        docs = retriever.invoke(query)
+    for docs in docs_per_query:
         for doc in docs:
             # Exclude current user's documents
-            if user_account_str not in doc.page_content:
+            if user_account_str is None or user_account_str not in doc.page_content:
                 # Deduplicate by content snippet
                 snippet = doc.page_content[:80]
                 if snippet not in seen_content:
@@ -128,6 +167,28 @@ def get_combined_context(
     if include_insights:
         insights_context = get_insights_from_other_customers(user_account_id, insight_type)
     
+    return {
+        "explanation": explanation_context,
+        "insights": insights_context
+    }
+
+
+async def aget_combined_context(
+    user_question: str,
+    user_account_id: int,
+    include_insights: bool = True,
+    insight_type: str = "general"
+) -> dict:
+    """Async version of get_combined_context (explanation and insights fetched concurrently)"""
+    if include_insights:
+        explanation_context, insights_context = await asyncio.gather(
+            aget_rag_context(user_question, exclude_account=user_account_id),
+            aget_insights_from_other_customers(user_account_id, insight_type)
+        )
+    else:
+        explanation_context = await aget_rag_context(user_question, exclude_account=user_account_id)
+        insights_context = ""
+
     return {
         "explanation": explanation_context,
         "insights": insights_context
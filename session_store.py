@@ -0,0 +1,618 @@
+"""
+Pluggable store for login sessions and planner chat history.
+
+SESSION_BACKEND picks the backend:
+    memory     - dicts in this process (default; one uvicorn worker only)
+    sqlite     - SESSION_DB file shared by every worker on the host
+    redis      - REDIS_URL, shared across hosts
+    fakeredis  - in-process Redis double for tests (needs `fakeredis`)
+
+Sessions expire SESSION_TTL_SECONDS after login and chat histories
+HISTORY_TTL_SECONDS after their last message. Every lookup is by key:
+a dict get, a primary-key SELECT or a Redis GET.
+
+The memory backend also caps chat histories at HISTORY_MAX_SESSIONS and
+HISTORY_MAX_BYTES in total, evicting the least recently used first, so a
+long-running server cannot grow without bound. Compaction of long
+histories into summaries lives in conversation_memory.py; it holds
+history_lock() around its read-compact-write, which every backend makes
+exclusive across the workers that share it.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from db_pool import db_pool
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 8 * 3600))
+HISTORY_TTL_SECONDS = int(os.getenv("HISTORY_TTL_SECONDS", 24 * 3600))
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", 10))
+HISTORY_MAX_SESSIONS = int(os.getenv("HISTORY_MAX_SESSIONS", 10000))
+HISTORY_MAX_BYTES = int(os.getenv("HISTORY_MAX_BYTES", 64 * 1024 * 1024))
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# A history lock is a lease: a worker that dies holding one only blocks
+# that session's history for this long
+HISTORY_LOCK_SECONDS = float(os.getenv("HISTORY_LOCK_SECONDS", 30))
+HISTORY_LOCK_POLL_SECONDS = 0.02
+HISTORY_LOCK_STRIPES = 64
+
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class SessionStore(ABC):
+    """
+    Interface shared by the backends. Sessions are small dicts (username,
+    accountId); history messages are JSON-serialisable dicts, oldest first.
+    """
+
+    backend = "base"
+
+    def __init__(self, session_ttl: int = SESSION_TTL_SECONDS, history_ttl: int = HISTORY_TTL_SECONDS,
+                 max_messages: int = MAX_HISTORY_MESSAGES):
+        self.session_ttl = session_ttl
+        self.history_ttl = history_ttl
+        self.max_messages = max_messages
+        self._history_locks = [threading.Lock() for _ in range(HISTORY_LOCK_STRIPES)]
+
+    @contextmanager
+    def history_lock(self, session_id: str):
+        """
+        Hold while reading, rewriting and writing back a history, so
+        concurrent updates of one session don't overwrite each other. The
+        base lock only covers threads of this process; shared backends add
+        a lock every worker sees.
+        """
+        with self._history_locks[hash(session_id) % HISTORY_LOCK_STRIPES]:
+            yield
+
+    def create_session(self, data: dict) -> str:
+        """Store the session under a new random token and return the token"""
+        token = secrets.token_urlsafe(32)
+        self.put_session(token, data)
+        return token
+
+    @abstractmethod
+    def put_session(self, token: str, data: dict):
+        """Store (or overwrite) the session under `token`"""
+
+    @abstractmethod
+    def get_session(self, token: str):
+        """The session dict, or None if unknown or expired"""
+
+    @abstractmethod
+    def delete_session(self, token: str):
+        """Forget the session (no error if it is unknown)"""
+
+    @abstractmethod
+    def append_messages(self, session_id: str, messages: list):
+        """Append to the history, keeping the newest max_messages"""
+
+    @abstractmethod
+    def replace_messages(self, session_id: str, messages: list):
+        """Overwrite the whole history (used when it is compacted)"""
+
+    @abstractmethod
+    def get_messages(self, session_id: str) -> list:
+        """The live history, oldest first ([] if unknown or expired)"""
+
+    @abstractmethod
+    def clear_messages(self, session_id: str):
+        """Drop the history"""
+
+    @abstractmethod
+    def history_sessions(self) -> list:
+        """IDs of the sessions with a live history"""
+
+    @abstractmethod
+    def history_usage(self, limit: int = 10) -> list:
+        """The largest live histories: [{"session_id", "messages", "bytes"}], biggest first"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Counters for /metrics"""
+
+
+# ─────────────────────────────────────────────
+# IN-MEMORY
+# ─────────────────────────────────────────────
+class MemorySessionStore(SessionStore):
+    """
+    Dicts in this process. Histories are kept in least-recently-used order
+    with their size in bytes; idle ones expire after history_ttl and the
+    oldest are evicted whenever max_histories or max_history_bytes is
+    exceeded.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_histories: int = HISTORY_MAX_SESSIONS, max_history_bytes: int = HISTORY_MAX_BYTES,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.max_histories = max_histories
+        self.max_history_bytes = max_history_bytes
+        self._lock = threading.Lock()
+        self._sessions = {}               # token -> (expires_at, data)
+        self._histories = OrderedDict()   # session_id -> (expires_at, messages, size in bytes), LRU first
+        self._history_bytes = 0
+        self._last_sweep = time.time()
+        self.evictions = {"lru": 0, "expired": 0}
+
+    def put_session(self, token: str, data: dict):
+        with self._lock:
+            self._sessions[token] = (time.time() + self.session_ttl, dict(data))
+        self._sweep()
+
+    def get_session(self, token: str):
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self.delete_session(token)
+            return None
+        return entry[1]
+
+    def delete_session(self, token: str):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def append_messages(self, session_id: str, messages: list):
+        with self._lock:
+            entry = self._histories.get(session_id)
+            history = list(entry[1]) if entry and entry[0] > time.time() else []
+            self._set_history(session_id, (history + list(messages))[-self.max_messages:])
+        self._sweep()
+
+    def replace_messages(self, session_id: str, messages: list):
+        with self._lock:
+            self._set_history(session_id, list(messages)[-self.max_messages:])
+        self._sweep()
+
+    def _set_history(self, session_id: str, messages: list):
+        """Store a history as most recently used, then evict down to the caps (lock held)"""
+        size = sum(len(json.dumps(message)) for message in messages)
+        old = self._histories.pop(session_id, None)
+        if old is not None:
+            self._history_bytes -= old[2]
+        self._histories[session_id] = (time.time() + self.history_ttl, messages, size)
+        self._history_bytes += size
+        while len(self._histories) > 1 and (len(self._histories) > self.max_histories
+                                            or self._history_bytes > self.max_history_bytes):
+            _, (_, _, evicted_size) = self._histories.popitem(last=False)
+            self._history_bytes -= evicted_size
+            self.evictions["lru"] += 1
+
+    def get_messages(self, session_id: str) -> list:
+        entry = self._histories.get(session_id)
+        if entry is None:
+            return []
+        if entry[0] <= time.time():
+            self.clear_messages(session_id)
+            return []
+        with self._lock:
+            if session_id in self._histories:
+                self._histories.move_to_end(session_id)
+        return list(entry[1])
+
+    def clear_messages(self, session_id: str):
+        with self._lock:
+            entry = self._histories.pop(session_id, None)
+            if entry is not None:
+                self._history_bytes -= entry[2]
+
+    def history_sessions(self) -> list:
+        now = time.time()
+        return [session_id for session_id, (expires, _, _) in list(self._histories.items()) if expires > now]
+
+    def history_usage(self, limit: int = 10) -> list:
+        now = time.time()
+        live = [(session_id, len(messages), size)
+                for session_id, (expires, messages, size) in list(self._histories.items()) if expires > now]
+        live.sort(key=lambda item: item[2], reverse=True)
+        return [{"session_id": session_id, "messages": count, "bytes": size} for session_id, count, size in live[:limit]]
+
+    def _sweep(self):
+        """Drop expired entries, at most once per SWEEP_INTERVAL_SECONDS"""
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        with self._lock:
+            self._last_sweep = now
+            for token in [token for token, (expires, _) in self._sessions.items() if expires <= now]:
+                del self._sessions[token]
+            for session_id in [sid for sid, (expires, _, _) in self._histories.items() if expires <= now]:
+                self._history_bytes -= self._histories.pop(session_id)[2]
+                self.evictions["expired"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "sessions": len(self._sessions),
+            "histories": len(self._histories),
+            "history_bytes": self._history_bytes,
+            "max_histories": self.max_histories,
+            "max_history_bytes": self.max_history_bytes,
+            "evictions": dict(self.evictions),
+        }
+
+
+# ─────────────────────────────────────────────
+# SQLITE
+# ─────────────────────────────────────────────
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in their own SQLite file (WAL, via db_pool), so every worker
+    process on the host sees the same logins. Expired rows are filtered on
+    read and deleted by a periodic sweep.
+    """
+
+    backend = "sqlite"
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS Sessions (
+            token TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            expiresAt REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires ON Sessions (expiresAt)",
+        """
+        CREATE TABLE IF NOT EXISTS ChatHistory (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            sessionId TEXT NOT NULL,
+            message TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_chathistory_session ON ChatHistory (sessionId, seq)",
+        """
+        CREATE TABLE IF NOT EXISTS ChatHistoryExpiry (
+            sessionId TEXT PRIMARY KEY,
+            expiresAt REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ChatHistoryLock (
+            sessionId TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expiresAt REAL NOT NULL
+        )
+        """,
+    ]
+
+    def __init__(self, path: str = SESSION_DB, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        conn = self._conn()
+        with conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+        self._last_sweep = 0.0
+
+    def _conn(self):
+        return db_pool.connection(self.path)
+
+    def put_session(self, token: str, data: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO Sessions (token, data, expiresAt) VALUES (?, ?, ?)",
+                         (token, json.dumps(data), time.time() + self.session_ttl))
+        self._sweep()
+
+    def get_session(self, token: str):
+        row = self._conn().execute("SELECT data FROM Sessions WHERE token = ? AND expiresAt > ?",
+                                   (token, time.time())).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def delete_session(self, token: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM Sessions WHERE token = ?", (token,))
+
+    def append_messages(self, session_id: str, messages: list):
+        conn = self._conn()
+        with conn:
+            if not self._history_live(conn, session_id):
+                conn.execute("DELETE FROM ChatHistory WHERE sessionId = ?", (session_id,))
+            conn.executemany("INSERT INTO ChatHistory (sessionId, message) VALUES (?, ?)",
+                             [(session_id, json.dumps(message)) for message in messages])
+            conn.execute("""
+                DELETE FROM ChatHistory
+                WHERE sessionId = ? AND seq <= (
+                    SELECT seq FROM ChatHistory WHERE sessionId = ?
+                    ORDER BY seq DESC LIMIT 1 OFFSET ?
+                )
+            """, (session_id, session_id, self.max_messages))
+            conn.execute("INSERT OR REPLACE INTO ChatHistoryExpiry (sessionId, expiresAt) VALUES (?, ?)",
+                         (session_id, time.time() + self.history_ttl))
+        self._sweep()
+
+    def replace_messages(self, session_id: str, messages: list):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM ChatHistory WHERE sessionId = ?", (session_id,))
+            conn.executemany("INSERT INTO ChatHistory (sessionId, message) VALUES (?, ?)",
+                             [(session_id, json.dumps(message)) for message in messages[-self.max_messages:]])
+            conn.execute("INSERT OR REPLACE INTO ChatHistoryExpiry (sessionId, expiresAt) VALUES (?, ?)",
+                         (session_id, time.time() + self.history_ttl))
+        self._sweep()
+
+    @contextmanager
+    def history_lock(self, session_id: str):
+        """
+        A ChatHistoryLock row, claimed by INSERT OR IGNORE. Each claim is a
+        short transaction, so the SQLite write lock is not held while the
+        caller works (e.g. waits on an LLM summary).
+        """
+        owner = secrets.token_hex(8)
+        with super().history_lock(session_id):
+            conn = self._conn()
+            while True:
+                with conn:
+                    now = time.time()
+                    conn.execute("DELETE FROM ChatHistoryLock WHERE sessionId = ? AND expiresAt <= ?",
+                                 (session_id, now))
+                    claimed = conn.execute(
+                        "INSERT OR IGNORE INTO ChatHistoryLock (sessionId, owner, expiresAt) VALUES (?, ?, ?)",
+                        (session_id, owner, now + HISTORY_LOCK_SECONDS)).rowcount
+                if claimed:
+                    break
+                time.sleep(HISTORY_LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                with conn:
+                    conn.execute("DELETE FROM ChatHistoryLock WHERE sessionId = ? AND owner = ?",
+                                 (session_id, owner))
+
+    def _history_live(self, conn, session_id: str) -> bool:
+        row = conn.execute("SELECT 1 FROM ChatHistoryExpiry WHERE sessionId = ? AND expiresAt > ?",
+                           (session_id, time.time())).fetchone()
+        return row is not None
+
+    def get_messages(self, session_id: str) -> list:
+        conn = self._conn()
+        if not self._history_live(conn, session_id):
+            return []
+        rows = conn.execute("SELECT message FROM ChatHistory WHERE sessionId = ? ORDER BY seq",
+                            (session_id,)).fetchall()
+        return [json.loads(row["message"]) for row in rows]
+
+    def clear_messages(self, session_id: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM ChatHistory WHERE sessionId = ?", (session_id,))
+            conn.execute("DELETE FROM ChatHistoryExpiry WHERE sessionId = ?", (session_id,))
+
+    def history_sessions(self) -> list:
+        rows = self._conn().execute("SELECT sessionId FROM ChatHistoryExpiry WHERE expiresAt > ?",
+                                    (time.time(),)).fetchall()
+        return [row["sessionId"] for row in rows]
+
+    def history_usage(self, limit: int = 10) -> list:
+        rows = self._conn().execute("""
+            SELECT h.sessionId, COUNT(*) AS messages, SUM(LENGTH(h.message)) AS bytes
+            FROM ChatHistory h JOIN ChatHistoryExpiry e ON e.sessionId = h.sessionId
+            WHERE e.expiresAt > ?
+            GROUP BY h.sessionId ORDER BY bytes DESC LIMIT ?
+        """, (time.time(), limit)).fetchall()
+        return [{"session_id": row["sessionId"], "messages": row["messages"], "bytes": row["bytes"]} for row in rows]
+
+    def _sweep(self):
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM Sessions WHERE expiresAt <= ?", (now,))
+            conn.execute("DELETE FROM ChatHistory WHERE sessionId IN "
+                         "(SELECT sessionId FROM ChatHistoryExpiry WHERE expiresAt <= ?)", (now,))
+            conn.execute("DELETE FROM ChatHistoryExpiry WHERE expiresAt <= ?", (now,))
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        now = time.time()
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "sessions": conn.execute("SELECT COUNT(*) FROM Sessions WHERE expiresAt > ?", (now,)).fetchone()[0],
+            "histories": conn.execute("SELECT COUNT(*) FROM ChatHistoryExpiry WHERE expiresAt > ?",
+                                      (now,)).fetchone()[0],
+            "history_bytes": conn.execute("""
+                SELECT COALESCE(SUM(LENGTH(h.message)), 0)
+                FROM ChatHistory h JOIN ChatHistoryExpiry e ON e.sessionId = h.sessionId
+                WHERE e.expiresAt > ?
+            """, (now,)).fetchone()[0],
+        }
+
+
+# ─────────────────────────────────────────────
+# REDIS
+# ─────────────────────────────────────────────
+class RedisSessionStore(SessionStore):
+    """
+    Sessions as JSON strings and histories as lists, both with native Redis
+    TTLs. Two sorted sets index the live entries for /metrics, so stats and
+    history_usage are a few O(log n) commands instead of a keyspace scan:
+    sessions (token -> expiry) and history bytes (session id -> size), with
+    history expiry kept in a third set to prune the other two lazily.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, prefix: str = "aigurukul:", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.prefix = prefix
+        self._sessions_key = f"{prefix}index:sessions"
+        self._history_bytes_key = f"{prefix}index:history_bytes"
+        self._history_expiry_key = f"{prefix}index:history_expiry"
+
+    def _session_key(self, token: str) -> str:
+        return f"{self.prefix}session:{token}"
+
+    def _history_key(self, session_id: str) -> str:
+        return f"{self.prefix}history:{session_id}"
+
+    def _history_lock_key(self, session_id: str) -> str:
+        return f"{self.prefix}lock:history:{session_id}"
+
+    @contextmanager
+    def history_lock(self, session_id: str):
+        """SET NX with an expiry; released only by its owner (WATCH / MULTI)"""
+        key, owner = self._history_lock_key(session_id), secrets.token_hex(8)
+        with super().history_lock(session_id):
+            while not self.client.set(key, owner, nx=True, px=int(HISTORY_LOCK_SECONDS * 1000)):
+                time.sleep(HISTORY_LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                with self.client.pipeline() as pipe:
+                    try:
+                        pipe.watch(key)
+                        if pipe.get(key) in (owner, owner.encode()):
+                            pipe.multi()
+                            pipe.delete(key)
+                            pipe.execute()
+                    except redis.WatchError:
+                        pass  # the lease expired and another worker took it
+
+    def put_session(self, token: str, data: dict):
+        pipe = self.client.pipeline()
+        pipe.set(self._session_key(token), json.dumps(data), ex=self.session_ttl)
+        pipe.zadd(self._sessions_key, {token: time.time() + self.session_ttl})
+        pipe.execute()
+
+    def get_session(self, token: str):
+        raw = self.client.get(self._session_key(token))
+        return json.loads(raw) if raw else None
+
+    def delete_session(self, token: str):
+        pipe = self.client.pipeline()
+        pipe.delete(self._session_key(token))
+        pipe.zrem(self._sessions_key, token)
+        pipe.execute()
+
+    def _track_history(self, session_id: str, size: int):
+        pipe = self.client.pipeline()
+        pipe.zadd(self._history_bytes_key, {session_id: size})
+        pipe.zadd(self._history_expiry_key, {session_id: time.time() + self.history_ttl})
+        pipe.execute()
+
+    def append_messages(self, session_id: str, messages: list):
+        if not messages:
+            return  # RPUSH needs at least one value
+        key = self._history_key(session_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *[json.dumps(message) for message in messages])
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, self.history_ttl)
+        pipe.lrange(key, 0, -1)
+        history = pipe.execute()[-1]
+        self._track_history(session_id, sum(len(raw) for raw in history))
+
+    def replace_messages(self, session_id: str, messages: list):
+        if not messages:
+            self.clear_messages(session_id)
+            return
+        key = self._history_key(session_id)
+        raw_messages = [json.dumps(message) for message in messages[-self.max_messages:]]
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        pipe.rpush(key, *raw_messages)
+        pipe.expire(key, self.history_ttl)
+        pipe.execute()
+        self._track_history(session_id, sum(len(raw.encode()) for raw in raw_messages))
+
+    def get_messages(self, session_id: str) -> list:
+        return [json.loads(raw) for raw in self.client.lrange(self._history_key(session_id), 0, -1)]
+
+    def clear_messages(self, session_id: str):
+        pipe = self.client.pipeline()
+        pipe.delete(self._history_key(session_id))
+        pipe.zrem(self._history_bytes_key, session_id)
+        pipe.zrem(self._history_expiry_key, session_id)
+        pipe.execute()
+
+    def _prune(self):
+        """Drop index entries whose key has expired (only touches the expired ones)"""
+        now = time.time()
+        expired = self.client.zrangebyscore(self._history_expiry_key, "-inf", now)
+        pipe = self.client.pipeline()
+        if expired:
+            pipe.zrem(self._history_bytes_key, *expired)
+            pipe.zrem(self._history_expiry_key, *expired)
+        pipe.zremrangebyscore(self._sessions_key, "-inf", now)
+        pipe.execute()
+
+    def history_sessions(self) -> list:
+        ids = self.client.zrangebyscore(self._history_expiry_key, time.time(), "+inf")
+        return [session_id.decode() if isinstance(session_id, bytes) else session_id for session_id in ids]
+
+    def history_usage(self, limit: int = 10) -> list:
+        # Memory caps and eviction are Redis's own job (maxmemory + maxmemory-policy)
+        self._prune()
+        largest = self.client.zrevrange(self._history_bytes_key, 0, limit - 1, withscores=True)
+        pipe = self.client.pipeline()
+        for session_id, _ in largest:
+            pipe.llen(self._history_key(session_id.decode() if isinstance(session_id, bytes) else session_id))
+        counts = pipe.execute() if largest else []
+        return [{"session_id": session_id.decode() if isinstance(session_id, bytes) else session_id,
+                 "messages": count, "bytes": int(size)}
+                for (session_id, size), count in zip(largest, counts)]
+
+    def stats(self) -> dict:
+        self._prune()
+        pipe = self.client.pipeline()
+        pipe.zcard(self._sessions_key)
+        pipe.zcard(self._history_expiry_key)
+        sessions, histories = pipe.execute()
+        return {
+            "backend": self.backend,
+            "sessions": sessions,
+            "histories": histories,
+        }
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """
+    Raises:
+        ValueError: unknown backend
+        RuntimeError: the backend's client library is not installed
+    """
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("SESSION_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisSessionStore(redis.Redis.from_url(REDIS_URL))
+    if backend == "fakeredis":
+        try:
+            import fakeredis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=fakeredis needs the fakeredis package") from e
+        store = RedisSessionStore(fakeredis.FakeRedis())
+        store.backend = "fakeredis"
+        return store
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}; choose memory, sqlite, redis or fakeredis")
+
+
+session_store = create_session_store()
+print(f"🔐 Session store: {session_store.backend}")
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    While a call for `key` is running, every other caller asking for the same
+    key waits for it and gets the same result (or exception) instead of doing
+    the work again. Nothing is cached: once the call finishes, the next caller
+    starts a fresh one.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call (threads)
+        self._tasks = {}  # key -> asyncio.Task (event loop)
+        self.metrics = {"executed": 0, "saved_calls": 0}
+
+    def do(self, key, fn):
+        """Run fn() once per key across concurrent threads"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.metrics["executed"] += 1
+            else:
+                self.metrics["saved_calls"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn):
+        """Async version of do: fn() returns an awaitable, run once per key"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None and task.get_loop() is loop:
+                self.metrics["saved_calls"] += 1
+            else:
+                task = loop.create_task(fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda t: self._forget(key, t))
+                self.metrics["executed"] += 1
+
+        # shield: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.metrics, "in_flight": len(self._calls) + len(self._tasks)}
+
+
+llm_flight = SingleFlight("llm")
+retrieval_flight = SingleFlight("retrieval")
+
+
+def single_flight_stats() -> dict:
+    return {flight.name: flight.stats() for flight in (llm_flight, retrieval_flight)}
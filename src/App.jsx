@@ -171,6 +171,13 @@ function App() {
     window.open(downloadUrl, '_blank');
   };
 
+  // One ZIP with every listed document instead of a download per file
+  const downloadAllDocuments = (documents) => {
+    const names = documents.map((doc) => encodeURIComponent(doc.name)).join(",");
+    const bundleUrl = `http://127.0.0.1:8000/api/statements/${accountId}/bundle?token=${token}&files=${names}`;
+    window.open(bundleUrl, '_blank');
+  };
+
   // ---- LOGIN PAGE ----
   if (!loggedIn) {
     return (
@@ -335,6 +342,14 @@ function App() {
                           📥 {doc.name} ({doc.type}) - {(doc.size / 1024).toFixed(1)} KB
                         </button>
                       ))}
+                      {m.documents.length > 1 && (
+                        <button
+                          className="download-btn"
+                          onClick={() => downloadAllDocuments(m.documents)}
+                        >
+                          🗂️ Download all ({m.documents.length} files, ZIP)
+                        </button>
+                      )}
                     </div>
                   </div>
                 )}
@@ -0,0 +1,314 @@
+"""
+In-memory index of the statement PDFs in ACCOUNT_DOCS_DIR.
+
+Built at startup from one directory listing and keyed account -> type ->
+period, so a lookup is a few dict reads instead of a dozen glob scans of
+the whole directory. Names like `1065000029_monthly_statement_jun_2025.pdf`
+(period "2025-06") and `1065000029_annual_statement_2025.pdf` (period
+"2025") are parsed exactly; any other PDF is indexed under every account
+number in its name as a "statement" or "document".
+
+Changes are applied incrementally. With `watchdog` installed a filesystem
+watcher adds or drops each file as it is created, deleted or moved.
+Otherwise lookups re-list the directory when its mtime has changed
+(checked at most every STATEMENT_INDEX_REFRESH_SECONDS) and only the
+added or removed names are touched.
+"""
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+DOCS_DIR = Path(os.getenv("ACCOUNT_DOCS_DIR", "Account_docs"))  # Directory containing customer documents
+REFRESH_INTERVAL_SECONDS = float(os.getenv("STATEMENT_INDEX_REFRESH_SECONDS", 2))
+
+MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+STATEMENT_NAME = re.compile(
+    r"^(?P<account>\d+)_(?P<type>monthly|annual)_statement_(?:(?P<month>[a-z]{3})_)?(?P<year>\d{4})\.pdf$", re.I)
+ACCOUNT_NUMBER = re.compile(r"\d{6,}")
+YEAR = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+
+# Listing order: monthly, then annual, then anything else for the account
+TYPE_ORDER = ["monthly", "annual", "statement", "document"]
+STATEMENT_TYPES = {"monthly": ["monthly"], "annual": ["annual"], "all": TYPE_ORDER}
+
+
+def parse_statement_name(name: str):
+    """
+    Returns:
+        (account ids, type, period) for a PDF name, or None if it is not a
+        PDF or names no account. Period is "YYYY-MM", "YYYY" or "".
+    """
+    if not name.lower().endswith(".pdf"):
+        return None
+
+    match = STATEMENT_NAME.match(name)
+    if match:
+        kind, month = match["type"].lower(), (match["month"] or "").lower()
+        if kind == "monthly" and month in MONTHS:
+            return (match["account"],), "monthly", f"{match['year']}-{MONTHS[month]:02d}"
+        if kind == "annual" and not month:
+            return (match["account"],), "annual", match["year"]
+
+    accounts = tuple(dict.fromkeys(run.lstrip("0") for run in ACCOUNT_NUMBER.findall(name)))
+    if not accounts:
+        return None
+
+    # Same classification find_statement_files always used
+    lower = name.lower()
+    if "month" in lower and "annual" not in lower:
+        kind = "monthly"
+    elif "annual" in lower or "yearly" in lower or "year" in lower:
+        kind = "annual"
+    elif "statement" in lower:
+        kind = "statement"
+    else:
+        kind = "document"
+    year = YEAR.search(name)
+    return accounts, kind, year.group(1) if year else ""
+
+
+class StatementIndex:
+    """
+    account -> type -> period -> {file name: entry}, where an entry is the
+    dict find_statement_files returns (name, path, type, period, size,
+    download_url).
+    """
+
+    def __init__(self, docs_dir: Path = DOCS_DIR, refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.docs_dir = Path(docs_dir)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._accounts = {}
+        self._files = {}  # file name -> (account ids, type, period)
+        self._dir_mtime = None
+        self._last_check = 0.0
+        self._built = False
+        self._observer = None
+        self.metrics = {"builds": 0, "refreshes": 0, "files_added": 0, "files_removed": 0, "files_updated": 0,
+                        "lookups": 0}
+
+    # ── building ────────────────────────────────────────────────────────────
+    def _listing(self) -> dict:
+        """{name: size} of the PDFs in the directory, from one scandir pass"""
+        with os.scandir(self.docs_dir) as entries:
+            return {entry.name: entry.stat().st_size for entry in entries
+                    if entry.name.lower().endswith(".pdf") and entry.is_file()}
+
+    def _add(self, name: str, size: int):
+        """Index one file (lock held)"""
+        parsed = parse_statement_name(name)
+        if parsed is None:
+            return
+        self._remove(name)
+        accounts, kind, period = parsed
+        entry = {
+            "name": name,
+            "path": str(self.docs_dir / name),
+            "type": kind,
+            "period": period or None,
+            "size": size,
+            "download_url": f"/api/download/{name}",
+        }
+        for account in accounts:
+            self._accounts.setdefault(account, {}).setdefault(kind, {}).setdefault(period, {})[name] = entry
+        self._files[name] = parsed
+        self.metrics["files_added"] += 1
+
+    def _remove(self, name: str):
+        """Drop one file from the index (lock held)"""
+        parsed = self._files.pop(name, None)
+        if parsed is None:
+            return
+        accounts, kind, period = parsed
+        for account in accounts:
+            types = self._accounts.get(account, {})
+            periods = types.get(kind, {})
+            periods.get(period, {}).pop(name, None)
+            if not periods.get(period):
+                periods.pop(period, None)
+            if not periods:
+                types.pop(kind, None)
+            if not types:
+                self._accounts.pop(account, None)
+        self.metrics["files_removed"] += 1
+
+    def build(self):
+        """Index the whole directory from scratch"""
+        started = time.perf_counter()
+        with self._lock:
+            self._accounts, self._files = {}, {}
+            self._built = True
+            self._last_check = time.time()
+            if not self.docs_dir.is_dir():
+                print(f"⚠️ Documents directory not found: {self.docs_dir}")
+                self._dir_mtime = None
+                return
+            self._dir_mtime = os.stat(self.docs_dir).st_mtime_ns
+            for name, size in self._listing().items():
+                self._add(name, size)
+            self.metrics["builds"] += 1
+        print(f"📇 Statement index: {len(self._files)} files for {len(self._accounts)} accounts "
+              f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _entry(self, name: str) -> dict:
+        """The (shared) entry of an indexed file (lock held)"""
+        accounts, kind, period = self._files[name]
+        return self._accounts[accounts[0]][kind][period][name]
+
+    def refresh(self):
+        """
+        Re-list the directory and apply the names added or removed since the
+        last pass, plus new sizes of files replaced under the same name.
+
+        A file rewritten in place does not change the directory's mtime, so
+        polling only sees it on the next change to the directory; the
+        watcher's modified events cover it right away.
+        """
+        with self._lock:
+            self._last_check = time.time()
+            if not self.docs_dir.is_dir():
+                for name in list(self._files):
+                    self._remove(name)
+                self._dir_mtime = None
+                return
+            self._dir_mtime = os.stat(self.docs_dir).st_mtime_ns
+            listing = self._listing()
+            for name in [name for name in self._files if name not in listing]:
+                self._remove(name)
+            for name in listing.keys() - self._files.keys():
+                self._add(name, listing[name])
+            for name in listing.keys() & self._files.keys():
+                entry = self._entry(name)
+                if entry["size"] != listing[name]:
+                    entry["size"] = listing[name]
+                    self.metrics["files_updated"] += 1
+            self.metrics["refreshes"] += 1
+
+    def _maybe_refresh(self):
+        if not self._built:
+            self.build()
+            return
+        if self._observer is not None or time.time() - self._last_check < self.refresh_interval:
+            return
+        try:
+            mtime = os.stat(self.docs_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._dir_mtime:
+            self.refresh()
+        else:
+            self._last_check = time.time()
+
+    # ── watcher ─────────────────────────────────────────────────────────────
+    def start(self):
+        """Build the index and, when watchdog is installed, watch the directory"""
+        self.build()
+        if not WATCHDOG_AVAILABLE or self._observer is not None or not self.docs_dir.is_dir():
+            return
+        observer = Observer()
+        observer.schedule(_IndexEventHandler(self), str(self.docs_dir), recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        print(f"👀 Watching {self.docs_dir} for statement changes")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def file_changed(self, path: str):
+        """Watcher callback: (re)index a created or modified file, or drop it if it is gone"""
+        name = os.path.basename(path)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            self.file_removed(path)
+            return
+        with self._lock:
+            self._add(name, size)
+
+    def file_removed(self, path: str):
+        with self._lock:
+            self._remove(os.path.basename(path))
+
+    # ── lookups ─────────────────────────────────────────────────────────────
+    def find(self, account_id, statement_type: str = "all", year=None) -> list:
+        """
+        Statement files of an account, monthly then annual then others,
+        newest period first within each type.
+
+        Args:
+            account_id: The account ID
+            statement_type: "monthly", "annual", "statement", "document" or "all"
+            year: only periods in this year
+
+        Returns:
+            List of entry dicts (name, path, type, period, size, download_url)
+        """
+        self._maybe_refresh()
+        types = self._accounts.get(str(account_id).lstrip("0"), {})
+        year_prefix = str(year) if year is not None else None
+
+        files = []
+        with self._lock:
+            self.metrics["lookups"] += 1
+            for kind in STATEMENT_TYPES.get(statement_type, [statement_type]):
+                periods = types.get(kind, {})
+                for period in sorted(periods, reverse=True):
+                    if year_prefix is not None and not period.startswith(year_prefix):
+                        continue
+                    files.extend(dict(periods[period][name]) for name in sorted(periods[period]))
+        return files
+
+    def belongs_to(self, name: str, account_id) -> bool:
+        """True if `name` is an indexed statement of the account"""
+        self._maybe_refresh()
+        with self._lock:
+            parsed = self._files.get(name)
+        account = str(account_id).lstrip("0")
+        return parsed is not None and any(owner.lstrip("0") == account for owner in parsed[0])
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "files": len(self._files),
+            "accounts": len(self._accounts),
+            "watching": self._observer is not None,
+        }
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    def __init__(self, index: StatementIndex):
+        self.index = index
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.index.file_changed(event.src_path)
+
+    on_modified = on_created
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.index.file_removed(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.index.file_removed(event.src_path)
+            self.index.file_changed(event.dest_path)
+
+
+statement_index = StatementIndex()
@@ -1,10 +1,6 @@
-from langchain_ollama import OllamaLLM
 import json
 
-llm = OllamaLLM(
-    model="gemma3:4b",
-    base_url="http://localhost:11434"
-)
+from llm_gateway import gateway, PRIORITY_ANSWER
 
 def summarize(tool_name, tool_result, rag_context, user_question):
     # Convert tool_result to a clean, readable JSON string
@@ -47,6 +43,6 @@ Instructions:
 Answer:
 """
 
-    response = llm.invoke(prompt)
+    response = gateway.invoke(prompt, PRIORITY_ANSWER)
     print(f"🤖 LLM Response: {response}")
     return response
\ No newline at end of file
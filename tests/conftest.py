@@ -0,0 +1,19 @@
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app is a set of flat modules in the project root
+sys.path.insert(0, ROOT)
+
+# Tests read a throwaway copy of the sample database, so connecting (WAL)
+# and migrating never touch the checked-in AIGurukul.db. The copy is
+# migrated up front, as the app's lifespan does before serving.
+if "AIGURUKUL_DB" not in os.environ:
+    _DB_DIR = tempfile.mkdtemp(prefix="aigurukul_tests_")
+    os.environ["AIGURUKUL_DB"] = shutil.copy(os.path.join(ROOT, "AIGurukul.db"), _DB_DIR)
+
+    from migrations import migrate
+    migrate(os.environ["AIGURUKUL_DB"])
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+
+import agent
+from answer_cache import SemanticAnswerCache
+from conversation_memory import ConversationMemory
+from session_store import MemorySessionStore
+
+ACCOUNT_ID = 1065000029
+FOLLOW_UP = "and the month before?"
+
+
+def fake_llm(prompt, stats=None, priority=None):
+    """Router reply that answers from whatever the earlier turns were about"""
+    if stats is not None:
+        stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    topic = "fees" if "fees" in prompt else "groceries" if "groceries" in prompt else "nothing"
+    return json.dumps({"is_banking": True, "reason": "follow-up", "intent": "other", "action": "answer",
+                       "tool_name": None, "tool_args": {}, "response": f"In May you spent 10.00 on {topic}."})
+
+
+def test_follow_up_is_never_served_from_another_sessions_answer(monkeypatch):
+    cache = SemanticAnswerCache()
+    memory = ConversationMemory(store=MemorySessionStore())
+    monkeypatch.setattr(agent, "answer_cache", cache)
+    monkeypatch.setattr(agent, "conversation_memory", memory)
+    monkeypatch.setattr(agent, "CLASSIFIER_AVAILABLE", True)
+    monkeypatch.setattr(agent, "embed_question", lambda text: np.ones(8, dtype=np.float32))
+    monkeypatch.setattr(agent, "classify_intent", lambda vector: None)
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+
+    memory.remember_turn("session-a", "How much did I spend on groceries in June?", "You spent 52.10.")
+    memory.remember_turn("session-b", "How much did I pay in fees in June?", "You paid 3.00.")
+
+    first = agent.run_agent(FOLLOW_UP, ACCOUNT_ID, "anish", session_id="session-a")
+    second = agent.run_agent(FOLLOW_UP, ACCOUNT_ID, "anish", session_id="session-b")
+
+    assert "groceries" in first["response"]
+    assert "fees" in second["response"]
+    assert not second.get("cached")
+    assert cache.stats()["stores"] == 0
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+
+
+def test_first_question_of_a_session_still_uses_the_cache(monkeypatch):
+    cache = SemanticAnswerCache()
+    monkeypatch.setattr(agent, "answer_cache", cache)
+    monkeypatch.setattr(agent, "conversation_memory", ConversationMemory(store=MemorySessionStore()))
+    monkeypatch.setattr(agent, "CLASSIFIER_AVAILABLE", True)
+    monkeypatch.setattr(agent, "embed_question", lambda text: np.ones(8, dtype=np.float32))
+    monkeypatch.setattr(agent, "classify_intent", lambda vector: None)
+    monkeypatch.setattr(agent, "call_llm", fake_llm)
+
+    agent.run_agent("what are my fees", ACCOUNT_ID, "anish", session_id="session-c")
+    again = agent.run_agent("what are my fees", ACCOUNT_ID, "anish", session_id="session-d")
+
+    assert cache.stats()["stores"] == 1
+    assert again["cached"] is True
@@ -0,0 +1,60 @@
+import numpy as np
+
+import data_access
+
+from answer_cache import SemanticAnswerCache
+
+ACCOUNT_ID = 1065000029
+ANSWER = {"type": "answer", "response": "Your balance is $1,000.00"}
+
+
+def vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_similar_question_hits_on_the_same_data_version():
+    cache = SemanticAnswerCache()
+    cache.store(ACCOUNT_ID, "what's my balance", vector(1, 0, 0), "v1", ANSWER)
+
+    assert cache.lookup(ACCOUNT_ID, "what is my balance", vector(0.99, 0.05, 0), "v1") == ANSWER
+    assert cache.stats()["hits"] == 1
+
+
+def test_data_version_change_misses_and_drops_the_entry():
+    cache = SemanticAnswerCache()
+    cache.store(ACCOUNT_ID, "what's my balance", vector(1, 0, 0), "v1", ANSWER)
+
+    assert cache.lookup(ACCOUNT_ID, "what's my balance", vector(1, 0, 0), "v2") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+    assert cache.lookup(ACCOUNT_ID, "what's my balance", vector(1, 0, 0), "v1") is None
+
+
+def test_misses_for_other_accounts_numbers_and_dissimilar_questions():
+    cache = SemanticAnswerCache()
+    cache.store(ACCOUNT_ID, "show my last 3 transactions", vector(1, 0, 0), "v1", ANSWER)
+
+    assert cache.lookup(1065000048, "show my last 3 transactions", vector(1, 0, 0), "v1") is None
+    assert cache.lookup(ACCOUNT_ID, "show my last 5 transactions", vector(1, 0, 0), "v1") is None
+    assert cache.lookup(ACCOUNT_ID, "what fees did I pay", vector(0, 1, 0), "v1") is None
+    assert cache.stats()["misses"] == 3
+
+
+def test_new_adhoc_statement_changes_the_data_version_and_misses():
+    cache = SemanticAnswerCache()
+    before = data_access.get_account_data_version(ACCOUNT_ID)
+    cache.store(ACCOUNT_ID, "list my ad-hoc statements", vector(1, 0, 0), before, ANSWER)
+
+    conn = data_access.get_db_connection()
+    with conn:
+        conn.execute("""
+            INSERT INTO AdHocStatement (statementId, accountId, startDate, endDate, requestTimestamp)
+            VALUES ('ADHOC-TEST-1', ?, '2025-01-01', '2025-01-31', '2026-01-01 00:00:00')
+        """, (ACCOUNT_ID,))
+    try:
+        after = data_access.get_account_data_version(ACCOUNT_ID)
+        assert after != before
+        assert cache.lookup(ACCOUNT_ID, "list my ad-hoc statements", vector(1, 0, 0), after) is None
+    finally:
+        with conn:
+            conn.execute("DELETE FROM AdHocStatement WHERE statementId = 'ADHOC-TEST-1'")
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import StreamMasker
+
+ACCOUNT_ID = 1065000029
+
+
+@pytest.mark.parametrize("chunks", [
+    ["Account 1065000029 is open"],
+    ["Account 10650", "00029 is open"],
+    ["Account 1", "0", "6", "5", "0", "0", "0", "0", "2", "9", " is open"],
+    ["Account 106500002", "9 is open"],
+])
+def test_account_number_is_masked_across_chunks(chunks):
+    masker = StreamMasker(ACCOUNT_ID)
+    text = "".join(masker.feed(chunk) for chunk in chunks) + masker.flush()
+    assert text == "Account ******0029 is open"
+
+
+def test_text_without_the_number_is_not_held_back():
+    masker = StreamMasker(ACCOUNT_ID)
+    assert masker.feed("Your balance is ") == "Your balance is "
+    assert masker.feed("$1,065.00") == "$1,065.00"
+    assert masker.feed(" on 10") == " on "
+    assert masker.feed("65 accounts") == "1065 accounts"
+    assert masker.flush() == ""
+
+
+def test_chat_stream_never_sends_the_full_account_number(monkeypatch):
+    async def fake_stream(question, account_id, username, session_id=None):
+        for chunk in ["Statement for 10650", "00029 attached.", " Ends in 106500002"]:
+            yield {"event": "token", "text": chunk}
+        yield {"event": "result", "result": {"type": "answer", "llm_calls": 1}}
+
+    monkeypatch.setattr(main, "astream_agent", fake_stream)
+    monkeypatch.setattr(main, "get_result_documents", lambda result, message, account_id: [])
+    token = main.session_store.create_session({"username": "anish", "accountId": ACCOUNT_ID})
+
+    response = TestClient(main.app).post("/chat/stream", json={"message": "my statement", "token": token})
+    tokens = [json.loads(line[len("data: "):])["text"] for line in response.text.splitlines()
+              if line.startswith("data: ") and '"text"' in line]
+
+    assert str(ACCOUNT_ID) not in response.text
+    assert "".join(tokens) == "Statement for ******0029 attached. Ends in 106500002"
@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import data_access
+import main
+
+# Sample account with one fee transaction (721.20, of which 0.57 is its own
+# gross-to-net deduction) and deductions of 130.71 on its other transactions
+ACCOUNT_ID = 1065000029
+
+
+def test_fee_summary_counts_fee_deductions_once():
+    summary = data_access.get_fee_summary(ACCOUNT_ID)
+
+    assert summary["feeTransactions"] == {"count": 1, "total": 721.2}
+    assert "fee" not in [row["type"] for row in summary["deductions"]["byType"]]
+    assert summary["deductions"]["total"] == 130.71
+    assert summary["totalCost"] == 851.91
+
+
+def test_transactions_keep_the_balance_after_key():
+    page = data_access.get_transaction_history(ACCOUNT_ID, limit=1)
+    assert "balance After" in page["transactions"][0]
+
+    page = data_access.get_transaction_history(ACCOUNT_ID, limit=1, fields="balance after")
+    assert list(page["transactions"][0]) == ["transactionId", "date", "balance After"]
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_non_positive_limit_is_rejected(limit):
+    with pytest.raises(ValueError):
+        data_access.get_transaction_history(ACCOUNT_ID, limit=limit)
+
+
+def page_through(limit, **filters):
+    rows, cursor = [], None
+    while True:
+        page = data_access.get_transaction_history(ACCOUNT_ID, limit=limit, cursor=cursor, **filters)
+        rows.extend(page["transactions"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 50])
+def test_paging_returns_the_unpaged_rows_in_order(limit):
+    everything = data_access.get_transaction_history(ACCOUNT_ID)
+    assert everything["nextCursor"] is None
+    assert page_through(limit) == everything["transactions"]
+
+
+@pytest.fixture
+def same_time_transactions():
+    conn = data_access.get_db_connection()
+    ids = ["TX-TIE-A", "TX-TIE-B", "TX-TIE-C"]
+    with conn:
+        conn.executemany("""
+            INSERT INTO TransactionHistory (transactionId, accountId, date, type, netAmount)
+            VALUES (?, ?, '2025-03-15 09:00:00', 'deposit', 1.0)
+        """, [(tx_id, ACCOUNT_ID) for tx_id in ids])
+    yield ids
+    with conn:
+        conn.execute("DELETE FROM TransactionHistory WHERE transactionId LIKE 'TX-TIE-%'")
+
+
+def test_date_ties_are_broken_by_transaction_id(same_time_transactions):
+    rows = page_through(1, startDate="2025-03-15", endDate="2025-03-15")
+    assert [row["transactionId"] for row in rows] == sorted(same_time_transactions, reverse=True)
+    assert page_through(2) == data_access.get_transaction_history(ACCOUNT_ID)["transactions"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="Unknown transaction fields"):
+        data_access.get_transaction_history(ACCOUNT_ID, fields="date,password")
+
+
+def test_limit_is_capped(monkeypatch):
+    monkeypatch.setattr(data_access, "MAX_TRANSACTION_PAGE", 5)
+    page = data_access.get_transaction_history(ACCOUNT_ID, limit=1000)
+    assert page["count"] == 5
+    assert page["nextCursor"] is not None
+
+
+@pytest.mark.parametrize("dates", [
+    {"endDate": "2025-13-01"},
+    {"endDate": "yesterday"},
+    {"startDate": "2025-02-30"},
+    {"startDate": "20250101"},
+])
+def test_invalid_dates_are_rejected(dates):
+    with pytest.raises(ValueError, match="must be a date"):
+        data_access.get_transaction_history(ACCOUNT_ID, **dates)
+
+
+def test_invalid_date_is_a_400_on_the_api():
+    client = TestClient(main.app)
+    response = client.get(f"/api/accounts/{ACCOUNT_ID}/transactions", params={"endDate": "2025-13-01"})
+    assert response.status_code == 400
+    assert "endDate" in response.json()["detail"]
+    assert client.get(f"/api/accounts/{ACCOUNT_ID}/analytics/fees", params={"startDate": "soon"}).status_code == 400
+    assert client.get(f"/api/accounts/{ACCOUNT_ID}/transactions",
+                      params={"startDate": "2025-01-01", "endDate": "2025-12-31 23:59:59"}).status_code == 200
@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from db_pool import CACHE_MB, MMAP_MB, ConnectionPool, DBExecutor
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.close()
+    return path
+
+
+def in_thread(fn):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()))
+    thread.start()
+    thread.join()
+    return result["value"], thread
+
+
+def test_each_thread_gets_its_own_connection_reused_across_calls(db_path):
+    pool = ConnectionPool()
+    mine = pool.connection(db_path)
+    assert pool.connection(db_path) is mine
+
+    theirs, _ = in_thread(lambda: (pool.connection(db_path), pool.connection(db_path)))
+    assert theirs[0] is theirs[1]
+    assert theirs[0] is not mine
+    assert pool.stats()["opened"] == 2
+    assert pool.stats()["reused"] == 2
+
+
+def test_pragmas_are_applied(db_path):
+    conn = ConnectionPool().connection(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -CACHE_MB * 1024
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] == MMAP_MB * 1024 * 1024
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert isinstance(conn.execute("SELECT 1 AS one").fetchone(), sqlite3.Row)
+
+
+def test_close_all_closes_every_connection(db_path):
+    pool = ConnectionPool()
+    mine = pool.connection(db_path)
+    theirs, _ = in_thread(lambda: pool.connection(db_path))
+
+    pool.close_all()
+    for conn in (mine, theirs):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert pool.stats()["closed"] == 2
+    assert pool.stats()["open"] == 0
+
+    # Threads open a fresh connection on next use
+    assert pool.connection(db_path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_connections_of_finished_threads_are_closed(db_path, tmp_path):
+    pool = ConnectionPool()
+    theirs, thread = in_thread(lambda: pool.connection(db_path))
+    assert not thread.is_alive()
+
+    pool.connection(str(tmp_path / "other.db"))  # opening a connection sweeps dead threads
+    with pytest.raises(sqlite3.ProgrammingError):
+        theirs.execute("SELECT 1")
+    assert pool.stats()["threads"] == 1
+
+
+def test_db_executor_runs_calls_on_its_bounded_pool():
+    executor = DBExecutor(workers=2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work(value):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return threading.current_thread().name, value
+
+    async def scenario():
+        return await asyncio.gather(*(executor.wrap(work)(i) for i in range(6)))
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert [value for _, value in results] == list(range(6))
+    assert all(name.startswith("db") for name, _ in results)
+    assert peak[0] == 2
+    assert executor.stats()["calls"] == 6 and executor.stats()["in_flight"] == 0
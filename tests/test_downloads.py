@@ -0,0 +1,109 @@
+import io
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from statement_index import StatementIndex
+
+ACCOUNT_ID = 1065000029
+JUNE = f"{ACCOUNT_ID}_monthly_statement_jun_2025.pdf"
+MAY = f"{ACCOUNT_ID}_monthly_statement_may_2025.pdf"
+OTHER = "1065000048_monthly_statement_jun_2025.pdf"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    for name, body in [(JUNE, b"%PDF-june-" * 100), (MAY, b"%PDF-may-" * 50), (OTHER, b"%PDF-other")]:
+        (tmp_path / name).write_bytes(body)
+    index = StatementIndex(tmp_path, refresh_interval=0)
+    index.build()
+    monkeypatch.setattr(main, "DOCS_DIR", tmp_path)
+    monkeypatch.setattr(main, "statement_index", index)
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def token():
+    return main.session_store.create_session({"username": "anish", "accountId": ACCOUNT_ID})
+
+
+def download(client, token, name, **headers):
+    return client.get(f"/api/download/{name}", params={"token": token}, headers=headers)
+
+
+def test_download_sends_validators_and_answers_304(client, token):
+    response = download(client, token, JUNE)
+    assert response.status_code == 200
+    assert response.content == b"%PDF-june-" * 100
+    etag, modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert download(client, token, JUNE, **{"If-None-Match": etag}).status_code == 304
+    assert download(client, token, JUNE, **{"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    assert download(client, token, JUNE, **{"If-Modified-Since": modified}).status_code == 304
+    assert download(client, token, JUNE, **{"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_range_requests(client, token):
+    partial = download(client, token, JUNE, Range="bytes=10-19")
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF-june-"
+    assert partial.headers["content-range"] == "bytes 10-19/1000"
+
+    assert download(client, token, JUNE, Range="bytes=5000-6000").status_code == 416
+
+
+def test_if_range_resumes_only_an_unchanged_file(client, token):
+    etag = download(client, token, JUNE).headers["etag"]
+
+    resumed = download(client, token, JUNE, Range="bytes=990-", **{"If-Range": etag})
+    assert resumed.status_code == 206
+    assert len(resumed.content) == 10
+
+    restarted = download(client, token, JUNE, Range="bytes=990-", **{"If-Range": '"changed"'})
+    assert restarted.status_code == 200
+    assert len(restarted.content) == 1000
+
+
+def test_download_of_another_accounts_file_is_refused(client, token):
+    assert download(client, token, OTHER).status_code == 403
+    assert download(client, "expired", JUNE).status_code == 401
+
+
+def test_bundle_is_a_valid_zip_of_the_accounts_statements(client, token):
+    response = client.get(f"/api/statements/{ACCOUNT_ID}/bundle", params={"token": token})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == sorted([JUNE, MAY])
+    assert archive.read(MAY) == b"%PDF-may-" * 50
+
+    repeat = client.get(f"/api/statements/{ACCOUNT_ID}/bundle", params={"token": token},
+                        headers={"If-None-Match": response.headers["etag"]})
+    assert repeat.status_code == 304
+
+
+def test_bundle_refuses_cross_account_files(client, token):
+    params = {"token": token, "files": f"{JUNE},{OTHER}"}
+    assert client.get(f"/api/statements/{ACCOUNT_ID}/bundle", params=params).status_code == 403
+    assert client.get("/api/statements/1065000048/bundle", params={"token": token}).status_code == 403
+
+
+@pytest.mark.parametrize("name", [
+    f"{ACCOUNT_ID}/{OTHER}",
+    f"{ACCOUNT_ID}\\{OTHER}",
+    f"../{ACCOUNT_ID}_x/../{OTHER}",
+])
+def test_bundle_refuses_paths_that_hide_another_accounts_file(client, token, name):
+    response = client.get(f"/api/statements/{ACCOUNT_ID}/bundle", params={"token": token, "files": name})
+    assert response.status_code in (400, 403)
+    assert b"%PDF-other" not in response.content
+
+
+def test_unindexed_name_with_own_account_number_is_refused(client, token, tmp_path):
+    (tmp_path / f"notes_{ACCOUNT_ID}.txt").write_bytes(b"secret")
+    assert download(client, token, f"notes_{ACCOUNT_ID}.txt").status_code == 403
+    assert download(client, token, f"{ACCOUNT_ID}_monthly_statement_jan_2020.pdf").status_code == 404
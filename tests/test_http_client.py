@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from http_client import APIClient
+
+BASE_URL = "http://bank.test"
+PATH = "/api/accounts/1065000029/balance"
+
+
+def make_client(retries=2):
+    return APIClient(BASE_URL, retries=retries, backoff=0)
+
+
+def run_async(client, handler):
+    """aget PATH against an httpx.MockTransport serving `handler`"""
+    async def call():
+        client._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+            base_url=BASE_URL, transport=httpx.MockTransport(handler))
+        try:
+            return await client.aget(PATH)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(call())
+
+
+def scripted(*outcomes):
+    """Handler that plays `outcomes` in order: a status code or an exception class"""
+    calls = []
+
+    def handler(request):
+        outcome = outcomes[len(calls)]
+        calls.append(request)
+        if isinstance(outcome, type):
+            raise outcome("boom", request=request)
+        return httpx.Response(outcome, json={"status": outcome})
+
+    return handler, calls
+
+
+@pytest.mark.parametrize("failure", [httpx.ConnectError, httpx.ReadTimeout, httpx.ConnectTimeout, 502, 503, 504])
+def test_aget_retries_transient_failures(failure):
+    client = make_client()
+    handler, calls = scripted(failure, failure, 200)
+
+    assert run_async(client, handler) == {"status": 200}
+    assert len(calls) == 3
+    stats = client.stats()["endpoints"]["/api/accounts/{id}/balance"]
+    assert stats["retries"] == 2 and stats["errors"] == 0
+
+
+@pytest.mark.parametrize("status", [400, 404, 429, 500])
+def test_aget_does_not_retry_other_statuses(status):
+    client = make_client()
+    handler, calls = scripted(status, 200)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_async(client, handler)
+    assert len(calls) == 1
+    assert client.stats()["endpoints"]["/api/accounts/{id}/balance"]["errors"] == 1
+
+
+def test_aget_gives_up_after_the_configured_retries():
+    client = make_client(retries=2)
+    handler, calls = scripted(httpx.ConnectError, httpx.ConnectError, httpx.ConnectError, 200)
+    with pytest.raises(httpx.ConnectError):
+        run_async(client, handler)
+    assert len(calls) == 3
+
+    handler, calls = scripted(503, 503, 503, 200)
+    with pytest.raises(httpx.HTTPStatusError):
+        run_async(client, handler)
+    assert len(calls) == 3
+
+
+class ScriptedAdapter(BaseAdapter):
+    """requests transport adapter playing the same scripts for the sync client"""
+
+    def __init__(self, *outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        outcome = self.outcomes[self.calls]
+        self.calls += 1
+        if isinstance(outcome, type):
+            raise outcome("boom")
+        response = requests.Response()
+        response.status_code = outcome
+        response._content = b'{"status": %d}' % outcome
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def sync_client(adapter, retries=2):
+    client = make_client(retries)
+    client.session.mount("http://", adapter)
+    return client
+
+
+@pytest.mark.parametrize("failure", [requests.ConnectionError, requests.Timeout, 502, 503, 504])
+def test_get_retries_transient_failures(failure):
+    adapter = ScriptedAdapter(failure, failure, 200)
+    assert sync_client(adapter).get(PATH) == {"status": 200}
+    assert adapter.calls == 3
+
+
+def test_get_does_not_retry_other_statuses_and_gives_up():
+    adapter = ScriptedAdapter(404, 200)
+    with pytest.raises(requests.HTTPError):
+        sync_client(adapter).get(PATH)
+    assert adapter.calls == 1
+
+    adapter = ScriptedAdapter(requests.ConnectionError, requests.ConnectionError, requests.ConnectionError, 200)
+    with pytest.raises(requests.ConnectionError):
+        sync_client(adapter).get(PATH)
+    assert adapter.calls == 3
+
+
+def test_backoff_doubles_per_attempt():
+    client = APIClient(BASE_URL, backoff=0.2)
+    assert [client._delay(attempt) for attempt in range(3)] == pytest.approx([0.2, 0.4, 0.8])
@@ -0,0 +1,34 @@
+import json
+
+import insights_store
+from insights_store import InsightsStore
+
+
+def test_one_refresher_and_the_others_reload_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(insights_store, "RAG_AVAILABLE", True)
+    monkeypatch.setattr(insights_store, "get_insights_from_other_customers",
+                        lambda account_id, category: f"raw {category} rows of account 1065000029", raising=False)
+    path = str(tmp_path / "reports.json")
+    leader, follower = InsightsStore(path), InsightsStore(path)
+
+    assert leader.try_become_refresher()
+    assert not follower.try_become_refresher()
+    assert follower.get() is None
+
+    assert leader.refresh(lambda prompt: "Cohort report")
+    assert follower.reload_if_changed()
+    assert follower.get()["report"] == "Cohort report"
+    assert not follower.reload_if_changed()
+
+
+def test_retrieved_customer_data_is_not_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(insights_store, "RAG_AVAILABLE", True)
+    monkeypatch.setattr(insights_store, "get_insights_from_other_customers",
+                        lambda account_id, category: f"raw {category} rows of account 1065000029", raising=False)
+    store = InsightsStore(str(tmp_path / "reports.json"))
+    store.refresh(lambda prompt: "Cohort report")
+
+    with open(tmp_path / "reports.json") as f:
+        stored = json.load(f)
+    assert set(stored) == {"generated_at", "report"}
+    assert list(tmp_path.iterdir()) == [tmp_path / "reports.json"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import intent_classifier
+from intent_classifier import INTENT_EXEMPLARS, IntentClassifier, classify_intent
+
+# One axis per intent: every exemplar embeds to its intent's axis, so a query
+# vector's cosine similarity to each intent is set directly by the test
+AXES = {intent: axis for axis, intent in enumerate(INTENT_EXEMPLARS)}
+
+
+class StubEmbedder:
+    def embed_documents(self, texts):
+        labels = {text: intent for intent, examples in INTENT_EXEMPLARS.items() for text in examples}
+        return [query(**{labels[text]: 1.0}) for text in texts]
+
+
+def query(**weights):
+    vector = np.zeros(len(AXES), dtype=np.float32)
+    for intent, weight in weights.items():
+        vector[AXES[intent]] = weight
+    return vector
+
+
+@pytest.fixture(autouse=True)
+def stub_classifier(monkeypatch):
+    monkeypatch.setattr(intent_classifier, "classifier", IntentClassifier(StubEmbedder(), INTENT_EXEMPLARS))
+
+
+@pytest.mark.parametrize("intent, tool_name, action", [
+    ("balance", "get_account_balance", "tool"),
+    ("transactions", "get_transaction_history", "tool"),
+    ("documents", None, None),
+])
+def test_confident_clear_winner_is_routed_locally(intent, tool_name, action):
+    route = classify_intent(query(**{intent: 1.0, "other": 0.2}))
+
+    assert route["intent"] == intent
+    assert route["tool_name"] == tool_name
+    assert route["action"] == action
+    assert route["source"] == "classifier"
+    assert route["confidence"] == pytest.approx(1 / np.hypot(1.0, 0.2))
+
+
+def test_low_confidence_falls_back_to_the_llm():
+    # Best intent scores 0.5 - well below CONFIDENCE_THRESHOLD
+    assert classify_intent(query(balance=1.0, transactions=1.0, documents=1.0, other=1.0)) is None
+
+
+def test_small_margin_falls_back_to_the_llm():
+    vector = query(balance=1.0, transactions=0.98)  # 0.714 vs 0.700
+    assert classify_intent(vector, threshold=0.7) is None
+    assert classify_intent(vector, threshold=0.7, min_margin=0.0)["intent"] == "balance"
+
+
+def test_other_is_never_routed():
+    assert intent_classifier.classifier.classify(query(other=1.0))[0] == "other"
+    assert classify_intent(query(other=1.0), threshold=0.0, min_margin=0.0) is None
+
+
+def test_no_classifier_means_no_local_route(monkeypatch):
+    monkeypatch.setattr(intent_classifier, "classifier", None)
+    assert classify_intent(query(balance=1.0)) is None
@@ -0,0 +1,48 @@
+import asyncio
+
+from llm_gateway import LLMGateway
+
+
+def test_cancel_after_handoff_returns_the_slot():
+    async def scenario():
+        gateway = LLMGateway(client=None, max_in_flight=1)
+        holder = gateway.aslot(user="a")
+        await holder.__aenter__()
+
+        async def wait_for_slot():
+            async with gateway.aslot(user="b"):
+                pass
+
+        waiting = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+        assert gateway.stats()["queue_depth"] == 1
+
+        # Release: _wake_async runs on the next loop pass and grants the
+        # slot, but the waiting task is cancelled before it resumes
+        await holder.__aexit__(None, None, None)
+        await asyncio.sleep(0)
+        assert waiting.done() is False and gateway._in_flight == 1
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+        assert gateway._in_flight == 0
+        assert gateway._user_load == {}
+        async with gateway.aslot(user="c"):
+            assert gateway._in_flight == 1
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_cancel_while_queued_frees_the_queue_entry():
+    async def scenario():
+        gateway = LLMGateway(client=None, max_in_flight=1)
+        async with gateway.aslot(user="a"):
+            waiting = asyncio.create_task(gateway.aslot(user="b").__aenter__())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            assert gateway.stats()["queue_depth"] == 0
+        assert gateway._in_flight == 0
+        assert gateway._user_load == {}
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
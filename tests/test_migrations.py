@@ -0,0 +1,50 @@
+import shutil
+import sqlite3
+
+import pytest
+
+import migrations
+
+ROOT_DB = "AIGurukul.db"
+
+
+@pytest.fixture
+def db_copy(tmp_path, request):
+    path = tmp_path / "AIGurukul.db"
+    shutil.copy(request.config.rootpath / ROOT_DB, path)
+    return str(path)
+
+
+def test_migrations_bring_the_database_to_the_latest_version(db_copy):
+    migrations.migrate(db_copy)
+    assert migrations.migrate(db_copy) == []
+
+    conn = sqlite3.connect(db_copy)
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    conn.close()
+
+
+@pytest.mark.parametrize("name", list(migrations.QUERY_PLAN_CHECKS))
+def test_hot_query_uses_its_index(db_copy, name):
+    migrations.migrate(db_copy)
+    conn = sqlite3.connect(db_copy)
+    result = migrations.check_query_plans(conn)[name]
+    conn.close()
+
+    index = migrations.QUERY_PLAN_CHECKS[name][1]
+    assert result["ok"], f"{name} does not search {index} without a temp sort: {result['plan']}"
+
+
+def test_duplicate_usernames_do_not_block_migration(db_copy):
+    conn = sqlite3.connect(db_copy)
+    username, password, account_id = conn.execute(
+        "SELECT username, password, accountId FROM UserDetails LIMIT 1").fetchone()
+    conn.execute("INSERT INTO UserDetails (username, password, accountId) VALUES (?, ?, ?)",
+                 (username, password, account_id))
+    conn.commit()
+    conn.close()
+
+    migrations.migrate(db_copy)
+    conn = sqlite3.connect(db_copy)
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    conn.close()
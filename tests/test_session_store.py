@@ -0,0 +1,126 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from conversation_memory import ConversationMemory, extractive_summary, message_text
+from session_store import RedisSessionStore, SessionStore, SQLiteSessionStore
+
+
+def _no_scan(*args, **kwargs):
+    raise AssertionError("/metrics must not scan the keyspace")
+
+
+def test_redis_metrics_come_from_the_index_not_a_keyspace_scan(monkeypatch):
+    store = RedisSessionStore(fakeredis.FakeRedis())
+    token = store.create_session({"username": "anish"})
+    store.append_messages("small", [{"text": "hi"}])
+    store.replace_messages("large", [{"text": "x" * 200}])
+
+    monkeypatch.setattr(store.client, "scan_iter", _no_scan)
+    assert store.stats()["sessions"] == 1
+    assert store.stats()["histories"] == 2
+    usage = store.history_usage(1)
+    assert [u["session_id"] for u in usage] == ["large"]
+    assert usage[0]["messages"] == 1
+
+    store.clear_messages("large")
+    store.delete_session(token)
+    assert store.stats()["sessions"] == 0
+    assert [u["session_id"] for u in store.history_usage()] == ["small"]
+
+
+def test_redis_index_drops_expired_entries():
+    store = RedisSessionStore(fakeredis.FakeRedis(), session_ttl=1, history_ttl=1)
+    store.create_session({"username": "anish"})
+    store.append_messages("s1", [{"text": "hi"}])
+    time.sleep(1.1)
+    assert store.stats() == {"backend": "redis", "sessions": 0, "histories": 0}
+    assert store.history_usage() == []
+
+
+def test_incomplete_backend_fails_when_instantiated():
+    class PartialStore(SessionStore):
+        def put_session(self, token, data):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def two_workers(backend, tmp_path):
+    """Two store instances sharing one backend, as two uvicorn workers would"""
+    if backend == "sqlite":
+        path = str(tmp_path / "sessions.db")
+        return SQLiteSessionStore(path), SQLiteSessionStore(path)
+    server = fakeredis.FakeServer()
+    return RedisSessionStore(fakeredis.FakeRedis(server=server)), RedisSessionStore(fakeredis.FakeRedis(server=server))
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis"])
+def test_history_lock_is_exclusive_across_workers(backend, tmp_path):
+    first, second = two_workers(backend, tmp_path)
+    order = []
+
+    def contender():
+        with second.history_lock("s1"):
+            order.append("second")
+
+    with first.history_lock("s1"):
+        thread = threading.Thread(target=contender)
+        thread.start()
+        time.sleep(0.2)
+        order.append("first")
+        with second.history_lock("other session"):
+            order.append("other")
+    thread.join(5)
+    assert order == ["first", "other", "second"]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis"])
+def test_concurrent_compactions_keep_every_turn(backend, tmp_path):
+    def slow_summary(previous, messages, max_tokens):
+        time.sleep(0.01)  # widen the read-compact-write window
+        return extractive_summary(previous, messages, max_tokens)
+
+    memories = [ConversationMemory(store=store, token_budget=10 ** 6, keep_messages=2,
+                                   summary_tokens=10 ** 6, summarizer=slow_summary)
+                for store in two_workers(backend, tmp_path)]
+
+    def worker(index, memory):
+        for turn in range(8):
+            memory.remember_turn("s1", f"question {index}-{turn}", f"answer {index}-{turn}")
+
+    threads = [threading.Thread(target=worker, args=pair) for pair in enumerate(memories)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    remembered = "\n".join(message_text(m) for m in memories[0].messages("s1"))
+    missing = [f"question {i}-{t}" for i in range(2) for t in range(8) if f"question {i}-{t}" not in remembered]
+    assert missing == []
+
+
+def test_redis_append_of_no_messages_is_a_no_op():
+    store = RedisSessionStore(fakeredis.FakeRedis())
+    store.append_messages("s1", [])
+    assert store.get_messages("s1") == []
+    assert store.stats()["histories"] == 0
+
+    store.append_messages("s1", [{"text": "hi"}])
+    store.append_messages("s1", [])
+    assert store.get_messages("s1") == [{"text": "hi"}]
+
+
+def test_sqlite_stats_leave_out_expired_histories(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), history_ttl=1)
+    store.append_messages("old", [{"text": "x" * 100}])
+    time.sleep(1.1)
+    store.history_ttl = 3600
+    store.append_messages("live", [{"text": "hi"}])
+
+    stats = store.stats()
+    assert stats["histories"] == 1
+    assert stats["history_bytes"] == len('{"text": "hi"}')
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("prompt", slow))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "saved_calls": 7, "in_flight": 0}
+
+
+def test_error_reaches_every_waiting_thread_and_is_not_cached():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("LLM down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("prompt", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert errors == ["LLM down"] * 4
+    assert flight.do("prompt", lambda: "recovered") == "recovered"
+
+
+def test_async_callers_share_one_call_and_its_error():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("bad prompt")
+
+    async def main():
+        results = await asyncio.gather(*(flight.ado("a", slow) for _ in range(5)))
+        errors = await asyncio.gather(*(flight.ado("b", failing) for _ in range(3)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(main())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert [type(e) for e in errors] == [ValueError] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["executed"] == 2
+
+    with pytest.raises(KeyError):
+        flight.do("c", lambda: {}["missing"])
@@ -0,0 +1,117 @@
+import os
+import time
+
+from statement_index import StatementIndex, parse_statement_name
+
+ACCOUNT_ID = 1065000029
+
+
+def write(docs_dir, name, size=10):
+    (docs_dir / name).write_bytes(b"%PDF" + b"x" * (size - 4))
+
+
+def make_index(tmp_path):
+    for name in [
+        f"{ACCOUNT_ID}_monthly_statement_may_2025.pdf",
+        f"{ACCOUNT_ID}_monthly_statement_jun_2025.pdf",
+        f"{ACCOUNT_ID}_monthly_statement_dec_2024.pdf",
+        f"{ACCOUNT_ID}_annual_statement_2025.pdf",
+        "1065000048_monthly_statement_jun_2025.pdf",
+        f"{ACCOUNT_ID}1_monthly_statement_jun_2025.pdf",  # a longer account number, not a prefix match
+    ]:
+        write(tmp_path, name)
+    (tmp_path / f"{ACCOUNT_ID}_notes.txt").write_text("not a pdf")
+    index = StatementIndex(tmp_path, refresh_interval=0)
+    index.build()
+    return index
+
+
+def test_parse_statement_name():
+    assert parse_statement_name(f"{ACCOUNT_ID}_monthly_statement_jun_2025.pdf") == ((str(ACCOUNT_ID),), "monthly", "2025-06")
+    assert parse_statement_name(f"{ACCOUNT_ID}_annual_statement_2025.pdf") == ((str(ACCOUNT_ID),), "annual", "2025")
+    assert parse_statement_name(f"Account_Statement_anish_00{ACCOUNT_ID}.pdf") == ((str(ACCOUNT_ID),), "statement", "")
+    assert parse_statement_name("readme.pdf") is None
+    assert parse_statement_name(f"{ACCOUNT_ID}.csv") is None
+
+
+def test_lookup_returns_only_the_accounts_files_newest_first(tmp_path):
+    index = make_index(tmp_path)
+
+    names = [f["name"] for f in index.find(ACCOUNT_ID)]
+    assert names == [
+        f"{ACCOUNT_ID}_monthly_statement_jun_2025.pdf",
+        f"{ACCOUNT_ID}_monthly_statement_may_2025.pdf",
+        f"{ACCOUNT_ID}_monthly_statement_dec_2024.pdf",
+        f"{ACCOUNT_ID}_annual_statement_2025.pdf",
+    ]
+    assert all(str(ACCOUNT_ID) + "_" in name for name in names)
+    assert [f["period"] for f in index.find(ACCOUNT_ID, "monthly", year=2024)] == ["2024-12"]
+    assert [f["type"] for f in index.find(ACCOUNT_ID, "annual")] == ["annual"]
+    assert index.find(1065000099) == []
+
+
+def test_refresh_picks_up_added_and_removed_files(tmp_path):
+    index = make_index(tmp_path)
+    time.sleep(0.01)
+
+    write(tmp_path, f"{ACCOUNT_ID}_monthly_statement_jul_2025.pdf", size=20)
+    os.remove(tmp_path / f"{ACCOUNT_ID}_monthly_statement_may_2025.pdf")
+
+    monthly = index.find(ACCOUNT_ID, "monthly")
+    assert [f["period"] for f in monthly] == ["2025-07", "2025-06", "2024-12"]
+    assert monthly[0]["size"] == 20
+    assert index.stats()["refreshes"] == 1
+    assert index.stats()["builds"] == 1
+
+
+def test_refresh_picks_up_files_replaced_under_the_same_name(tmp_path):
+    index = make_index(tmp_path)
+    name = f"{ACCOUNT_ID}_monthly_statement_jun_2025.pdf"
+    time.sleep(0.01)
+
+    # Regenerated statements are written aside and renamed over the old file
+    write(tmp_path, "regenerated.tmp", size=500)
+    os.replace(tmp_path / "regenerated.tmp", tmp_path / name)
+
+    assert index.find(ACCOUNT_ID, "monthly", year=2025)[0]["size"] == 500
+    assert index.stats()["files_updated"] == 1
+
+
+def test_lookups_do_not_relist_an_unchanged_directory(tmp_path):
+    index = make_index(tmp_path)
+    for _ in range(5):
+        index.find(ACCOUNT_ID)
+    assert index.stats()["refreshes"] == 0
+    assert index.stats()["lookups"] == 5
+
+
+def test_watcher_callbacks_update_the_index(tmp_path):
+    index = make_index(tmp_path)
+    index.refresh_interval = 3600  # only the callbacks may change it
+
+    write(tmp_path, f"{ACCOUNT_ID}_annual_statement_2026.pdf")
+    index.file_changed(str(tmp_path / f"{ACCOUNT_ID}_annual_statement_2026.pdf"))
+    index.file_removed(str(tmp_path / f"{ACCOUNT_ID}_annual_statement_2025.pdf"))
+
+    assert [f["period"] for f in index.find(ACCOUNT_ID, "annual")] == ["2026"]
+
+    # Rewritten in place: the directory mtime does not move, the modified event does
+    write(tmp_path, f"{ACCOUNT_ID}_annual_statement_2026.pdf", size=300)
+    index.file_changed(str(tmp_path / f"{ACCOUNT_ID}_annual_statement_2026.pdf"))
+    assert index.find(ACCOUNT_ID, "annual")[0]["size"] == 300
+
+
+def test_files_route_lists_only_the_callers_account(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+
+    monkeypatch.setattr(main, "statement_index", make_index(tmp_path))
+    token = main.session_store.create_session({"username": "anish", "accountId": ACCOUNT_ID})
+    client = TestClient(main.app)
+
+    response = client.get(f"/api/statements/{ACCOUNT_ID}/files", params={"token": token, "year": 2025})
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
+
+    assert client.get("/api/statements/1065000048/files", params={"token": token}).status_code == 403
+    assert client.get(f"/api/statements/{ACCOUNT_ID}/files", params={"token": "expired"}).status_code == 401
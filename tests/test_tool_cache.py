@@ -0,0 +1,79 @@
+import data_access
+from tool_cache import ToolResultCache
+
+ACCOUNT_ID = 1065000029
+ARGS = {"account_id": ACCOUNT_ID, "limit": 5}
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"transactions": [self.calls]}
+
+
+def test_repeat_call_is_served_from_the_cache():
+    cache = ToolResultCache(version_probe=lambda account_id, tables: "v1")
+    call = Counter()
+
+    first = cache.get_or_call("get_transaction_history", ARGS, call)
+    assert cache.get_or_call("get_transaction_history", dict(ARGS), call) is first
+    assert call.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_table_version_invalidates_the_entry():
+    versions = {"TransactionHistory": "v1"}
+    cache = ToolResultCache(version_probe=lambda account_id, tables: versions[tables[0]])
+    call = Counter()
+
+    cache.get_or_call("get_transaction_history", ARGS, call)
+    versions["TransactionHistory"] = "v2"
+    assert cache.get_or_call("get_transaction_history", ARGS, call) == {"transactions": [2]}
+    assert call.calls == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_invalidate_account_and_ttl():
+    cache = ToolResultCache(version_probe=lambda account_id, tables: "v1")
+    call = Counter()
+
+    cache.get_or_call("get_account_balance", ARGS, call)
+    cache.invalidate_account(ACCOUNT_ID)
+    cache.get_or_call("get_account_balance", ARGS, call)
+    assert call.calls == 2
+
+    cache.ttl_seconds = -1
+    cache.get_or_call("get_account_balance", ARGS, call)
+    assert call.calls == 3
+    assert cache.stats()["expired"] == 1
+
+
+def test_uncacheable_tools_and_failed_probes_always_call():
+    def broken_probe(account_id, tables):
+        raise RuntimeError("db locked")
+
+    call = Counter()
+    ToolResultCache().get_or_call("get_market_insights", ARGS, call)
+    cache = ToolResultCache(version_probe=broken_probe)
+    cache.get_or_call("get_account_balance", ARGS, call)
+    cache.get_or_call("get_account_balance", ARGS, call)
+    assert call.calls == 3
+    assert cache.stats()["probe_errors"] == 2
+
+
+def test_real_probe_changes_when_a_transaction_is_added():
+    before = data_access.get_table_data_version(ACCOUNT_ID, ("TransactionHistory",))
+    conn = data_access.get_db_connection()
+    with conn:
+        conn.execute("""
+            INSERT INTO TransactionHistory (transactionId, accountId, date, type, netAmount)
+            VALUES ('TX-TEST-1', ?, '2026-01-01 00:00:00', 'deposit', 1.0)
+        """, (ACCOUNT_ID,))
+    try:
+        assert data_access.get_table_data_version(ACCOUNT_ID, ("TransactionHistory",)) != before
+    finally:
+        with conn:
+            conn.execute("DELETE FROM TransactionHistory WHERE transactionId = 'TX-TEST-1'")
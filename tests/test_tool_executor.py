@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+
+import tool_executor
+from tool_executor import _resolve_args, execute_plan, plan_waves
+
+ACCOUNT_ID = 1065000029
+
+
+def step(step_id, tool="get_account_balance", depends_on=(), **args):
+    return {"id": step_id, "tool": tool, "args": {"account_id": ACCOUNT_ID, **args},
+            "depends_on": list(depends_on)}
+
+
+def fake_tool(tool_name, args):
+    """Each tool takes 50ms; failing_tool raises"""
+    time.sleep(0.05)
+    if tool_name == "failing_tool":
+        raise RuntimeError("db locked")
+    return {"tool": tool_name, "args": args, "asOfDate": "2025-06-30", "balance": {"current": 10.0}}
+
+
+def test_plan_waves_groups_independent_steps():
+    steps = [step("t1"), step("t2"), step("t3", depends_on=["t1"]), step("t4", depends_on=["t2", "t3"])]
+    assert [[s["id"] for s in wave] for wave in plan_waves(steps)] == [["t1", "t2"], ["t3"], ["t4"]]
+
+
+@pytest.mark.parametrize("steps, message", [
+    ([step("t1", depends_on=["t2"]), step("t2", depends_on=["t1"])], "cycle"),
+    ([step("t1", depends_on=["t1"])], "cycle"),
+    ([step("t1"), step("t2", depends_on=["t9"])], "unknown"),
+    ([step("t1"), step("t1")], "Duplicate"),
+])
+def test_plan_waves_rejects_bad_plans(steps, message):
+    with pytest.raises(ValueError, match=message):
+        plan_waves(steps)
+
+
+def test_resolve_args_replaces_references_to_earlier_results():
+    results = {"t1": {"status": "ok", "result": {"asOfDate": "2025-06-30", "balance": {"current": 10.0}}}}
+    args = {"endDate": "$t1.asOfDate", "amount": "$t1.balance.current", "limit": 5, "note": "$not a reference"}
+    assert _resolve_args(args, results) == {"endDate": "2025-06-30", "amount": 10.0, "limit": 5,
+                                            "note": "$not a reference"}
+    with pytest.raises(ValueError, match=r"\$t1.missing"):
+        _resolve_args({"x": "$t1.missing"}, results)
+
+
+def test_execute_plan_runs_waves_and_skips_dependents_of_failures(monkeypatch):
+    monkeypatch.setattr(tool_executor, "execute_tool", fake_tool)
+    report = execute_plan([
+        step("t1"),
+        step("t2", tool="get_fee_summary"),
+        step("t3", tool="failing_tool"),
+        step("t4", tool="get_transaction_history", depends_on=["t1"], endDate="$t1.asOfDate"),
+        step("t5", tool="get_monthly_totals", depends_on=["t3"]),
+    ])
+
+    statuses = {entry["id"]: entry["status"] for entry in report["steps"]}
+    assert statuses == {"t1": "ok", "t2": "ok", "t3": "error", "t4": "ok", "t5": "error"}
+    errors = {entry["id"]: entry.get("error") for entry in report["steps"]}
+    assert errors["t3"] == "db locked"
+    assert errors["t5"] == "dependency t3 failed"
+    assert report["results"]["t4"]["args"]["endDate"] == "2025-06-30"
+    assert set(report["results"]) == {"t1", "t2", "t4"}
+
+
+def test_execute_plan_reports_time_saved_by_running_waves_concurrently(monkeypatch):
+    monkeypatch.setattr(tool_executor, "execute_tool", fake_tool)
+    report = execute_plan([step("t1"), step("t2"), step("t3"), step("t4", depends_on=["t1"])])
+
+    assert report["waves"] == 2
+    assert report["serial_ms"] >= 4 * 50
+    # Two waves of ~50ms each, not four serial calls
+    assert report["wall_ms"] < report["serial_ms"]
+    assert report["saved_ms"] == pytest.approx(report["serial_ms"] - report["wall_ms"], abs=0.02)
+    assert all(entry["ms"] >= 50 for entry in report["steps"])
+
+
+def test_aexecute_plan_matches_execute_plan(monkeypatch):
+    async def afake_tool(tool_name, args):
+        return await asyncio.to_thread(fake_tool, tool_name, args)
+
+    monkeypatch.setattr(tool_executor, "aexecute_tool", afake_tool)
+    report = asyncio.run(tool_executor.aexecute_plan([
+        step("t1"), step("t2", tool="failing_tool"),
+        step("t3", depends_on=["t1"], endDate="$t1.asOfDate"), step("t4", depends_on=["t2"]),
+    ]))
+
+    assert [entry["status"] for entry in report["steps"]] == ["ok", "error", "ok", "error"]
+    assert report["results"]["t3"]["args"]["endDate"] == "2025-06-30"
+    assert report["wall_ms"] < report["serial_ms"]
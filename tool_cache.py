@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from data_access import get_table_data_version
+
+MAX_ENTRIES = 1000
+MAX_BYTES = 16 * 1024 * 1024
+TTL_SECONDS = 10 * 60
+
+# Tables each cacheable tool reads; their version probe decides freshness
+TOOL_TABLES = {
+    "get_account_balance": ("AccountBalance",),
+    "get_transaction_history": ("TransactionHistory",),
+    "get_periodic_statements": ("PeriodicStatement",),
+    "get_adhoc_statements": ("AdHocStatement",),
+    "get_spending_breakdown": ("TransactionHistory",),
+    "get_monthly_totals": ("TransactionHistory",),
+    "get_fee_summary": ("TransactionHistory",),
+    "get_balance_stats": ("TransactionHistory",),
+}
+
+
+class ToolResultCache:
+    """
+    Cache of tool results keyed by (tool, normalized args), per account.
+
+    Every lookup runs a cheap per-table version probe for the account
+    (get_table_data_version); an entry is only served while the version it
+    was stored under still matches, so new rows invalidate it without any
+    write hooks. Entries also expire after `ttl_seconds` and are evicted
+    LRU-first past `max_entries` / `max_bytes`.
+
+    Cached results are shared between requests and must not be mutated.
+    The masked copy the agent builds from a result is cached alongside it.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 ttl_seconds: float = TTL_SECONDS, version_probe=get_table_data_version):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version_probe = version_probe
+
+        self._entries = OrderedDict()  # key -> entry, oldest first
+        self._by_result = {}           # id(result) -> key, for masked()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0,
+            "invalidations": 0, "masked_hits": 0, "probe_errors": 0,
+        }
+
+    def get_or_call(self, tool_name: str, args: dict, call):
+        """Return the cached result of `tool_name(**args)`, or call() and cache it"""
+        tables = TOOL_TABLES.get(tool_name)
+        account_id = args.get("account_id")
+        if not tables or account_id is None:
+            return call()
+
+        try:
+            version = self.version_probe(account_id, tables)
+        except Exception as e:
+            print(f"⚠️ Tool cache version probe failed for {tool_name}: {e}")
+            with self._lock:
+                self.metrics["probe_errors"] += 1
+            return call()
+
+        key = (account_id, tool_name, json.dumps(args, sort_keys=True, default=str))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry["created"] > self.ttl_seconds:
+                    self._remove(key)
+                    self.metrics["expired"] += 1
+                elif entry["version"] != version:
+                    self._remove(key)
+                    self.metrics["invalidations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return entry["result"]
+            self.metrics["misses"] += 1
+
+        result = call()
+        self._store(key, version, result)
+        return result
+
+    def masked(self, result, account_id: int, mask):
+        """mask(result, account_id), computed once per cached result"""
+        with self._lock:
+            key = self._by_result.get(id(result))
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None or entry["result"] is not result:
+                entry = None
+            elif entry["masked"] is not None:
+                self.metrics["masked_hits"] += 1
+                return entry["masked"]
+
+        masked = mask(result, account_id)
+        if entry is not None:
+            with self._lock:
+                entry["masked"] = masked
+        return masked
+
+    def invalidate_account(self, account_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == account_id]:
+                self._remove(key)
+                self.metrics["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _store(self, key, version: str, result):
+        # Masked copies are about the same size again
+        size = 2 * len(json.dumps(result, default=str))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "version": version,
+                "result": result,
+                "masked": None,
+                "created": time.monotonic(),
+                "size": size,
+            }
+            self._by_result[id(result)] = key
+            self._bytes += size
+            self.metrics["stores"] += 1
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.metrics["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+        if self._by_result.get(id(entry["result"])) == key:
+            del self._by_result[id(entry["result"])]
+
+
+tool_cache = ToolResultCache()
@@ -1,12 +1,33 @@
-from mcp_server import TOOLS
+import asyncio
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import data_access
+from db_pool import db_executor
+from mcp_server import TOOLS, ASYNC_TOOLS, get_statement_documents_fn
+from tool_cache import tool_cache
 
-def execute_tool(tool_name: str, args: dict):
-    if tool_name not in TOOLS:
-        raise ValueError(f"Unknown tool: {tool_name}")
+# "local" runs the data-access queries in this process; "http" goes through the
+# mcp_server tool functions (HTTP calls to the banking API, as external MCP
+# clients do) - kept for comparison in bench_tools.py
+TOOL_TRANSPORT = os.getenv("TOOL_TRANSPORT", "local")
+
+LOCAL_TOOLS = {
+    "get_account_balance": data_access.get_account_balance,
+    "get_transaction_history": data_access.get_transaction_history,
+    "get_adhoc_statements": data_access.get_adhoc_statements,
+    "get_periodic_statements": data_access.get_periodic_statements,
+    "get_statement_documents": get_statement_documents_fn,
+    "get_spending_breakdown": data_access.get_spending_breakdown,
+    "get_monthly_totals": data_access.get_monthly_totals,
+    "get_fee_summary": data_access.get_fee_summary,
+    "get_balance_stats": data_access.get_balance_stats,
+}
 
-    tool = TOOLS[tool_name]
 
+def _normalize_args(args: dict) -> dict:
     # Normalize parameter names to match what the tool functions expect
     normalized_args = {}
     
@@ -17,10 +38,205 @@ def execute_tool(tool_name: str, args: dict):
         else:
             normalized_args[key] = value
     
+    return normalized_args
+
+
+def execute_tool(tool_name: str, args: dict):
+    tools = LOCAL_TOOLS if TOOL_TRANSPORT == "local" else TOOLS
+    if tool_name not in tools:
+        raise ValueError(f"Unknown tool: {tool_name}")
+
+    tool = tools[tool_name]
+    normalized_args = _normalize_args(args)
+    
     print(f"Executing tool: {tool_name}")
     print(f"Original args: {args}")
     print(f"Normalized args: {normalized_args}")
     
-    # Call the function directly (not the FunctionTool wrapper)
-    # The tool IS the function since we stored it directly in mcp_server.py
-    return tool(**normalized_args)
\ No newline at end of file
+    # Call the function directly (not the FunctionTool wrapper). Local results
+    # are cached until the account's rows change; over HTTP the banking API
+    # is the source of truth, so nothing is cached
+    if TOOL_TRANSPORT != "local":
+        return tool(**normalized_args)
+    return tool_cache.get_or_call(tool_name, normalized_args, lambda: tool(**normalized_args))
+
+
+async def aexecute_tool(tool_name: str, args: dict):
+    """Async version of execute_tool (SQLite runs on the bounded DB executor, HTTP is non-blocking)"""
+    if TOOL_TRANSPORT == "local":
+        return await db_executor.run(execute_tool, tool_name, args)
+
+    if tool_name not in ASYNC_TOOLS:
+        raise ValueError(f"Unknown tool: {tool_name}")
+
+    tool = ASYNC_TOOLS[tool_name]
+    normalized_args = _normalize_args(args)
+    
+    print(f"Executing tool (async): {tool_name}")
+    print(f"Normalized args: {normalized_args}")
+    
+    return await tool(**normalized_args)
+
+# ─────────────────────────────────────────────
+# TOOL PLANS
+# A plan is a list of steps {"id", "tool", "args", "depends_on"}. Steps
+# whose dependencies are done run together in one wave; an arg value like
+# "$t1.asOfDate" is replaced by that field of step t1's result.
+# ─────────────────────────────────────────────
+MAX_PLAN_STEPS = 6
+MAX_PLAN_WORKERS = 4
+
+_REFERENCE = re.compile(r"^\$(\w+)\.(.+)$")
+
+
+def plan_waves(steps: list) -> list:
+    """
+    Group plan steps into waves that can run concurrently.
+
+    Raises:
+        ValueError: duplicate ids, unknown dependencies or a cycle
+    """
+    ids = [step["id"] for step in steps]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate step ids in plan: {ids}")
+
+    remaining = {step["id"]: step for step in steps}
+    for step in steps:
+        unknown = set(step.get("depends_on", [])) - set(remaining)
+        if unknown:
+            raise ValueError(f"Step {step['id']} depends on unknown steps {sorted(unknown)}")
+
+    done, waves = set(), []
+    while remaining:
+        wave = [s for s in remaining.values() if set(s.get("depends_on", [])) <= done]
+        if not wave:
+            raise ValueError(f"Plan has a dependency cycle between {sorted(remaining)}")
+        waves.append(wave)
+        for step in wave:
+            done.add(step["id"])
+            del remaining[step["id"]]
+    return waves
+
+
+def _resolve_args(args: dict, results: dict) -> dict:
+    resolved = {}
+    for key, value in args.items():
+        match = _REFERENCE.match(value) if isinstance(value, str) else None
+        if match:
+            step_id, path = match.groups()
+            value = results[step_id]["result"]
+            for field in path.split("."):
+                if not isinstance(value, dict) or field not in value:
+                    raise ValueError(f"{match.group(0)} not found in the result of {step_id}")
+                value = value[field]
+        resolved[key] = value
+    return resolved
+
+
+def _failed_dependency(step: dict, results: dict):
+    for dep in step.get("depends_on", []):
+        if results[dep]["status"] != "ok":
+            return {"status": "error", "error": f"dependency {dep} failed", "ms": 0.0}
+    return None
+
+
+def _run_step(step: dict, results: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        result = execute_tool(step["tool"], _resolve_args(step.get("args", {}), results))
+        outcome = {"status": "ok", "result": result}
+    except Exception as e:
+        outcome = {"status": "error", "error": str(e)}
+    outcome["ms"] = (time.perf_counter() - started) * 1000
+    return outcome
+
+
+async def _arun_step(step: dict, results: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        result = await aexecute_tool(step["tool"], _resolve_args(step.get("args", {}), results))
+        outcome = {"status": "ok", "result": result}
+    except Exception as e:
+        outcome = {"status": "error", "error": str(e)}
+    outcome["ms"] = (time.perf_counter() - started) * 1000
+    return outcome
+
+
+def execute_plan(steps: list) -> dict:
+    """
+    Run a tool plan, each wave of independent steps concurrently.
+
+    A failing step does not stop the plan; its dependents are skipped.
+
+    Returns:
+        plan report - see _plan_report
+    """
+    waves = plan_waves(steps)
+    results = {}
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PLAN_WORKERS, max(len(w) for w in waves))) as pool:
+        for wave in waves:
+            runnable = []
+            for step in wave:
+                skipped = _failed_dependency(step, results)
+                if skipped:
+                    results[step["id"]] = skipped
+                else:
+                    runnable.append(step)
+            for step, outcome in zip(runnable, pool.map(lambda s: _run_step(s, results), runnable)):
+                results[step["id"]] = outcome
+
+    return _plan_report(steps, waves, results, (time.perf_counter() - started) * 1000)
+
+
+async def aexecute_plan(steps: list) -> dict:
+    """Async version of execute_plan (each wave is one asyncio.gather)"""
+    waves = plan_waves(steps)
+    results = {}
+    started = time.perf_counter()
+
+    for wave in waves:
+        runnable = []
+        for step in wave:
+            skipped = _failed_dependency(step, results)
+            if skipped:
+                results[step["id"]] = skipped
+            else:
+                runnable.append(step)
+        outcomes = await asyncio.gather(*(_arun_step(step, results) for step in runnable))
+        for step, outcome in zip(runnable, outcomes):
+            results[step["id"]] = outcome
+
+    return _plan_report(steps, waves, results, (time.perf_counter() - started) * 1000)
+
+
+def _plan_report(steps: list, waves: list, results: dict, wall_ms: float) -> dict:
+    """
+    Returns:
+        {"steps": [{id, tool, depends_on, status, ms, error?}], "results": {id: tool result},
+         "waves": n, "wall_ms", "serial_ms" (sum of step times), "saved_ms"}
+    """
+    report_steps = []
+    for step in steps:
+        outcome = results[step["id"]]
+        entry = {
+            "id": step["id"],
+            "tool": step["tool"],
+            "depends_on": step.get("depends_on", []),
+            "status": outcome["status"],
+            "ms": round(outcome["ms"], 2),
+        }
+        if "error" in outcome:
+            entry["error"] = outcome["error"]
+        report_steps.append(entry)
+
+    serial_ms = sum(results[step["id"]]["ms"] for step in steps)
+    return {
+        "steps": report_steps,
+        "results": {step_id: o["result"] for step_id, o in results.items() if o["status"] == "ok"},
+        "waves": len(waves),
+        "wall_ms": round(wall_ms, 2),
+        "serial_ms": round(serial_ms, 2),
+        "saved_ms": round(max(serial_ms - wall_ms, 0.0), 2),
+    }